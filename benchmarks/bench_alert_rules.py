@@ -0,0 +1,103 @@
+"""
+Benchmark del motor de alertas: miles de reglas sobre cientos de símbolos.
+
+Compara `MotorAlertas.evaluar()` con recorrer todas las reglas en cada tick
+y verifica que ambos disparen las mismas alertas.
+
+Uso (desde la raíz del proyecto):
+    python -m benchmarks.bench_alert_rules [--symbols 300] [--reglas 5000] [--ticks 200]
+"""
+import argparse
+import time
+
+import numpy as np
+
+from utils.alert_rules import ABAJO, ARRIBA, MotorAlertas, compilar_regla
+
+def generar_reglas(symbols, n: int, precios: np.ndarray, rng) -> list:
+    definiciones = [
+        {'indicador': 'rsi', 'nivel': 30, 'direccion': ABAJO},
+        {'indicador': 'rsi', 'nivel': 70, 'direccion': ARRIBA},
+        {'indicador': 'macd', 'nivel': 0, 'direccion': ARRIBA},
+        {'indicador': 'macd', 'nivel': 0, 'direccion': ABAJO},
+        {'indicador': 'variacion_5', 'nivel': 1, 'direccion': ARRIBA},
+    ]
+    while len(definiciones) < n:
+        i = int(rng.integers(len(symbols)))
+        definiciones.append({
+            'symbol': symbols[i],
+            'indicador': 'precio',
+            'nivel': round(float(precios[i] * rng.uniform(0.9, 1.1)), 4),
+            'direccion': ARRIBA if rng.random() < 0.5 else ABAJO,
+        })
+    return [compilar_regla(d) for d in definiciones]
+
+def evaluar_ingenuo(reglas, anteriores, symbol, valores) -> set:
+    """Referencia: revisa todas las reglas en cada tick."""
+    disparadas = set()
+    for regla in reglas:
+        if regla.symbol not in ('*', symbol) or regla.indicador not in valores:
+            continue
+        anterior = anteriores.get((symbol, regla.indicador))
+        actual = valores[regla.indicador]
+        if anterior is None:
+            continue
+        if regla.direccion == ARRIBA and anterior < regla.nivel <= actual:
+            disparadas.add(regla.id)
+        elif regla.direccion == ABAJO and anterior > regla.nivel >= actual:
+            disparadas.add(regla.id)
+    return disparadas
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--symbols', type=int, default=300)
+    parser.add_argument('--reglas', type=int, default=5000)
+    parser.add_argument('--ticks', type=int, default=200)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(17)
+    symbols = [f'SYM{i}' for i in range(args.symbols)]
+    base = rng.uniform(1, 1000, args.symbols)
+    precios = base * np.exp(np.cumsum(rng.normal(0, 0.002, (args.ticks, args.symbols)), axis=0))
+    rsi = np.clip(50 + np.cumsum(rng.normal(0, 2, (args.ticks, args.symbols)), axis=0), 0, 100)
+    macd = np.cumsum(rng.normal(0, 0.3, (args.ticks, args.symbols)), axis=0)
+    reglas = generar_reglas(symbols, args.reglas, base, rng)
+    # Cooldown 0: cada cruce cuenta, para comparar contra la referencia
+    motor = MotorAlertas(reglas, cooldown=0)
+
+    tiempos, diferencias, disparadas = [], 0, 0
+    anteriores = {}
+    for t in range(args.ticks):
+        ticks = []
+        for j, symbol in enumerate(symbols):
+            valores = {'precio': precios[t, j], 'rsi': rsi[t, j], 'macd': macd[t, j]}
+            if t >= 5:
+                valores['variacion_5'] = (precios[t, j] / precios[t - 5, j] - 1) * 100
+            ticks.append((symbol, {k: v for k, v in valores.items()
+                                   if k in motor.indicadores(symbol)}))
+
+        inicio = time.perf_counter()
+        alertas = [motor.evaluar(symbol, valores, t) for symbol, valores in ticks]
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+
+        for (symbol, valores), alertas_symbol in zip(ticks, alertas):
+            esperadas = evaluar_ingenuo(reglas, anteriores, symbol, valores)
+            diferencias += esperadas != {a.regla.id for a in alertas_symbol}
+            disparadas += len(alertas_symbol)
+            for indicador, valor in valores.items():
+                anteriores[(symbol, indicador)] = valor
+
+    inicio = time.perf_counter()
+    for symbol, valores in ticks:
+        evaluar_ingenuo(reglas, anteriores, symbol, valores)
+    ingenuo_ms = (time.perf_counter() - inicio) * 1000
+
+    tiempos = np.array(tiempos[1:])
+    print(f"{len(reglas):,} reglas, {args.symbols} símbolos, {args.ticks} ticks, "
+          f"{disparadas:,} alertas")
+    print(f"Motor indexado: p50 {np.percentile(tiempos, 50):.2f} ms/tick, "
+          f"p99 {np.percentile(tiempos, 99):.2f} ms/tick")
+    print(f"Recorrido completo: {ingenuo_ms:.1f} ms/tick; diferencias: {diferencias}")
+
+if __name__ == "__main__":
+    main()
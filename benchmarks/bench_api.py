@@ -0,0 +1,124 @@
+"""
+Prueba de carga de la API HTTP local.
+
+Levanta `ServidorAPI` en un puerto libre con una instantánea sintética que se
+republica cada segundo (como el monitor) y lanza muchos clientes concurrentes
+que piden los endpoints en bucle. Reporta pedidos por segundo y latencias de
+cada escenario, incluido el sondeo con `If-None-Match`. Clientes y servidor
+comparten el proceso, así que los números son una cota inferior.
+
+Uso (desde la raíz del proyecto):
+    python -m benchmarks.bench_api [--clientes 100] [--segundos 5] [--symbols 50]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+_tmp = tempfile.TemporaryDirectory()
+os.environ['DB_PATH'] = str(Path(_tmp.name) / 'bench.db')
+
+import aiohttp
+import numpy as np
+
+from database.connection import get_db_connection, init_db
+from utils.api_server import ServidorAPI
+
+def resultado(symbol: str, precio: float, rng) -> dict:
+    return {
+        'symbol': symbol,
+        'name': symbol.title(),
+        'price': precio,
+        'var_24h': float(rng.normal(0, 3)),
+        'recomendacion': {
+            'señales': ['MACD positivo'],
+            'accion': 'MANTENER ⏺',
+            'confianza': int(rng.integers(-5, 6)),
+            'indicadores': {'rsi': float(rng.uniform(10, 90)), 'macd': float(rng.normal()),
+                            'signal': float(rng.normal())},
+            'niveles': {'soporte': precio * 0.97, 'resistencia': precio * 1.03,
+                        'distancia_soporte': -3.0, 'distancia_resistencia': 3.0},
+        },
+        'alertas': [],
+    }
+
+def poblar(symbols, ticks: int) -> None:
+    conn = get_db_connection()
+    ts = (int(time.time()) - np.arange(ticks)[::-1] * 60).tolist()
+    for symbol in symbols:
+        with conn:
+            conn.executemany('INSERT INTO crypto_precios (symbol, ts, price) VALUES (?, ?, ?)',
+                             zip([symbol] * ticks, ts, [100.0] * ticks))
+
+async def cliente(sesion, url: str, hasta: float, latencias: list, estados: dict,
+                  condicional: bool) -> None:
+    etag = None
+    while time.perf_counter() < hasta:
+        headers = {'If-None-Match': etag} if condicional and etag else {}
+        inicio = time.perf_counter()
+        async with sesion.get(url, headers=headers) as respuesta:
+            await respuesta.read()
+            etag = respuesta.headers.get('ETag', etag)
+        latencias.append((time.perf_counter() - inicio) * 1000)
+        estados[respuesta.status] = estados.get(respuesta.status, 0) + 1
+
+async def escenario(base: str, ruta: str, clientes: int, segundos: float,
+                    condicional: bool = False) -> None:
+    latencias, estados = [], {}
+    conector = aiohttp.TCPConnector(limit=clientes)
+    async with aiohttp.ClientSession(connector=conector) as sesion:
+        inicio = time.perf_counter()
+        hasta = inicio + segundos
+        await asyncio.gather(*(cliente(sesion, base + ruta, hasta, latencias, estados,
+                                       condicional) for _ in range(clientes)))
+        duracion = time.perf_counter() - inicio
+    latencias.sort()
+    print(f"{ruta:<40} {'If-None-Match' if condicional else '':<14}"
+          f"{len(latencias) / duracion:>8,.0f} req/s  p50 {statistics.median(latencias):6.1f} ms"
+          f"  p99 {latencias[int(len(latencias) * 0.99)]:6.1f} ms  {dict(sorted(estados.items()))}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--clientes', type=int, default=100)
+    parser.add_argument('--segundos', type=float, default=5)
+    parser.add_argument('--symbols', type=int, default=50)
+    parser.add_argument('--ticks', type=int, default=10_000, help="ticks por símbolo en la base")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(3)
+    symbols = [f'SYM{i}' for i in range(args.symbols)]
+    init_db()
+    poblar(symbols, args.ticks)
+
+    servidor = ServidorAPI(puerto=0)
+    servidor.start()
+    base = f'http://127.0.0.1:{servidor.puerto}'
+    detener = threading.Event()
+
+    def monitor():
+        # Un análisis nuevo por segundo invalida las respuestas cacheadas
+        while not detener.is_set():
+            ahora = int(time.time())
+            servidor.publicar(time.strftime('%Y-%m-%d %H:%M:%S'), ahora,
+                              [resultado(s, float(rng.uniform(1, 1000)), rng) for s in symbols])
+            detener.wait(1.0)
+
+    hilo = threading.Thread(target=monitor, daemon=True)
+    hilo.start()
+    print(f"{args.clientes} clientes concurrentes, {args.segundos:g} s por escenario, "
+          f"{args.symbols} símbolos")
+    try:
+        for ruta, condicional in (('/api/precios', False), ('/api/precios', True),
+                                  ('/api/precios/SYM1', False), ('/api/indicadores/SYM1', True),
+                                  ('/api/historial/SYM1?limite=100', False)):
+            asyncio.run(escenario(base, ruta, args.clientes, args.segundos, condicional))
+    finally:
+        detener.set()
+        servidor.stop()
+
+if __name__ == "__main__":
+    main()
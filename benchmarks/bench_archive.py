@@ -0,0 +1,74 @@
+"""
+Benchmark del archivo columnar frente a leer los ticks desde SQLite.
+
+Uso (desde la raíz del proyecto):
+    python -m benchmarks.bench_archive [--symbols 5] [--dias 365]
+"""
+import argparse
+import os
+import tempfile
+import time
+from pathlib import Path
+
+_tmp = tempfile.TemporaryDirectory()
+os.environ['DB_PATH'] = str(Path(_tmp.name) / 'bench.db')
+
+import numpy as np
+import pandas as pd
+
+from database.archive import ArchivoPrecios, compactar
+from database.connection import get_db_connection, init_db
+
+def poblar(symbols: int, dias: int, seed: int = 13) -> int:
+    rng = np.random.default_rng(seed)
+    conn = get_db_connection()
+    ts = 1_600_000_000 + np.arange(dias * 24 * 60) * 60
+    for i in range(symbols):
+        precios = 100 * np.exp(np.cumsum(rng.normal(0, 0.001, len(ts))))
+        with conn:
+            conn.executemany('INSERT INTO crypto_precios (symbol, ts, price) VALUES (?, ?, ?)',
+                             zip([f'SYM{i}'] * len(ts), ts.tolist(), precios.tolist()))
+    return int(ts[-1]) + 60
+
+def medir(funcion, repeticiones: int = 5) -> float:
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        funcion()
+    return (time.perf_counter() - inicio) * 1000 / repeticiones
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--symbols', type=int, default=5)
+    parser.add_argument('--dias', type=int, default=365)
+    args = parser.parse_args()
+
+    init_db()
+    print(f"Generando {args.symbols} símbolos x {args.dias} días de ticks de 1 minuto...")
+    fin = poblar(args.symbols, args.dias)
+    directorio = Path(_tmp.name) / 'archivo'
+
+    inicio = time.perf_counter()
+    total = compactar(fin, directorio, borrar=False)
+    duracion = time.perf_counter() - inicio
+    print(f"Compactación: {total:,} ticks en {duracion:.1f} s ({total / duracion:,.0f} ticks/s)")
+
+    archivo = ArchivoPrecios(directorio)
+    conn = get_db_connection()
+    print(f"{'rango':>10} {'SQLite + pandas (ms)':>22} {'archivo (ms)':>14} {'mejora':>9}")
+    for dias in (1, 30, 90, args.dias):
+        desde = fin - dias * 86400
+        sql_ms = medir(lambda: pd.read_sql_query(
+            'SELECT ts, price FROM crypto_precios WHERE symbol = ? AND ts >= ? AND ts < ?',
+            conn, params=('SYM0', desde, fin)), repeticiones=3)
+        # Incluye una pasada por los precios para medir también la lectura de las páginas
+        archivo_ms = medir(lambda: archivo.serie('SYM0', desde, fin)[1].sum())
+        print(f"{dias:>8} d {sql_ms:>22.1f} {archivo_ms:>14.2f} {sql_ms / archivo_ms:>8.0f}x")
+
+    inicio = time.perf_counter()
+    repetidos = compactar(fin, directorio)
+    restantes = conn.execute('SELECT COUNT(*) FROM crypto_precios').fetchone()[0]
+    print(f"Segunda compactación con borrado: {repetidos} ticks nuevos, "
+          f"{restantes} filas en SQLite, {time.perf_counter() - inicio:.1f} s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Benchmark del backtest vectorizado sobre años de barras de 1 minuto.
+
+Compara el tiempo total con el de la estrategia en pandas barra a barra
+(`benchmarks/referencia_pandas.py`, medido sobre una muestra y extrapolado)
+y verifica que ambas rutas coincidan en las barras de la muestra, tanto las
+acciones como el filtro de tendencia (sobre una serie aparte con tramos de
+deriva y `--umbral-tendencia`, más bajo que el del monitor, para que la
+muestra tenga tendencias).
+
+Uso (desde la raíz del proyecto):
+    python -m benchmarks.bench_backtest [--anios 3] [--muestra 2000]
+                                        [--umbral-tendencia 0.001]
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from config.settings import HISTORY_LIMIT
+from benchmarks import referencia_pandas
+from utils.backtest import backtest, senales_historicas, tendencia_alcista
+from utils.indicator_registry import ACCIONES
+
+def serie_sintetica(barras: int, seed: int = 11) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    return 100 * np.exp(np.cumsum(rng.normal(0, 0.002, barras)))
+
+def serie_con_tendencias(barras: int, seed: int = 12) -> np.ndarray:
+    """Tramos de 300 barras con deriva de ±0.15% por barra y poco ruido."""
+    rng = np.random.default_rng(seed)
+    deriva = np.repeat(rng.choice([-0.0015, 0.0, 0.0015], barras // 300 + 1), 300)[:barras]
+    return 100 * np.exp(np.cumsum(deriva + rng.normal(0, 0.0003, barras)))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--anios', type=float, default=3)
+    parser.add_argument('--muestra', type=int, default=2000)
+    parser.add_argument('--umbral-tendencia', type=float, default=0.001)
+    args = parser.parse_args()
+
+    barras = int(args.anios * 365 * 24 * 60)
+    precios = serie_sintetica(barras)
+    print(f"Serie: {barras:,} barras de 1 minuto ({args.anios:g} años)")
+
+    inicio = time.perf_counter()
+    acciones = senales_historicas(precios)
+    senales_s = time.perf_counter() - inicio
+    inicio = time.perf_counter()
+    resultado = backtest(precios)
+    total_s = time.perf_counter() - inicio
+    print(f"Señales: {senales_s:.2f} s; backtest completo: {total_s:.2f} s")
+    for clave, valor in resultado.resumen().items():
+        print(f"  {clave}: {valor:,.2f}" if isinstance(valor, float) else f"  {clave}: {valor}")
+
+    rng = np.random.default_rng(0)
+    indices = rng.integers(HISTORY_LIMIT - 1, barras, args.muestra)
+    inicio = time.perf_counter()
+    esperadas = [referencia_pandas.generar_recomendacion(precios[i - HISTORY_LIMIT + 1:i + 1])
+                 for i in indices]
+    por_barra_s = (time.perf_counter() - inicio) / args.muestra
+    diferencias = sum(r['accion'] != ACCIONES[acciones[i]] for r, i in zip(esperadas, indices))
+    print(f"Barra a barra (pandas): {por_barra_s * 1000:.2f} ms/barra, estimado "
+          f"{por_barra_s * barras / 3600:.1f} h para la serie "
+          f"({por_barra_s * barras / total_s:,.0f}x); diferencias en la muestra: {diferencias}")
+
+    tendencias = serie_con_tendencias(barras)
+    alcista = tendencia_alcista(tendencias, umbral_tendencia=args.umbral_tendencia)
+    esperadas = []
+    for i in indices:
+        ventana = pd.Series(tendencias[i - HISTORY_LIMIT + 1:i + 1])
+        hay, direccion = referencia_pandas.identificar_tendencia(
+            pd.DataFrame({'close': ventana, 'high': ventana, 'low': ventana}),
+            umbral_tendencia=args.umbral_tendencia)
+        esperadas.append(hay and direccion == 'alcista')
+    diferencias = sum(e != alcista[i] for e, i in zip(esperadas, indices))
+    print(f"Filtro de tendencia: {sum(esperadas)} barras alcistas en la muestra; "
+          f"diferencias: {diferencias}")
+
+if __name__ == "__main__":
+    main()
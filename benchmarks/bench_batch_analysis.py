@@ -0,0 +1,58 @@
+"""
+Benchmark de `analizar_lote()` frente al bucle de `generar_recomendacion()`.
+
+Las diferencias se cuentan contra la estrategia en pandas congelada en
+`benchmarks/referencia_pandas.py`, no contra `generar_recomendacion()`, que
+usa el mismo registro que `analizar_lote()`.
+
+Uso (desde la raíz del proyecto):
+    python -m benchmarks.bench_batch_analysis [--symbols 10 100 1000]
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks import referencia_pandas
+from config.settings import HISTORY_LIMIT
+from utils.batch_analysis import analizar_lote
+from utils.indicator_registry import ACCIONES
+from utils.technical_analysis import generar_recomendacion
+
+def _matriz(n_symbols: int, seed: int = 3) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    pasos = rng.normal(0, 0.01, (n_symbols, HISTORY_LIMIT))
+    return 100 * np.exp(np.cumsum(pasos, axis=1))
+
+def medir(n_symbols: int) -> None:
+    matriz = _matriz(n_symbols)
+
+    inicio = time.perf_counter()
+    recomendaciones = [generar_recomendacion(pd.DataFrame({'price': fila})) for fila in matriz]
+    bucle_ms = (time.perf_counter() - inicio) * 1000
+
+    repeticiones = 20
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        resultado = analizar_lote(matriz)
+    lote_ms = (time.perf_counter() - inicio) * 1000 / repeticiones
+
+    esperadas = [referencia_pandas.generar_recomendacion(fila) for fila in matriz]
+    diferencias = sum(r['accion'] != ACCIONES[a] or r['confianza'] != c
+                      for r, a, c in zip(esperadas, resultado['accion'],
+                                         resultado['confianza']))
+    print(f"{n_symbols:>9} {bucle_ms:>12.1f} {lote_ms:>10.2f} "
+          f"{bucle_ms / lote_ms:>8.0f}x {diferencias:>12}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--symbols', type=int, nargs='+', default=[10, 100, 1000])
+    args = parser.parse_args()
+
+    print(f"{'símbolos':>9} {'bucle (ms)':>12} {'lote (ms)':>10} {'mejora':>9} {'diferencias':>12}")
+    for n in args.symbols:
+        medir(n)
+
+if __name__ == "__main__":
+    main()
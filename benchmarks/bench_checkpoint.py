@@ -0,0 +1,125 @@
+"""
+Reinicio en frío contra reinicio desde checkpoint.
+
+Sobre un `MercadoSintetico` guarda en SQLite (en un directorio temporal)
+`--historial` ciclos de N símbolos, arma el estado del monitor como lo deja
+el primer ciclo (precarga de la caché y siembra de los indicadores) y lo
+guarda con `CheckpointPeriodico`. Mide:
+
+- frío: `PriceCache.warm_up()` y la siembra de cada `MotorIndicadores`;
+- checkpoint: la captura (lo que frena al ciclo), la escritura en el hilo de
+  fondo y el tamaño del archivo;
+- caliente: `restaurar()` del checkpoint de una salida normal, sin ticks
+  posteriores;
+- tras un corte: `restaurar()` después de guardar `--posteriores` ciclos más,
+  los que quedan en la base entre el último checkpoint y una caída (hasta
+  CHECKPOINT_INTERVAL / UPDATE_INTERVAL), que se reaplican.
+
+Verifica que las ventanas restauradas coinciden con las de la precarga en
+frío.
+
+Uso (desde la raíz del proyecto):
+    python -m benchmarks.bench_checkpoint [--symbols 100 1000 10000]
+                                          [--historial 200] [--posteriores 5]
+"""
+import argparse
+import logging
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Tuple
+
+_tmp = tempfile.TemporaryDirectory()
+os.environ['DB_PATH'] = str(Path(_tmp.name) / 'bench.db')
+
+import numpy as np
+
+from benchmarks.mercado import MercadoSintetico
+from config.settings import HISTORY_LIMIT, UPDATE_INTERVAL
+from database.connection import get_db_connection, init_db
+from database.operations import save_prices_bulk
+from utils.alert_rules import MotorAlertas
+from utils.checkpoint import CheckpointPeriodico
+from utils.price_cache import PriceCache
+from utils.streaming_indicators import MotorIndicadores
+
+def guardar(mercado: MercadoSintetico, ciclos: int, ts: int) -> int:
+    """Guarda `ciclos` ticks del mercado desde `ts`; retorna el ts siguiente."""
+    for fila in mercado.serie(ciclos).T:
+        save_prices_bulk(ts, dict(zip(mercado.bases, fila.tolist())))
+        ts += UPDATE_INTERVAL
+    return ts
+
+def arranque_frio(symbols):
+    """Precarga y siembra, como `main()` y el primer ciclo sin checkpoint."""
+    cache = PriceCache(HISTORY_LIMIT)
+    motores = {}
+    cache.warm_up(symbols)
+    for symbol in symbols:
+        motores[symbol] = MotorIndicadores()
+        motores[symbol].seed(cache.precios(symbol))
+    return cache, motores
+
+def restaurar(ruta: Path, symbols) -> Tuple[CheckpointPeriodico, float]:
+    checkpoint = CheckpointPeriodico(PriceCache(HISTORY_LIMIT), {},
+                                     MotorAlertas.desde_config(), ruta)
+    inicio = time.perf_counter()
+    restaurados = checkpoint.restaurar(symbols)
+    duracion = time.perf_counter() - inicio
+    assert restaurados == set(symbols), (len(restaurados), len(symbols))
+    return checkpoint, duracion
+
+def medir(n: int, historial: int, posteriores: int, directorio: Path) -> None:
+    mercado = MercadoSintetico(n, semilla=n)
+    ruta = directorio / f'estado_{n}.npz'
+    ts = int(time.time()) - (historial + posteriores) * UPDATE_INTERVAL
+    ts = guardar(mercado, historial, ts)
+
+    inicio = time.perf_counter()
+    cache, motores = arranque_frio(mercado.bases)
+    frio = time.perf_counter() - inicio
+
+    checkpoint = CheckpointPeriodico(cache, motores, MotorAlertas.desde_config(), ruta)
+    inicio = time.perf_counter()
+    captura = checkpoint.capturar()
+    captura_s = time.perf_counter() - inicio
+    inicio = time.perf_counter()
+    checkpoint.escribir(captura)
+    escritura_s = time.perf_counter() - inicio
+
+    _, caliente = restaurar(ruta, mercado.bases)
+    guardar(mercado, posteriores, ts)
+    restaurado, tras_corte = restaurar(ruta, mercado.bases)
+
+    cache_frio, _ = arranque_frio(mercado.bases)
+    for symbol in mercado.bases:
+        assert np.array_equal(restaurado.cache.precios(symbol), cache_frio.precios(symbol)), symbol
+    print(f"{n:>6} símbolos | frío {frio * 1000:8.1f} ms | captura {captura_s * 1000:6.1f} ms, "
+          f"escritura {escritura_s * 1000:6.1f} ms, {ruta.stat().st_size / 1e6:5.2f} MB | "
+          f"caliente {caliente * 1000:7.1f} ms ({frio / caliente:.1f}x) | "
+          f"tras corte {tras_corte * 1000:7.1f} ms")
+
+    conn = get_db_connection()
+    with conn:
+        conn.execute('DELETE FROM crypto_precios')
+        conn.execute('DELETE FROM velas_ohlcv')
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--symbols', type=int, nargs='+', default=[100, 1000, 10000])
+    parser.add_argument('--historial', type=int, default=HISTORY_LIMIT,
+                        help="ciclos guardados antes del checkpoint")
+    parser.add_argument('--posteriores', type=int, default=5,
+                        help="ciclos guardados después del checkpoint (se reaplican)")
+    args = parser.parse_args()
+
+    # El log por símbolo de la precarga domina el arranque en frío y llena la salida
+    logging.disable(logging.INFO)
+    init_db()
+    for n in args.symbols:
+        medir(n, args.historial, args.posteriores, Path(_tmp.name))
+
+if __name__ == "__main__":
+    main()
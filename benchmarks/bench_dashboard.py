@@ -0,0 +1,86 @@
+"""
+Benchmark del tablero de terminal: redibujado por diferencias vs completo.
+
+Simula ciclos en los que solo una fracción de los símbolos cambia de precio
+(como en modo websocket, donde muchos pares no operan entre análisis) y
+mide bytes escritos, celdas reescritas y tiempo por cuadro, comparado con
+redibujar la pantalla entera en cada ciclo. La salida va a un buffer en
+memoria con una terminal de tamaño fijo.
+
+Uso (desde la raíz del proyecto):
+    python -m benchmarks.bench_dashboard [--symbols 50] [--ciclos 500] [--cambios 0.2]
+"""
+import argparse
+import io
+import statistics
+import time
+
+import numpy as np
+
+from utils.dashboard import Dashboard, diferencias, lineas
+
+def resultado(symbol: str, precio: float, rng) -> dict:
+    rsi = float(rng.uniform(10, 90))
+    return {
+        'symbol': symbol,
+        'name': symbol.title(),
+        'price': precio,
+        'var_24h': float(rng.normal(0, 3)),
+        'recomendacion': {
+            'accion': ('COMPRAR', 'VENDER', 'MANTENER')[int(rng.integers(3))],
+            'confianza': int(rng.integers(-5, 6)),
+            'indicadores': {'rsi': rsi, 'macd': float(rng.normal(0, 1))},
+            'niveles': {'soporte': precio * 0.97, 'resistencia': precio * 1.03,
+                        'distancia_soporte': -3.0, 'distancia_resistencia': 3.0},
+        },
+        'alertas': [],
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--symbols', type=int, default=50)
+    parser.add_argument('--ciclos', type=int, default=500)
+    parser.add_argument('--cambios', type=float, default=0.2,
+                        help="fracción de símbolos que cambia en cada ciclo")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(5)
+    symbols = [f'SYM{i}' for i in range(args.symbols)]
+    precios = rng.uniform(1, 1000, args.symbols)
+    resultados = [resultado(s, float(p), rng) for s, p in zip(symbols, precios)]
+    tamano = (200, args.symbols + 30)
+
+    salida = io.StringIO()
+    dashboard = Dashboard(salida=salida, tamano_terminal=lambda: tamano)
+    publicar_us, cuadro_ms, completo_ms = [], [], []
+    bytes_completo = 0
+    for ciclo in range(args.ciclos):
+        resultados = list(resultados)
+        for i in np.flatnonzero(rng.random(args.symbols) < args.cambios):
+            precios[i] *= 1 + rng.normal(0, 0.002)
+            resultados[i] = resultado(symbols[i], float(precios[i]), rng)
+        timestamp = f'2024-01-01 00:{ciclo // 60 % 60:02d}:{ciclo % 60:02d}'
+
+        inicio = time.perf_counter()
+        dashboard.publicar(timestamp, resultados, 5)
+        publicar_us.append((time.perf_counter() - inicio) * 1e6)
+        inicio = time.perf_counter()
+        dashboard.dibujar()
+        cuadro_ms.append((time.perf_counter() - inicio) * 1000)
+
+        # Referencia: reescribir todas las celdas en cada ciclo
+        inicio = time.perf_counter()
+        completo, _, _ = diferencias([], lineas(timestamp, resultados, [], 5), *tamano)
+        completo_ms.append((time.perf_counter() - inicio) * 1000)
+        bytes_completo += len(completo)
+
+    print(f"{args.symbols} símbolos, {args.ciclos} ciclos, {args.cambios:.0%} cambian por ciclo")
+    print(f"publicar(): mediana {statistics.median(publicar_us):.1f} µs")
+    print(f"Por diferencias: {statistics.median(cuadro_ms):.2f} ms/cuadro, "
+          f"{dashboard.celdas_escritas / args.ciclos:,.0f} celdas y "
+          f"{dashboard.bytes_escritos / args.ciclos / 1024:,.1f} KiB por cuadro")
+    print(f"Completo:        {statistics.median(completo_ms):.2f} ms/cuadro, "
+          f"{bytes_completo / args.ciclos / 1024:,.1f} KiB por cuadro")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Benchmark de escritura: inserción fila a fila frente a `save_prices_bulk()`.
+
+Uso (desde la raíz del proyecto):
+    python -m benchmarks.bench_db_inserts [--ciclos 20]
+"""
+import argparse
+import os
+import sqlite3
+import tempfile
+import time
+from pathlib import Path
+
+_tmp = tempfile.TemporaryDirectory()
+os.environ['DB_PATH'] = str(Path(_tmp.name) / 'bench.db')
+
+from config.settings import DB_PATH
+from database.connection import init_db, close_db_connections
+from database.operations import save_prices_bulk
+
+TAMANOS = (10, 100, 1000)
+
+def _guardar_legacy(ts: int, symbol: str, price: float) -> None:
+    """Ruta original: conexión nueva y commit por cada fila."""
+    with sqlite3.connect(DB_PATH) as conn:
+        conn.execute('INSERT INTO crypto_precios (symbol, ts, price) VALUES (?, ?, ?)',
+                     (symbol, ts, price))
+        conn.commit()
+
+def _limpiar_tabla() -> None:
+    with sqlite3.connect(DB_PATH) as conn:
+        conn.execute('DELETE FROM crypto_precios')
+
+def medir(n_symbols: int, ciclos: int) -> dict:
+    """Retorna filas/seg de cada ruta para `n_symbols` símbolos por ciclo."""
+    precios = {f"SYM{i}": 100.0 + i for i in range(n_symbols)}
+    filas = n_symbols * ciclos
+
+    close_db_connections()
+    _limpiar_tabla()
+    inicio = time.perf_counter()
+    for ciclo in range(ciclos):
+        for symbol, price in precios.items():
+            _guardar_legacy(ciclo * 60, symbol, price)
+    legacy = filas / (time.perf_counter() - inicio)
+
+    _limpiar_tabla()
+    init_db()
+    inicio = time.perf_counter()
+    for ciclo in range(ciclos):
+        save_prices_bulk(ciclo * 60, precios)
+    bulk = filas / (time.perf_counter() - inicio)
+    close_db_connections()
+
+    return {'symbols': n_symbols, 'legacy': legacy, 'bulk': bulk}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--ciclos', type=int, default=20)
+    args = parser.parse_args()
+
+    init_db()
+    print(f"{'símbolos':>9} {'fila a fila (f/s)':>18} {'bulk (f/s)':>12} {'mejora':>8}")
+    for n in TAMANOS:
+        r = medir(n, args.ciclos)
+        print(f"{r['symbols']:>9} {r['legacy']:>18,.0f} {r['bulk']:>12,.0f} "
+              f"{r['bulk'] / r['legacy']:>7.1f}x")
+
+if __name__ == "__main__":
+    main()
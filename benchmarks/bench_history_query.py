@@ -0,0 +1,76 @@
+"""
+Benchmark de latencia de `get_price_history()` sobre una tabla sintética grande.
+
+Compara el esquema original (texto, sin índice) con el esquema v1
+(WITHOUT ROWID agrupado por (symbol, ts)).
+
+Uso (desde la raíz del proyecto):
+    python -m benchmarks.bench_history_query [--filas 2000000] [--symbols 20]
+"""
+import argparse
+import sqlite3
+import statistics
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+from database.migrations import FORMATO_TIMESTAMP, aplicar_migraciones
+
+CONSULTA_LEGACY = '''SELECT timestamp, price FROM crypto_precios
+                     WHERE symbol = ? ORDER BY timestamp DESC LIMIT ?'''
+CONSULTA_V1 = '''SELECT ts, price FROM crypto_precios
+                 WHERE symbol = ? ORDER BY ts DESC LIMIT ?'''
+
+def _filas(n_filas: int, n_symbols: int):
+    inicio = 1_600_000_000
+    for i in range(n_filas):
+        yield inicio + (i // n_symbols) * 60, f"SYM{i % n_symbols}", 100.0 + (i % 997)
+
+def crear_legacy(path: Path, n_filas: int, n_symbols: int) -> None:
+    conn = sqlite3.connect(path)
+    conn.execute('CREATE TABLE crypto_precios (timestamp TEXT, symbol TEXT, price REAL)')
+    conn.executemany('INSERT INTO crypto_precios VALUES (?, ?, ?)',
+                     ((datetime.fromtimestamp(ts).strftime(FORMATO_TIMESTAMP), s, p)
+                      for ts, s, p in _filas(n_filas, n_symbols)))
+    conn.commit()
+    conn.close()
+
+def medir(conn: sqlite3.Connection, consulta: str, n_symbols: int,
+          limite: int, repeticiones: int) -> float:
+    """Retorna la latencia mediana en milisegundos."""
+    tiempos = []
+    for i in range(repeticiones):
+        inicio = time.perf_counter()
+        conn.execute(consulta, (f"SYM{i % n_symbols}", limite)).fetchall()
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    return statistics.median(tiempos)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--filas', type=int, default=2_000_000)
+    parser.add_argument('--symbols', type=int, default=20)
+    parser.add_argument('--limite', type=int, default=50)
+    parser.add_argument('--repeticiones', type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / 'bench.db'
+        print(f"Generando {args.filas:,} filas para {args.symbols} símbolos...")
+        crear_legacy(path, args.filas, args.symbols)
+
+        conn = sqlite3.connect(path)
+        legacy = medir(conn, CONSULTA_LEGACY, args.symbols, args.limite, args.repeticiones)
+
+        inicio = time.perf_counter()
+        aplicar_migraciones(conn)
+        migracion = time.perf_counter() - inicio
+        v1 = medir(conn, CONSULTA_V1, args.symbols, args.limite, args.repeticiones)
+        conn.close()
+
+    print(f"Migración en el mismo archivo: {migracion:.1f} s")
+    print(f"Esquema original: {legacy:10.3f} ms por consulta")
+    print(f"Esquema v1:       {v1:10.3f} ms por consulta ({legacy / v1:,.0f}x)")
+
+if __name__ == "__main__":
+    main()
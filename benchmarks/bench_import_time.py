@@ -0,0 +1,94 @@
+"""
+Tiempo de importación de los módulos de entrada, con `python -X importtime`.
+
+Cada módulo se importa en un intérprete nuevo, con LAZY_IMPORTS=1 (pandas
+diferido, por defecto) y LAZY_IMPORTS=0; se reporta la mediana del tiempo
+acumulado del módulo según `-X importtime` y qué módulos pesados quedaron
+cargados. Es la verificación de arranque: importar `recomendaciones` o
+`crypto_monitor` no debe crear el cliente de Binance (ni importar
+python-binance) y, en modo diferido, tampoco importar pandas. Sale con
+código 1 si alguno lo hace o si supera `--maximo` ms.
+
+Uso (desde la raíz del proyecto):
+    python -m benchmarks.bench_import_time [--modulos recomendaciones crypto_monitor]
+                                           [--rondas 5] [--maximo 1000] [--detalle 10]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from typing import Dict, List, Set, Tuple
+
+RAIZ = Path(__file__).resolve().parent.parent
+PESADOS = ('binance', 'pandas')
+# Con LAZY_IMPORTS=0 pandas se importa al arrancar a propósito
+PROHIBIDOS = {'1': ('binance', 'pandas'), '0': ('binance',)}
+
+def importar(modulo: str, lazy: str, directorio: str) -> Tuple[float, List[Tuple[float, str]]]:
+    """
+    Importa `modulo` en un intérprete nuevo; retorna su tiempo acumulado en ms
+    y (ms acumulados, nombre) de cada módulo importado.
+    """
+    env = dict(os.environ, LAZY_IMPORTS=lazy, DB_PATH=str(Path(directorio) / 'bench.db'))
+    proceso = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {modulo}'],
+                             cwd=RAIZ, env=env, capture_output=True, text=True)
+    if proceso.returncode != 0:
+        raise RuntimeError(f"import {modulo} falló:\n{proceso.stderr[-2000:]}")
+    filas = []
+    for linea in proceso.stderr.splitlines():
+        # "import time: self [us] | cumulative | imported package"
+        if not linea.startswith('import time:') or 'imported package' in linea:
+            continue
+        _, acumulado, nombre = linea[len('import time:'):].split('|')
+        filas.append((int(acumulado) / 1000, nombre.strip()))
+    total = next(ms for ms, nombre in reversed(filas) if nombre == modulo)
+    return total, filas
+
+def medir(modulo: str, lazy: str, rondas: int) -> Dict:
+    tiempos, cargados = [], set()
+    with tempfile.TemporaryDirectory() as directorio:
+        for _ in range(rondas):
+            total, filas = importar(modulo, lazy, directorio)
+            tiempos.append(total)
+            cargados |= {nombre.split('.')[0] for _, nombre in filas}
+    return {'mediana_ms': statistics.median(tiempos), 'minimo_ms': min(tiempos),
+            'pesados': sorted(cargados & set(PESADOS)), 'filas': filas}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--modulos', nargs='+', default=['recomendaciones', 'crypto_monitor'])
+    parser.add_argument('--rondas', type=int, default=5)
+    parser.add_argument('--maximo', type=float,
+                        help="ms máximos (mediana) para importar cada módulo en modo diferido")
+    parser.add_argument('--detalle', type=int, default=0,
+                        help="muestra los N módulos más lentos de la última importación")
+    args = parser.parse_args()
+
+    fallas: List[str] = []
+    print(f"{'módulo':<20} {'modo':<9} {'mediana ms':>10} {'mínimo ms':>10}  pesados cargados")
+    for modulo in args.modulos:
+        for lazy, modo in (('1', 'diferido'), ('0', 'completo')):
+            resultado = medir(modulo, lazy, args.rondas)
+            pesados: Set[str] = set(resultado['pesados'])
+            print(f"{modulo:<20} {modo:<9} {resultado['mediana_ms']:>10.1f} "
+                  f"{resultado['minimo_ms']:>10.1f}  {', '.join(sorted(pesados)) or '-'}")
+            for pesado in sorted(pesados & set(PROHIBIDOS[lazy])):
+                fallas.append(f"{modulo} ({modo}) importa {pesado}")
+            if lazy == '1' and args.maximo is not None and resultado['mediana_ms'] > args.maximo:
+                fallas.append(f"{modulo} tarda {resultado['mediana_ms']:.1f} ms "
+                              f"(máximo {args.maximo:g})")
+            if args.detalle:
+                # La primera fila es el propio módulo
+                for ms, nombre in sorted(resultado['filas'], reverse=True)[1:args.detalle + 1]:
+                    print(f"    {ms:>8.1f} ms  {nombre}")
+
+    for falla in fallas:
+        print(f"FALLA: {falla}")
+    sys.exit(1 if fallas else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""
+Costo de la instrumentación en el análisis por símbolo.
+
+Repite el trabajo de `analizar_simbolos()` (caché, indicadores incrementales,
+recomendación y alertas) sobre símbolos sintéticos con la misma
+instrumentación que el monitor y mide:
+
+- el ciclo real con la instrumentación desactivada, activada y con el
+  perfilador por muestreo;
+- el mismo bucle con el análisis reemplazado por funciones vacías, activada
+  y desactivada: la diferencia es el costo propio de la instrumentación por
+  ciclo, que se compara con el ciclo real (la comparación directa de ciclos
+  reales queda dentro del ruido de la máquina);
+- el costo por muestra del perfilador, como fracción del intervalo.
+
+Uso (desde la raíz del proyecto):
+    python -m benchmarks.bench_instrumentation [--symbols 200] [--ciclos 200]
+"""
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from config.settings import HISTORY_LIMIT
+from utils.alert_rules import MotorAlertas, calcular_valores
+from utils.instrumentation import Instrumentacion, PerfiladorMuestreo
+from utils.price_cache import PriceCache
+from utils.streaming_indicators import MotorIndicadores
+from utils.technical_analysis import generar_recomendacion
+
+class _Vacio:
+    """Reemplazo de caché, motores y alertas: todo método retorna None."""
+
+    def __getattr__(self, nombre):
+        return lambda *args, **kwargs: None
+
+def _nada(*args):
+    return None
+
+def preparar(symbols, rng):
+    cache = PriceCache(HISTORY_LIMIT)
+    motores = {}
+    for symbol in symbols:
+        precios = 100 * np.exp(np.cumsum(rng.normal(0, 0.002, HISTORY_LIMIT)))
+        for ts, precio in enumerate(precios):
+            cache.buffer(symbol).append(ts, float(precio))
+        motores[symbol] = MotorIndicadores()
+        motores[symbol].seed(cache.precios(symbol))
+    return cache, motores
+
+def ciclo(inst: Instrumentacion, ts: int, precios, cache, motores, alertas,
+          recomendar=generar_recomendacion, valores_alertas=calcular_valores) -> None:
+    """Lo que hace `analizar_simbolos()` por ciclo, con los mismos puntos de medición."""
+    medir = inst.muestrear()
+    with inst.span('indicadores'):
+        cache.append_many(ts, precios)
+        for symbol, precio in precios.items():
+            motores[symbol].update(precio)
+    muestras = []
+    for symbol, precio in precios.items():
+        ventana = cache.precios(symbol)
+        if medir:
+            t0 = time.perf_counter_ns()
+        recomendacion = recomendar(ventana, motores[symbol])
+        if medir:
+            t1 = time.perf_counter_ns()
+        valores = valores_alertas(alertas.indicadores(symbol), precio, recomendacion, ventana)
+        alertas.evaluar(symbol, valores, ts)
+        if medir:
+            muestras.append((symbol, t1 - t0, time.perf_counter_ns() - t1))
+    inst.registrar_simbolos(('recomendacion', 'alertas'), muestras)
+    inst.ciclos += 1
+
+def real(inst: Instrumentacion, symbols, ciclos: int, semilla: int) -> float:
+    """ms promedio por ciclo con el análisis real."""
+    rng = np.random.default_rng(semilla)
+    cache, motores = preparar(symbols, rng)
+    alertas = MotorAlertas.desde_config()
+    ultimos = {s: float(cache.precios(s)[-1]) for s in symbols}
+    total = 0.0
+    for ts in range(HISTORY_LIMIT, HISTORY_LIMIT + ciclos):
+        for s in symbols:
+            ultimos[s] *= 1 + rng.normal(0, 0.002)
+        inicio = time.perf_counter()
+        ciclo(inst, ts, ultimos, cache, motores, alertas)
+        total += time.perf_counter() - inicio
+    return total / ciclos * 1000
+
+def vacio(inst: Instrumentacion, symbols, ciclos: int) -> float:
+    """ms promedio por ciclo con el análisis reemplazado por funciones vacías."""
+    nulo = _Vacio()
+    precios = {s: 1.0 for s in symbols}
+    motores = {s: nulo for s in symbols}
+    inicio = time.perf_counter()
+    for ts in range(ciclos):
+        ciclo(inst, ts, precios, nulo, motores, nulo, _nada, _nada)
+    return (time.perf_counter() - inicio) / ciclos * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--symbols', type=int, default=200)
+    parser.add_argument('--ciclos', type=int, default=200)
+    parser.add_argument('--rondas', type=int, default=3, help="se toma la mejor de cada medición")
+    args = parser.parse_args()
+
+    symbols = [f'SYM{i}' for i in range(args.symbols)]
+    directorio = tempfile.TemporaryDirectory()
+    tiempos = {'real desactivada': [], 'real activada': [], 'real con perfilador': [],
+               'vacío desactivada': [], 'vacío activada': []}
+    perfilador = None
+    # Rondas intercaladas para que el ruido de la máquina afecte a todos por igual
+    for ronda in range(args.rondas):
+        tiempos['real desactivada'].append(real(Instrumentacion(activa=False), symbols,
+                                                args.ciclos, ronda))
+        inst = Instrumentacion(activa=True)
+        tiempos['real activada'].append(real(inst, symbols, args.ciclos, ronda))
+        perfilador = PerfiladorMuestreo(Path(directorio.name) / 'perfil.folded')
+        perfilador.start()
+        tiempos['real con perfilador'].append(real(Instrumentacion(activa=False), symbols,
+                                                   args.ciclos, ronda))
+        perfilador.stop()
+        tiempos['vacío desactivada'].append(vacio(Instrumentacion(activa=False), symbols,
+                                                  args.ciclos * 5))
+        tiempos['vacío activada'].append(vacio(Instrumentacion(activa=True), symbols,
+                                               args.ciclos * 5))
+
+    mejor = {nombre: min(t) for nombre, t in tiempos.items()}
+    print(f"{args.symbols} símbolos, {args.ciclos} ciclos, mejor de {args.rondas} rondas")
+    for nombre, ms in mejor.items():
+        print(f"{nombre:<20} {ms:8.3f} ms/ciclo")
+    costo = mejor['vacío activada'] - mejor['vacío desactivada']
+    print(f"Costo de la instrumentación: {costo * 1000:.1f} µs/ciclo = "
+          f"{costo / mejor['real desactivada']:.2%} del ciclo real")
+    print(f"Perfilador: {perfilador.muestras} muestras, "
+          f"{perfilador.costo_s / max(perfilador.muestras, 1) * 1e6:.0f} µs c/u = "
+          f"{perfilador.costo_s / max(perfilador.muestras, 1) / perfilador.intervalo:.2%} "
+          f"de un núcleo cada {perfilador.intervalo * 1000:g} ms")
+    print("Reporte de la última ronda con análisis real:")
+    print('\n'.join(inst.reporte()))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Benchmark del mantenimiento: latencia del escritor mientras se borra.
+
+Llena la base con ticks viejos, ejecuta `ejecutar_mantenimiento()` y, en
+paralelo, guarda un ciclo de precios cada 10 ms como lo haría el monitor.
+Reporta cuánto tarda cada guardado durante el mantenimiento.
+
+Uso (desde la raíz del proyecto):
+    python -m benchmarks.bench_maintenance [--filas 2000000]
+"""
+import argparse
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+_tmp = tempfile.TemporaryDirectory()
+os.environ['DB_PATH'] = str(Path(_tmp.name) / 'bench.db')
+os.environ['ARCHIVE_DIR'] = str(Path(_tmp.name) / 'archivo')
+
+import numpy as np
+
+from config.settings import SUPPORTED_COINS
+from database.connection import get_db_connection, init_db
+from database.maintenance import ejecutar_mantenimiento
+from database.operations import save_prices_bulk
+
+def poblar(filas: int) -> None:
+    symbols = list(SUPPORTED_COINS)
+    por_symbol = filas // len(symbols)
+    inicio = int(time.time()) - 400 * 86400
+    ts = (inicio + np.arange(por_symbol) * 60).tolist()
+    conn = get_db_connection()
+    for symbol in symbols:
+        with conn:
+            conn.executemany('INSERT INTO crypto_precios (symbol, ts, price) VALUES (?, ?, ?)',
+                             zip([symbol] * por_symbol, ts, [100.0] * por_symbol))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--filas', type=int, default=2_000_000)
+    parser.add_argument('--sin-archivo', action='store_true', help="borrar sin archivar")
+    args = parser.parse_args()
+
+    init_db()
+    print(f"Generando {args.filas:,} ticks viejos...")
+    poblar(args.filas)
+
+    latencias = []
+    terminado = threading.Event()
+
+    def escritor():
+        ts = int(time.time())
+        while not terminado.is_set():
+            inicio = time.perf_counter()
+            save_prices_bulk(ts, {s: 1.0 for s in SUPPORTED_COINS})
+            latencias.append((time.perf_counter() - inicio) * 1000)
+            ts += 1
+            time.sleep(0.01)
+
+    hilo = threading.Thread(target=escritor)
+    hilo.start()
+    informe = ejecutar_mantenimiento(archivar=not args.sin_archivo)
+    terminado.set()
+    hilo.join()
+
+    latencias = np.array(latencias)
+    print(f"Antes:   {informe.antes}")
+    print(f"Después: {informe.despues}")
+    print(f"Archivados {informe.archivados:,}, borrados {informe.borrados}, "
+          f"{informe.duracion_s:.1f} s")
+    print(f"Escritor durante el mantenimiento: {len(latencias)} ciclos, "
+          f"p50 {np.percentile(latencias, 50):.2f} ms, p99 {np.percentile(latencias, 99):.2f} ms, "
+          f"máx {latencias.max():.2f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Benchmark del notificador contra un webhook local de prueba.
+
+Levanta un servidor aiohttp en 127.0.0.1 que responde con demora y falla una
+fracción de los pedidos, más un socket sin nadie escuchando (destino caído) y
+un archivo. Mide cuánto tarda `publicar()` (lo que pagaría el ciclo del
+monitor) y, por destino, la latencia de entrega, los reintentos y los
+descartes.
+
+Uso (desde la raíz del proyecto):
+    python -m benchmarks.bench_notifier [--alertas 5000] [--demora 0.05] [--fallos 0.2]
+"""
+import argparse
+import asyncio
+import random
+import socket
+import statistics
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from aiohttp import web
+
+from utils.notifier import ArchivoSink, Notificador, SocketSink, WebhookSink
+
+class WebhookPrueba:
+    """Servidor HTTP en un hilo propio que cuenta las alertas recibidas."""
+
+    def __init__(self, demora: float, fallos: float):
+        self.demora = demora
+        self.fallos = fallos
+        self.recibidas = 0
+        self.puerto = 0
+        self._loop = asyncio.new_event_loop()
+        self._listo = threading.Event()
+        self._hilo = threading.Thread(target=self._run, daemon=True)
+
+    async def _recibir(self, request: web.Request) -> web.Response:
+        lote = await request.json()
+        await asyncio.sleep(self.demora)
+        if random.random() < self.fallos:
+            return web.Response(status=503)
+        self.recibidas += len(lote)
+        return web.Response(status=204)
+
+    def _run(self) -> None:
+        asyncio.set_event_loop(self._loop)
+        app = web.Application()
+        app.router.add_post('/alertas', self._recibir)
+        runner = web.AppRunner(app, access_log=None)
+        self._loop.run_until_complete(runner.setup())
+        sitio = web.TCPSite(runner, '127.0.0.1', 0)
+        self._loop.run_until_complete(sitio.start())
+        self.puerto = sitio._server.sockets[0].getsockname()[1]
+        self._listo.set()
+        self._loop.run_forever()
+
+    def start(self) -> str:
+        self._hilo.start()
+        self._listo.wait()
+        return f'http://127.0.0.1:{self.puerto}/alertas'
+
+def puerto_libre() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--alertas', type=int, default=5000)
+    parser.add_argument('--por-segundo', type=float, default=500,
+                        help="ritmo de publicación")
+    parser.add_argument('--demora', type=float, default=0.05,
+                        help="segundos que tarda el webhook en responder")
+    parser.add_argument('--fallos', type=float, default=0.2,
+                        help="fracción de pedidos que el webhook rechaza")
+    parser.add_argument('--cola', type=int, default=1000)
+    args = parser.parse_args()
+
+    random.seed(7)
+    servidor = WebhookPrueba(args.demora, args.fallos)
+    url = servidor.start()
+    archivo = Path(tempfile.mkdtemp()) / 'alertas.jsonl'
+    notificador = Notificador(
+        [WebhookSink(url), ArchivoSink(archivo),
+         SocketSink(f'127.0.0.1:{puerto_libre()}', timeout=1.0)],
+        tamano_cola=args.cola, reintentos=3, espera_maxima=2.0)
+    notificador.start()
+
+    publicar_us = []
+    pausa = 1.0 / args.por_segundo
+    inicio = time.perf_counter()
+    for i in range(args.alertas):
+        evento = {'ts': time.time(), 'symbol': f'SYM{i % 300}', 'regla': 'bench',
+                  'valor': float(i), 'mensaje': f'alerta {i}'}
+        t = time.perf_counter()
+        notificador.publicar(evento)
+        publicar_us.append((time.perf_counter() - t) * 1e6)
+        espera = inicio + (i + 1) * pausa - time.perf_counter()
+        if espera > 0:
+            time.sleep(espera)
+    duracion = time.perf_counter() - inicio
+
+    publicar_us.sort()
+    print(f"{args.alertas:,} alertas publicadas en {duracion:.2f} s; publicar(): "
+          f"mediana {statistics.median(publicar_us):.1f} µs, "
+          f"p99 {publicar_us[int(len(publicar_us) * 0.99)]:.1f} µs, "
+          f"máx {publicar_us[-1]:.1f} µs")
+
+    inicio = time.perf_counter()
+    notificador.stop(timeout=30)
+    print(f"Parada (vaciado de colas): {time.perf_counter() - inicio:.2f} s")
+    for nombre, m in notificador.metricas().items():
+        print(f"  {nombre}: {m['enviados']:,} enviadas, {m['fallidos']:,} fallidas, "
+              f"{m['descartados']:,} descartadas, {m['reintentos']:,} reintentos, "
+              f"latencia prom {m['latencia_prom_ms']:.1f} ms / máx {m['latencia_max_ms']:.1f} ms")
+    lineas = sum(1 for _ in open(archivo)) if archivo.exists() else 0
+    print(f"Webhook recibió {servidor.recibidas:,}; archivo con {lineas:,} líneas")
+
+if __name__ == "__main__":
+    main()
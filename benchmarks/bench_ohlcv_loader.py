@@ -0,0 +1,76 @@
+"""
+Benchmark del cargador masivo de velas OHLCV.
+
+Genera un volcado CSV con el formato de klines de Binance, lo carga con
+`cargar_velas()` y reporta filas/segundo y memoria máxima del proceso.
+
+Uso (desde la raíz del proyecto):
+    python -m benchmarks.bench_ohlcv_loader [--filas 20000000]
+"""
+import argparse
+import os
+import resource
+import tempfile
+import time
+from pathlib import Path
+
+_tmp = tempfile.TemporaryDirectory()
+os.environ['DB_PATH'] = str(Path(_tmp.name) / 'bench.db')
+
+import numpy as np
+
+from database.connection import get_db_connection, init_db
+from database.ohlcv_loader import cargar_velas
+from database.operations import get_velas
+
+def generar_csv(ruta: Path, filas: int, bloque: int = 1_000_000, seed: int = 5) -> None:
+    """Escribe `filas` klines de 1 minuto sin encabezado, como los volcados de Binance."""
+    rng = np.random.default_rng(seed)
+    precio = 100.0
+    inicio_ms = 1_500_000_000_000
+    with open(ruta, 'w') as f:
+        for desde in range(0, filas, bloque):
+            n = min(bloque, filas - desde)
+            cierre = precio * np.exp(np.cumsum(rng.normal(0, 0.001, n)))
+            apertura = np.r_[precio, cierre[:-1]]
+            precio = cierre[-1]
+            ts = inicio_ms + (desde + np.arange(n)) * 60_000
+            high = np.maximum(apertura, cierre) * 1.0005
+            low = np.minimum(apertura, cierre) * 0.9995
+            volumen = rng.exponential(10, n)
+            datos = np.column_stack([ts, apertura, high, low, cierre, volumen, ts + 59_999])
+            np.savetxt(f, datos, fmt=['%d', '%.8f', '%.8f', '%.8f', '%.8f', '%.4f', '%d'],
+                       delimiter=',')
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--filas', type=int, default=20_000_000)
+    parser.add_argument('--lote', type=int, default=100_000)
+    args = parser.parse_args()
+
+    init_db()
+    ruta = Path(_tmp.name) / 'klines.csv'
+    print(f"Generando {args.filas:,} velas...")
+    generar_csv(ruta, args.filas)
+    print(f"Archivo: {ruta.stat().st_size / 2**20:,.0f} MiB")
+
+    inicio = time.perf_counter()
+    cargadas = cargar_velas(ruta, 'BTC', 60, args.lote)
+    duracion = time.perf_counter() - inicio
+    rss_mib = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"Carga: {cargadas:,} filas en {duracion:.1f} s "
+          f"({cargadas / duracion:,.0f} filas/s), memoria máxima {rss_mib:,.0f} MiB")
+
+    inicio = time.perf_counter()
+    repetidas = cargar_velas(ruta, 'BTC', 60, args.lote)
+    print(f"Segunda carga (idempotente): {repetidas} filas en "
+          f"{(time.perf_counter() - inicio) * 1000:.1f} ms")
+
+    total = get_db_connection().execute('SELECT COUNT(*) FROM velas_ohlcv').fetchone()[0]
+    inicio = time.perf_counter()
+    diarias = get_velas('BTC', 86400, limit=30)
+    print(f"Total en la tabla: {total:,}; últimas 30 velas diarias en "
+          f"{(time.perf_counter() - inicio) * 1000:.1f} ms ({len(diarias)} filas)")
+
+if __name__ == "__main__":
+    main()
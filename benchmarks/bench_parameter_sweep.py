@@ -0,0 +1,51 @@
+"""
+Benchmark del barrido de parámetros: escalado con el número de procesos.
+
+Uso (desde la raíz del proyecto):
+    python -m benchmarks.bench_parameter_sweep [--dias 180] [--variantes 32] [--procesos 1 2 4]
+"""
+import argparse
+import os
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from utils.parameter_sweep import ESPACIO_DEFECTO, aleatorio, barrer, leer_resultados
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--dias', type=int, default=180)
+    parser.add_argument('--variantes', type=int, default=32)
+    parser.add_argument('--procesos', type=int, nargs='+')
+    args = parser.parse_args()
+
+    procesos = args.procesos or sorted({1, 2, 4, os.cpu_count() or 1})
+    rng = np.random.default_rng(21)
+    cierres = 100 * np.exp(np.cumsum(rng.normal(0, 0.002, args.dias * 24 * 60)))
+    print(f"Serie: {len(cierres):,} barras ({cierres.nbytes / 2**20:.1f} MiB), "
+          f"{args.variantes} variantes, {os.cpu_count()} núcleos")
+    print(f"{'procesos':>9} {'tiempo (s)':>11} {'variantes/s':>12} {'aceleración':>12}")
+
+    with tempfile.TemporaryDirectory() as directorio:
+        base = None
+        for n in procesos:
+            salida = Path(directorio) / f'barrido_{n}.jsonl'
+            variantes = list(aleatorio(ESPACIO_DEFECTO, args.variantes))
+            inicio = time.perf_counter()
+            barrer(cierres, variantes, salida, procesos=n)
+            duracion = time.perf_counter() - inicio
+            base = base or duracion
+            print(f"{n:>9} {duracion:>11.2f} {args.variantes / duracion:>12.2f} "
+                  f"{base / duracion:>11.2f}x")
+
+        inicio = time.perf_counter()
+        repetidas = barrer(cierres, variantes, salida, procesos=procesos[-1])
+        print(f"Reanudación sobre un barrido completo: {repetidas} variantes evaluadas "
+              f"en {(time.perf_counter() - inicio) * 1000:.0f} ms")
+        mejor = leer_resultados(salida)[0]
+        print(f"Mejor variante: {mejor['pnl_pct']:.2f}% {mejor['params']}")
+
+if __name__ == "__main__":
+    main()
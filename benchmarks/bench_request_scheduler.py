@@ -0,0 +1,150 @@
+"""
+Benchmark del planificador de peticiones contra un exchange simulado.
+
+`ExchangeSimulado` imita las reglas de peso de Binance con la ventana
+comprimida a `--periodo` segundos: cada endpoint suma su peso, pasar el
+límite responde 429 con Retry-After y varios 429 seguidos bloquean la IP
+(418). Además falla con 5xx al azar. Varios hilos (como los shards más
+consultas sueltas) piden precios en bucle, primero con el cliente directo y
+después a través de `ClienteProgramado`; se reportan respuestas útiles,
+peticiones que llegaron al exchange, 429/418 y los contadores del
+planificador.
+
+Uso (desde la raíz del proyecto):
+    python -m benchmarks.bench_request_scheduler [--hilos 16] [--segundos 5]
+"""
+import argparse
+import collections
+import random
+import threading
+import time
+from types import SimpleNamespace
+
+from utils.request_scheduler import (
+    PRIORIDAD_ALTA, PRIORIDAD_NORMAL, ClienteProgramado, PlanificadorPedidos
+)
+
+class ErrorAPI(Exception):
+    def __init__(self, status_code: int, retry_after: float = 0):
+        super().__init__(f'HTTP {status_code}')
+        self.status_code = status_code
+        self.response = SimpleNamespace(headers={'Retry-After': str(retry_after)})
+
+class ExchangeSimulado:
+    """Cliente falso con límite de peso por ventana, bloqueo de IP y errores 5xx."""
+
+    def __init__(self, limite: int, periodo: float, fallos: float = 0.02, latencia: float = 0.003):
+        self.limite = limite
+        self.periodo = periodo
+        self.fallos = fallos
+        self.latencia = latencia
+        self.response = None
+        self.contadores = collections.Counter()
+        self._pesos = collections.deque()
+        self._usado = 0
+        self._seguidos = 0
+        self._bloqueo_hasta = 0.0
+        self._lock = threading.Lock()
+        self._rng = random.Random(1)
+
+    def _pedido(self, peso: int) -> None:
+        time.sleep(self.latencia)
+        with self._lock:
+            ahora = time.monotonic()
+            self.contadores['pedidos'] += 1
+            if ahora < self._bloqueo_hasta:
+                self.contadores['418'] += 1
+                raise ErrorAPI(418, self._bloqueo_hasta - ahora)
+            while self._pesos and self._pesos[0][0] <= ahora - self.periodo:
+                self._usado -= self._pesos.popleft()[1]
+            self._pesos.append((ahora, peso))
+            self._usado += peso
+            if self._usado > self.limite:
+                self._seguidos += 1
+                if self._seguidos >= 3:
+                    self._bloqueo_hasta = ahora + 2 * self.periodo
+                self.contadores['429'] += 1
+                raise ErrorAPI(429, self.periodo / 2)
+            self._seguidos = 0
+            if self._rng.random() < self.fallos:
+                self.contadores['5xx'] += 1
+                raise ErrorAPI(503)
+            self.response = SimpleNamespace(headers={'x-mbx-used-weight-1m': str(self._usado)})
+
+    def get_all_tickers(self):
+        self._pedido(4)
+        return [{'symbol': f'C{i}USDT', 'price': '1.0'} for i in range(100)]
+
+    def get_symbol_ticker(self, symbol: str):
+        self._pedido(2)
+        return {'symbol': symbol, 'price': '1.0'}
+
+def carga(cliente, hilos: int, segundos: float) -> collections.Counter:
+    """Mitad de los hilos pide todos los tickers, la otra mitad tickers sueltos."""
+    resultado = collections.Counter()
+    lock = threading.Lock()
+    hasta = time.monotonic() + segundos
+
+    def trabajar(i: int) -> None:
+        while time.monotonic() < hasta:
+            try:
+                if i % 2:
+                    cliente.get_symbol_ticker(symbol=f'C{i}USDT')
+                else:
+                    cliente.get_all_tickers()
+                clave = 'ok'
+            except Exception as e:
+                clave = type(e).__name__
+            with lock:
+                resultado[clave] += 1
+
+    trabajadores = [threading.Thread(target=trabajar, args=(i,)) for i in range(hilos)]
+    for t in trabajadores:
+        t.start()
+    for t in trabajadores:
+        t.join()
+    return resultado
+
+class Directo:
+    """Interfaz de `ClienteProgramado` sobre el cliente sin planificador."""
+
+    def __init__(self, client):
+        self.client = client
+
+    def get_all_tickers(self, prioridad=PRIORIDAD_ALTA):
+        return self.client.get_all_tickers()
+
+    def get_symbol_ticker(self, symbol, prioridad=PRIORIDAD_NORMAL):
+        return self.client.get_symbol_ticker(symbol)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--hilos', type=int, default=16)
+    parser.add_argument('--segundos', type=float, default=5)
+    parser.add_argument('--periodo', type=float, default=1.0, help="ventana del límite (s)")
+    parser.add_argument('--limite', type=int, default=200, help="peso por ventana")
+    parser.add_argument('--ttl', type=float, default=0.01, help="TTL de las respuestas (s)")
+    args = parser.parse_args()
+
+    print(f"{args.hilos} hilos, {args.segundos:g} s, límite {args.limite} de peso "
+          f"cada {args.periodo:g} s")
+    for nombre in ('directo', 'planificado'):
+        exchange = ExchangeSimulado(args.limite, args.periodo)
+        if nombre == 'directo':
+            cliente = Directo(exchange)
+        else:
+            # Como RATE_LIMIT_WEIGHT: 80% del límite del exchange
+            planificador = PlanificadorPedidos(args.limite * 0.8, args.periodo,
+                                               espera_maxima=args.periodo, max_espera=args.segundos)
+            cliente = ClienteProgramado(exchange, planificador, ttl=args.ttl)
+        resultado = carga(cliente, args.hilos, args.segundos)
+        c = exchange.contadores
+        print(f"{nombre:<12} respuestas ok {resultado['ok']:>7,}  errores "
+              f"{sum(resultado.values()) - resultado['ok']:>6,}  | exchange: "
+              f"{c['pedidos']:>6,} pedidos, {c['429']:>5,} 429, {c['418']:>5,} 418, "
+              f"{c['5xx']:>4,} 5xx")
+        if nombre == 'planificado':
+            print(f"{'':<12} {planificador.metricas()}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+Microbenchmark del motor incremental frente al recálculo de la ventana.
+
+Verifica primero que cada indicador incremental coincide con su versión en
+pandas sobre una serie completa, y que `MotorIndicadores` decide tick a tick
+lo mismo que la ventana de HISTORY_LIMIT precios evaluada con el registro
+(`analizar_lote()`) y con la referencia en pandas
+(`benchmarks/referencia_pandas.py`). Después mide el costo por tick.
+
+Uso (desde la raíz del proyecto):
+    python -m benchmarks.bench_streaming_indicators [--ticks 2000]
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks import referencia_pandas
+from config.settings import HISTORY_LIMIT, MACD_FAST, MACD_SLOW, MACD_SIGNAL
+from utils.batch_analysis import analizar_lote
+from utils.indicator_registry import ACCIONES
+from utils.streaming_indicators import (
+    ATR, EMA, MACD, RSI, EstadisticasMoviles, MotorIndicadores
+)
+from utils.technical_analysis import calcular_indicadores, generar_recomendacion
+
+TOLERANCIA = 1e-8
+
+def _serie(n: int, seed: int = 7) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    return 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+
+def _stream(indicador, valores, attr='value'):
+    salida = np.empty(len(valores))
+    for i, x in enumerate(valores):
+        indicador.update(x)
+        salida[i] = getattr(indicador, attr)
+    return salida
+
+def _error(a, b) -> float:
+    a, b = np.asarray(a, dtype=float), np.asarray(b, dtype=float)
+    if not np.array_equal(np.isnan(a), np.isnan(b)):
+        return float('inf')
+    mascara = ~np.isnan(a)
+    return float(np.max(np.abs(a[mascara] - b[mascara]) / np.maximum(1.0, np.abs(b[mascara]))))
+
+def verificar(n: int) -> None:
+    precios = _serie(n)
+    s = pd.Series(precios)
+    delta = s.diff()
+    gain, loss = delta.clip(lower=0), -delta.clip(upper=0)
+
+    wilder = 100 - 100 / (1 + gain.ewm(alpha=1 / 14, adjust=False).mean()
+                          / loss.ewm(alpha=1 / 14, adjust=False).mean())
+    simple = 100 - 100 / (1 + gain.rolling(14).mean() / loss.rolling(14).mean())
+    macd = s.ewm(span=MACD_FAST).mean() - s.ewm(span=MACD_SLOW).mean()
+    high, low = s * 1.001, s * 0.999
+    tr = np.maximum(high - low, np.maximum(abs(high - s.shift(1)), abs(low - s.shift(1))))
+
+    stats = EstadisticasMoviles(HISTORY_LIMIT)
+    medias, stds, minimos, maximos = np.empty((4, n))
+    for i, x in enumerate(precios):
+        stats.update(x)
+        medias[i], stds[i] = stats.media, stats.std
+        minimos[i], maximos[i] = stats.minimo, stats.maximo
+    atr = ATR(14)
+    atr_stream = np.array([atr.update(h, l, c) for h, l, c in zip(high, low, s)])
+    macd_stream = MACD()
+    pares = np.array([macd_stream.update(x) for x in precios])
+
+    resultados = {
+        'EMA(12)': _error(_stream(EMA(12), precios), s.ewm(span=12).mean()),
+        'EMA(12, adjust=False)': _error(_stream(EMA(12, adjust=False), precios),
+                                        s.ewm(span=12, adjust=False).mean()),
+        'RSI Wilder': _error(_stream(RSI(14, wilder=True), precios), wilder),
+        'RSI simple': _error(_stream(RSI(14, wilder=False), precios), simple),
+        'MACD': _error(pares[:, 0], macd),
+        'Señal MACD': _error(pares[:, 1], macd.ewm(span=MACD_SIGNAL).mean()),
+        'ATR': _error(atr_stream, tr.rolling(14).mean()),
+        'Media móvil': _error(medias, s.rolling(HISTORY_LIMIT, min_periods=1).mean()),
+        'Desv. estándar': _error(stds, s.rolling(HISTORY_LIMIT, min_periods=2).std()),
+        'Mínimo móvil': _error(minimos, s.rolling(HISTORY_LIMIT, min_periods=1).min()),
+        'Máximo móvil': _error(maximos, s.rolling(HISTORY_LIMIT, min_periods=1).max()),
+    }
+    print(f"Error relativo máximo sobre {n:,} ticks (tolerancia {TOLERANCIA:g}):")
+    for nombre, error in resultados.items():
+        estado = 'OK' if error <= TOLERANCIA else 'FALLA'
+        print(f"  {nombre:<24} {error:10.2e}  {estado}")
+
+def verificar_motor(n: int) -> None:
+    """Acción y confianza del motor contra la ventana, tick a tick."""
+    precios = _serie(n, seed=5)
+    print(f"\nMotorIndicadores contra la ventana de {HISTORY_LIMIT} sobre {n:,} ticks:")
+    for wilder in (False, True):
+        motor = MotorIndicadores(rsi_wilder=wilder)
+        registro = pandas = 0
+        for i, precio in enumerate(precios):
+            motor.update(precio)
+            if i < 1:
+                continue
+            ventana = precios[max(0, i + 1 - HISTORY_LIMIT):i + 1]
+            recomendacion = generar_recomendacion(ventana, motor)
+            lote = analizar_lote(ventana.reshape(1, -1), rsi_wilder=wilder)[0]
+            registro += (recomendacion['accion'] != ACCIONES[int(lote['accion'])]
+                         or recomendacion['confianza'] != int(lote['confianza']))
+            if not wilder:
+                referencia = referencia_pandas.generar_recomendacion(ventana)
+                pandas += (recomendacion['accion'] != referencia['accion']
+                           or recomendacion['confianza'] != referencia['confianza'])
+        estado = 'OK' if registro == 0 and pandas == 0 else 'FALLA'
+        detalle = f", contra pandas {pandas}" if not wilder else ""
+        print(f"  RSI {'Wilder' if wilder else 'simple':<7} diferencias contra el registro "
+              f"{registro}{detalle}  {estado}")
+
+def medir(ticks: int) -> None:
+    precios = _serie(ticks + HISTORY_LIMIT, seed=11)
+
+    inicio = time.perf_counter()
+    for i in range(HISTORY_LIMIT, len(precios)):
+        calcular_indicadores(pd.Series(precios[i - HISTORY_LIMIT:i]))
+    ventana_us = (time.perf_counter() - inicio) / ticks * 1e6
+
+    motor = MotorIndicadores()
+    motor.seed(precios[:HISTORY_LIMIT])
+    inicio = time.perf_counter()
+    for x in precios[HISTORY_LIMIT:]:
+        motor.update(x)
+        motor.indicadores()
+    motor_us = (time.perf_counter() - inicio) / ticks * 1e6
+
+    print(f"\nCosto por tick (ventana de {HISTORY_LIMIT}):")
+    print(f"  calcular_indicadores:        {ventana_us:10.1f} µs")
+    print(f"  MotorIndicadores:            {motor_us:10.1f} µs ({ventana_us / motor_us:,.0f}x)")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--ticks', type=int, default=2000)
+    args = parser.parse_args()
+    verificar(10_000)
+    verificar_motor(3_000)
+    medir(args.ticks)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Benchmark del universo de símbolos repartido en shards.
+
+Arma un universo de varios miles de pares en exchanges simulados
+(`AdaptadorSimulado`: latencia fija por petición y un máximo de pares por
+petición) y mide:
+
+- tiempo de obtención por ciclo con 1, 2, 4 y 8 workers;
+- pares movidos al agregar/quitar un worker (lo ideal con HRW es 1/n) y al
+  agregar/quitar pares en ejecución (solo esos pares);
+- que cada par quede asignado a exactamente un shard y reciba su precio.
+
+Uso (desde la raíz del proyecto):
+    python -m benchmarks.bench_universe [--pares 3000] [--latencia 0.02] [--ciclos 5]
+"""
+import argparse
+import statistics
+import time
+
+from utils.symbol_universe import AdaptadorSimulado, Par, ShardPool, UniversoSimbolos
+
+QUOTES = {'simex': ('USDT', 'BTC', 'ETH'), 'fakex': ('USD', 'EUR')}
+
+def adaptadores(pares: int, latencia: float):
+    resultado = {}
+    for n, (nombre, quotes) in enumerate(QUOTES.items()):
+        bases = [f'C{i}' for i in range(pares // (len(QUOTES) * len(quotes)))]
+        resultado[nombre] = AdaptadorSimulado(nombre, [(b, q) for q in quotes for b in bases],
+                                              latencia=latencia, max_por_pedido=100, semilla=n)
+    return resultado
+
+def verificar(pool: ShardPool, universo: UniversoSimbolos) -> None:
+    reparto = pool.reparto()
+    assert sum(reparto.values()) == len(universo), reparto
+    assert all(pool.shard(id_) is not None for id_ in universo.ids())
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--pares', type=int, default=3000)
+    parser.add_argument('--latencia', type=float, default=0.02, help="segundos por petición")
+    parser.add_argument('--ciclos', type=int, default=5)
+    args = parser.parse_args()
+
+    exchanges = adaptadores(args.pares, args.latencia)
+    pares = [par for adaptador in exchanges.values() for par in adaptador.listar_pares()]
+    print(f"{len(pares):,} pares en {len(exchanges)} exchanges, {args.latencia * 1000:g} ms "
+          f"por petición de hasta 100 pares")
+
+    for workers in (1, 2, 4, 8):
+        universo = UniversoSimbolos(pares)
+        pool = ShardPool(universo, exchanges, workers)
+        verificar(pool, universo)
+        duraciones = []
+        for _ in range(args.ciclos):
+            precios = pool.obtener_precios()
+            assert len(precios) == len(universo), pool.last_stats.faltantes[:5]
+            duraciones.append(pool.last_stats.duracion_ms)
+        reparto = pool.reparto().values()
+        print(f"{workers} workers: {statistics.median(duraciones):8.1f} ms/ciclo  "
+              f"pares por shard {min(reparto)}-{max(reparto)}")
+        pool.stop()
+
+    universo = UniversoSimbolos(pares)
+    pool = ShardPool(universo, exchanges, 4)
+    antes = {id_: pool.shard(id_) for id_ in universo.ids()}
+    nuevo = pool.agregar_worker()
+    movidos = sum(pool.shard(id_) != antes[id_] for id_ in antes)
+    assert all(pool.shard(id_) in (antes[id_], nuevo) for id_ in antes)
+    print(f"Agregar un 5.º worker: {movidos / len(antes):.1%} de los pares movidos (ideal 20%)")
+    verificar(pool, universo)
+
+    antes = {id_: pool.shard(id_) for id_ in universo.ids()}
+    movidos = pool.quitar_worker('w1')
+    assert all(pool.shard(id_) == antes[id_] for id_ in antes if antes[id_] != 'w1')
+    print(f"Quitar un worker de 5: {movidos / len(antes):.1%} de los pares movidos")
+    verificar(pool, universo)
+
+    # Listado y deslistado en ejecución: solo cambian esos pares
+    antes = {id_: pool.shard(id_) for id_ in universo.ids()}
+    simex = exchanges['simex']
+    nuevos = [Par(f'N{i}', 'USDT', 'simex') for i in range(50)]
+    for par in nuevos:
+        simex.listar(par)
+    for par in pares[:50]:
+        if par.exchange == 'simex':
+            simex.deslistar(par)
+    inicio = time.perf_counter()
+    agregados, quitados = universo.sincronizar(simex, QUOTES['simex'])
+    duracion = (time.perf_counter() - inicio) * 1000
+    cambiados = sum(pool.shard(id_) != shard for id_, shard in antes.items() if id_ in universo)
+    print(f"Sincronizar: +{len(agregados)} / -{len(quitados)} pares en {duracion:.1f} ms, "
+          f"{cambiados} pares existentes cambiaron de shard")
+    assert cambiados == 0
+    verificar(pool, universo)
+    assert len(pool.obtener_precios()) == len(universo)
+    pool.stop()
+
+if __name__ == "__main__":
+    main()
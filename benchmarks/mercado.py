@@ -0,0 +1,122 @@
+"""
+Mercado sintético reproducible para los benchmarks.
+
+`MercadoSintetico` genera precios con semilla: una caminata aleatoria
+geométrica por símbolo con deriva propia y regímenes de volatilidad (cada
+símbolo pasa al azar entre calma, normal y turbulencia, y se queda en cada
+régimen cientos de ticks, como los clusters de volatilidad reales). Con la
+misma semilla y cantidad de símbolos la secuencia es siempre la misma.
+
+`ClienteSimulado` ocupa el lugar de `binance.client.Client` sobre ese
+mercado, sin red: responde `get_all_tickers()`, `get_symbol_ticker()` y
+`get_exchange_info()` con los precios del tick actual.
+"""
+import time
+from types import SimpleNamespace
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+VOLATILIDADES = np.array([0.0005, 0.002, 0.008])  # desvío por tick de cada régimen
+CAMBIO_REGIMEN = 0.005  # probabilidad por tick de sortear un régimen nuevo
+
+class MercadoSintetico:
+    """Precios de `symbols` pares con semilla; `avanzar()` genera un tick."""
+
+    def __init__(self, symbols: int, semilla: int = 0, quote: str = 'USDT'):
+        self.quote = quote
+        self.bases = [f'S{i:05d}' for i in range(symbols)]
+        self.tick = 0
+        self._rng = np.random.default_rng(semilla)
+        self.precios = 10 ** self._rng.uniform(-2, 4, symbols)
+        self.deriva = self._rng.normal(0, 0.0002, symbols)
+        self.regimen = self._rng.integers(0, len(VOLATILIDADES), symbols)
+
+    def __len__(self) -> int:
+        return len(self.bases)
+
+    def _paso(self) -> None:
+        cambia = self._rng.random(len(self)) < CAMBIO_REGIMEN
+        self.regimen[cambia] = self._rng.integers(0, len(VOLATILIDADES), int(cambia.sum()))
+        retornos = self.deriva + VOLATILIDADES[self.regimen] * self._rng.standard_normal(len(self))
+        self.precios = self.precios * np.exp(retornos)
+        self.tick += 1
+
+    def avanzar(self) -> Dict[str, float]:
+        """Genera un tick y retorna el precio de cada base."""
+        self._paso()
+        return self.ultimos()
+
+    def ultimos(self) -> Dict[str, float]:
+        return dict(zip(self.bases, self.precios.tolist()))
+
+    def serie(self, ticks: int) -> np.ndarray:
+        """Los próximos `ticks` precios, en una matriz símbolos × ticks."""
+        resultado = np.empty((len(self), ticks))
+        for i in range(ticks):
+            self._paso()
+            resultado[:, i] = self.precios
+        return resultado
+
+    def ohlcv(self, velas: int, ticks_por_vela: int = 12, intervalo: int = 60,
+              inicio: int = 0) -> Dict[str, pd.DataFrame]:
+        """
+        Las próximas `velas` velas OHLCV de cada base (columnas como
+        `get_velas()`); el volumen crece con el movimiento de la vela.
+        """
+        apertura = self.precios.copy()
+        ticks = self.serie(velas * ticks_por_vela).reshape(len(self), velas, ticks_por_vela)
+        cierres = ticks[:, :, -1]
+        aperturas = np.concatenate([apertura[:, None], cierres[:, :-1]], axis=1)
+        rango = ticks.max(axis=2) / ticks.min(axis=2) - 1
+        volumen = self._rng.gamma(2.0, 50.0, (len(self), velas)) * (1 + 200 * rango)
+        ts = inicio + intervalo * np.arange(velas)
+        return {
+            base: pd.DataFrame({
+                'ts': ts,
+                'open': aperturas[i],
+                'high': np.maximum(ticks[i].max(axis=1), aperturas[i]),
+                'low': np.minimum(ticks[i].min(axis=1), aperturas[i]),
+                'close': cierres[i],
+                'volume': volumen[i],
+            })
+            for i, base in enumerate(self.bases)
+        }
+
+class ClienteSimulado:
+    """
+    Reemplazo offline de `binance.client.Client` sobre un `MercadoSintetico`.
+
+    Los precios son los del tick actual del mercado (los avanza quien corre
+    el benchmark). `latencia` simula el viaje de red de cada petición.
+    """
+
+    def __init__(self, mercado: MercadoSintetico, latencia: float = 0.0):
+        self.mercado = mercado
+        self.latencia = latencia
+        self.pedidos = 0
+        self.response = SimpleNamespace(headers={})
+
+    def _pedido(self) -> None:
+        self.pedidos += 1
+        if self.latencia:
+            time.sleep(self.latencia)
+
+    def get_all_tickers(self) -> List[Dict[str, str]]:
+        self._pedido()
+        quote = self.mercado.quote
+        return [{'symbol': base + quote, 'price': repr(precio)}
+                for base, precio in zip(self.mercado.bases, self.mercado.precios.tolist())]
+
+    def get_symbol_ticker(self, symbol: str) -> Dict[str, str]:
+        self._pedido()
+        base = symbol[:-len(self.mercado.quote)]
+        precio = self.mercado.precios[self.mercado.bases.index(base)]
+        return {'symbol': symbol, 'price': repr(float(precio))}
+
+    def get_exchange_info(self) -> Dict[str, List[Dict[str, str]]]:
+        self._pedido()
+        return {'symbols': [{'symbol': base + self.mercado.quote, 'baseAsset': base,
+                             'quoteAsset': self.mercado.quote, 'status': 'TRADING'}
+                            for base in self.mercado.bases]}
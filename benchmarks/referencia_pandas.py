@@ -0,0 +1,81 @@
+"""
+Referencia congelada en pandas de la estrategia y del filtro de tendencia.
+
+Copia de la puntuación de `generar_recomendacion()` (con
+`calcular_indicadores()` y los niveles de `analizar_niveles()`) y de
+`identificar_tendencia()` tal como estaban antes del registro de
+indicadores, con los parámetros por defecto. Los benchmarks comparan
+contra estas funciones los resultados vectorizados; no deben cambiar con el
+código del monitor.
+"""
+from typing import Any, Dict, Tuple
+
+import numpy as np
+import pandas as pd
+
+RSI_PERIOD = 14
+MACD_FAST = 12
+MACD_SLOW = 26
+MACD_SIGNAL = 9
+
+def calcular_indicadores(precios: pd.Series) -> Dict[str, float]:
+    delta = precios.diff()
+    gain = (delta.where(delta > 0, 0)).rolling(window=RSI_PERIOD).mean()
+    loss = (-delta.where(delta < 0, 0)).rolling(window=RSI_PERIOD).mean()
+    rs = gain / loss
+    rsi = 100 - (100 / (1 + rs))
+
+    ema_fast = precios.ewm(span=MACD_FAST).mean()
+    ema_slow = precios.ewm(span=MACD_SLOW).mean()
+    macd = ema_fast - ema_slow
+    signal = macd.ewm(span=MACD_SIGNAL).mean()
+
+    return {'rsi': rsi.iloc[-1], 'macd': macd.iloc[-1], 'signal': signal.iloc[-1]}
+
+def analizar_niveles(precios: pd.Series) -> Dict[str, float]:
+    return {'soporte': precios.min() * 1.05, 'resistencia': precios.max() * 0.95}
+
+def generar_recomendacion(precios: np.ndarray) -> Dict[str, Any]:
+    """Acción y confianza sobre una ventana de precios en orden cronológico."""
+    precios = pd.Series(precios, dtype=np.float64)
+    indicadores = calcular_indicadores(precios)
+    niveles = analizar_niveles(precios)
+    confianza = 0
+
+    if indicadores['rsi'] < 30:
+        confianza += 2
+    elif indicadores['rsi'] > 70:
+        confianza -= 2
+
+    confianza += 1 if indicadores['macd'] > indicadores['signal'] else -1
+
+    precio_actual = precios.iloc[-1]
+    if precio_actual < niveles['soporte']:
+        confianza += 2
+    elif precio_actual > niveles['resistencia']:
+        confianza -= 2
+
+    if confianza >= 3:
+        accion = "COMPRAR 🟢"
+    elif confianza <= -3:
+        accion = "VENDER 🔴"
+    else:
+        accion = "MANTENER ⏺"
+    return {'accion': accion, 'confianza': confianza}
+
+def identificar_tendencia(df: pd.DataFrame, periodo_ema: int = 20, periodo_atr: int = 14,
+                          umbral_tendencia: float = 0.02) -> Tuple[bool, str]:
+    """`df` con columnas 'close', 'high' y 'low'."""
+    ema = df['close'].ewm(span=periodo_ema, adjust=False).mean()
+    tr = np.maximum(
+        df['high'] - df['low'],
+        np.maximum(abs(df['high'] - df['close'].shift(1)),
+                   abs(df['low'] - df['close'].shift(1)))
+    )
+    atr = tr.rolling(window=periodo_atr).mean()
+
+    pendiente_normalizada = (ema.iloc[-1] - ema.iloc[-5]) / 5 / df['close'].iloc[-1]
+    volatilidad = atr.iloc[-1] / df['close'].iloc[-1]
+    hay_tendencia = (abs(pendiente_normalizada) > umbral_tendencia
+                     and volatilidad < umbral_tendencia * 2)
+    return hay_tendencia, 'alcista' if pendiente_normalizada > 0 else 'bajista'
@@ -0,0 +1,247 @@
+"""
+Suite de benchmarks reproducible del monitor, sin conexión.
+
+Sobre un `MercadoSintetico` con semilla fija, y con `ClienteSimulado` en
+lugar de `binance.client.Client`, mide:
+
+- indicadores: `calcular_indicadores()`, `analizar_niveles()`,
+  `generar_recomendacion()` (ruta del monitor, con motor incremental) e
+  `identificar_tendencia()`, en ms por llamada;
+- SQLite: guardar un ciclo de N precios, precargar la caché de N símbolos y
+  leer el historial de un símbolo;
+- ciclos completos del monitor con N símbolos: obtención por shards,
+  análisis con alertas y publicación (la escritura diferida corre en su hilo,
+  como en producción); el primer ciclo, que inicializa los indicadores, se
+  reporta aparte.
+
+Los resultados (mediana y p95 por caso, parámetros y entorno) se guardan en
+JSON. `--comparar` contrasta dos corridas y marca como regresión los casos
+cuya mediana empeora más que `--umbral` (y más de `--minimo` ms, para no
+marcar ruido en casos de microsegundos); sale con código 1 si hay alguna.
+
+Uso (desde la raíz del proyecto):
+    python -m benchmarks.suite [--symbols 10 100 1000 10000] [--salida base.json]
+    python -m benchmarks.suite --comparar base.json nuevo.json [--umbral 0.15]
+    python -m benchmarks.suite --comparar base.json   # corre la suite y compara
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Sequence
+
+_tmp = tempfile.TemporaryDirectory()
+os.environ['DB_PATH'] = str(Path(_tmp.name) / 'bench.db')
+# Sin checkpoints: ni capturas dentro de los ciclos medidos ni archivos en data/
+os.environ['CHECKPOINT_INTERVAL'] = '0'
+
+import binance.client
+import numpy as np
+import pandas as pd
+
+from benchmarks.mercado import ClienteSimulado, MercadoSintetico
+
+# El monitor crea su cliente de Binance en el primer pedido: el exchange simulado lo reemplaza
+_cliente = ClienteSimulado(MercadoSintetico(0))
+binance.client.Client = lambda *args, **kwargs: _cliente
+
+import crypto_monitor as monitor
+from config.settings import HISTORY_LIMIT, UPDATE_INTERVAL
+from database.connection import get_db_connection, init_db
+from database.operations import get_price_history, save_prices_bulk
+from utils.streaming_indicators import MotorIndicadores
+from utils.symbol_universe import EXCHANGE_DEFECTO, Par
+from utils.technical_analysis import analizar_niveles, calcular_indicadores, generar_recomendacion
+from utils.trend_analyzer import identificar_tendencia
+
+VERSION = 1
+
+def estadisticas(tiempos: Sequence[float]) -> Dict[str, float]:
+    """Mediana y p95 en ms de tiempos en segundos."""
+    ms = sorted(t * 1000 for t in tiempos)
+    return {
+        'mediana_ms': round(statistics.median(ms), 4),
+        'p95_ms': round(ms[min(len(ms) - 1, int(len(ms) * 0.95))], 4),
+        'muestras': len(ms),
+    }
+
+def medir(funcion: Callable, argumentos: Sequence[tuple]) -> Dict[str, float]:
+    """Tiempo de cada llamada `funcion(*args)`."""
+    tiempos = []
+    for args in argumentos:
+        inicio = time.perf_counter()
+        funcion(*args)
+        tiempos.append(time.perf_counter() - inicio)
+    return estadisticas(tiempos)
+
+def casos_indicadores(semilla: int, muestras: int = 100, rondas: int = 3) -> Dict[str, dict]:
+    mercado = MercadoSintetico(muestras, semilla)
+    series = [pd.Series(fila) for fila in mercado.serie(HISTORY_LIMIT)]
+    ventanas = [(s.to_numpy(), MotorIndicadores()) for s in series]
+    for ventana, motor in ventanas:
+        motor.seed(ventana)
+    velas = list(mercado.ohlcv(100).values())
+    return {
+        'indicadores.calcular_indicadores': medir(calcular_indicadores,
+                                                  [(s,) for s in series] * rondas),
+        'indicadores.analizar_niveles': medir(analizar_niveles, [(s,) for s in series] * rondas),
+        'indicadores.generar_recomendacion': medir(generar_recomendacion, ventanas * rondas),
+        'indicadores.identificar_tendencia': medir(identificar_tendencia,
+                                                   [(df,) for df in velas * rondas]),
+    }
+
+def _limpiar_base() -> None:
+    conn = get_db_connection()
+    with conn:
+        conn.execute('DELETE FROM crypto_precios')
+        conn.execute('DELETE FROM velas_ohlcv')
+
+def casos_symbols(n: int, ciclos: int, semilla: int) -> Dict[str, dict]:
+    """SQLite y ciclos completos del monitor con `n` símbolos."""
+    mercado = MercadoSintetico(n, semilla)
+    _cliente.mercado = mercado
+    resultados = {}
+
+    # Historial previo: HISTORY_LIMIT ciclos guardados antes de arrancar
+    ahora = int(time.time())
+    historial = mercado.serie(HISTORY_LIMIT)
+    tiempos = []
+    for i in range(HISTORY_LIMIT):
+        precios = dict(zip(mercado.bases, historial[:, i].tolist()))
+        inicio = time.perf_counter()
+        save_prices_bulk(ahora - (HISTORY_LIMIT - i) * UPDATE_INTERVAL, precios)
+        tiempos.append(time.perf_counter() - inicio)
+    resultados[f'sqlite.guardar_ciclo.{n}'] = estadisticas(tiempos)
+    muestra = mercado.bases[:: max(1, n // 100)]
+    resultados[f'sqlite.historial.{n}'] = medir(get_price_history,
+                                                [(s, HISTORY_LIMIT) for s in muestra])
+
+    # El universo pasa a ser el del mercado; al agregarlo se precarga la caché
+    monitor.universo.quitar(monitor.universo.ids())
+    inicio = time.perf_counter()
+    monitor.universo.agregar(Par(base, mercado.quote, EXCHANGE_DEFECTO) for base in mercado.bases)
+    resultados[f'sqlite.precarga.{n}'] = estadisticas([time.perf_counter() - inicio])
+
+    etapas = {'obtener': [], 'analizar': [], 'publicar': [], 'total': []}
+    for i in range(ciclos + 1):
+        mercado.avanzar()
+        t0 = time.perf_counter()
+        ciclo = monitor.obtener_ciclo()
+        t1 = time.perf_counter()
+        analisis = monitor.analizar_ciclo(ciclo)
+        t2 = time.perf_counter()
+        monitor.persistir_y_publicar(analisis)
+        t3 = time.perf_counter()
+        errores = [r for r in analisis[1] if 'error' in r]
+        assert len(analisis[1]) == n and not errores, (len(analisis[1]), errores[:3])
+        if i == 0:
+            # El primer ciclo inicializa los motores de indicadores
+            resultados[f'ciclo.{n}.arranque'] = estadisticas([t3 - t0])
+            continue
+        for etapa, duracion in zip(etapas, (t1 - t0, t2 - t1, t3 - t2, t3 - t0)):
+            etapas[etapa].append(duracion)
+    for etapa, tiempos in etapas.items():
+        resultados[f'ciclo.{n}.{etapa}'] = estadisticas(tiempos)
+
+    # Vacía la escritura diferida antes del siguiente tamaño
+    monitor.price_writer.stop()
+    _limpiar_base()
+    monitor.price_writer.start()
+    return resultados
+
+def correr(symbols: List[int], ciclos: int, semilla: int) -> dict:
+    init_db()
+    # Sin cache de respuestas: cada ciclo pide el tick nuevo del mercado
+    monitor.client.ttl = 0.0
+    monitor.price_writer.start()
+    casos = casos_indicadores(semilla)
+    try:
+        for n in symbols:
+            inicio = time.perf_counter()
+            casos.update(casos_symbols(n, ciclos, semilla))
+            print(f"{n:>6} símbolos: {time.perf_counter() - inicio:.1f} s", file=sys.stderr)
+    finally:
+        monitor.price_writer.stop()
+        monitor.shards.stop()
+    return {
+        'version': VERSION,
+        'fecha': datetime.now().isoformat(timespec='seconds'),
+        'parametros': {'symbols': symbols, 'ciclos': ciclos, 'semilla': semilla,
+                       'history_limit': HISTORY_LIMIT},
+        'entorno': {'python': platform.python_version(), 'numpy': np.__version__,
+                    'pandas': pd.__version__, 'plataforma': platform.platform(),
+                    'cpus': os.cpu_count()},
+        'casos': casos,
+    }
+
+def comparar(base: dict, nuevo: dict, umbral: float, minimo: float) -> int:
+    """Imprime la comparación caso por caso y retorna la cantidad de regresiones."""
+    if base['parametros'] != nuevo['parametros']:
+        print(f"Aviso: parámetros distintos {base['parametros']} / {nuevo['parametros']}")
+    if base['entorno'] != nuevo['entorno']:
+        print("Aviso: las corridas son de entornos distintos")
+    regresiones = 0
+    print(f"{'caso':<40} {'base ms':>10} {'nuevo ms':>10} {'cambio':>8}")
+    for caso in sorted(set(base['casos']) | set(nuevo['casos'])):
+        if caso not in base['casos'] or caso not in nuevo['casos']:
+            print(f"{caso:<40} {'solo en ' + ('nuevo' if caso in nuevo['casos'] else 'base'):>30}")
+            continue
+        antes = base['casos'][caso]['mediana_ms']
+        despues = nuevo['casos'][caso]['mediana_ms']
+        cambio = despues / antes - 1 if antes else 0.0
+        marca = ''
+        if cambio > umbral and despues - antes > minimo:
+            marca = 'REGRESIÓN'
+            regresiones += 1
+        elif cambio < -umbral and antes - despues > minimo:
+            marca = 'mejora'
+        print(f"{caso:<40} {antes:>10.3f} {despues:>10.3f} {cambio:>+8.1%} {marca}")
+    print(f"{regresiones} regresiones (umbral {umbral:.0%})")
+    return regresiones
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--symbols', type=int, nargs='+', default=[10, 100, 1000, 10000])
+    parser.add_argument('--ciclos', type=int, default=20, help="ciclos del monitor por tamaño")
+    parser.add_argument('--semilla', type=int, default=0)
+    parser.add_argument('--salida', type=Path, help="JSON donde guardar los resultados")
+    parser.add_argument('--comparar', type=Path, nargs='+', metavar='JSON',
+                        help="base [nuevo]; sin nuevo, corre la suite y compara con base")
+    parser.add_argument('--umbral', type=float, default=0.15,
+                        help="empeoramiento relativo de la mediana que cuenta como regresión")
+    parser.add_argument('--minimo', type=float, default=0.05,
+                        help="empeoramiento absoluto mínimo (ms) para marcar regresión")
+    args = parser.parse_args()
+
+    # El log por símbolo de la precarga y de cada ciclo domina los casos
+    # chicos y llena la salida: se mide sin él
+    logging.disable(logging.INFO)
+    if args.comparar and len(args.comparar) == 2:
+        base, nuevo = (json.loads(ruta.read_text()) for ruta in args.comparar)
+    else:
+        base = json.loads(args.comparar[0].read_text()) if args.comparar else None
+        if base is not None:
+            # Mismas condiciones que la corrida base
+            args.symbols = base['parametros']['symbols']
+            args.ciclos = base['parametros']['ciclos']
+            args.semilla = base['parametros']['semilla']
+        nuevo = correr(args.symbols, args.ciclos, args.semilla)
+        if args.salida:
+            args.salida.write_text(json.dumps(nuevo, indent=2, ensure_ascii=False))
+        if base is None:
+            for caso, valores in nuevo['casos'].items():
+                print(f"{caso:<40} {valores['mediana_ms']:>10.3f} ms "
+                      f"(p95 {valores['p95_ms']:.3f}, n={valores['muestras']})")
+            return
+    sys.exit(1 if comparar(base, nuevo, args.umbral, args.minimo) else 0)
+
+if __name__ == "__main__":
+    main()
@@ -8,16 +8,125 @@ load_dotenv()
 API_KEY = os.getenv('BINANCE_API_KEY')
 API_SECRET = os.getenv('BINANCE_API_SECRET')
 
-DB_PATH = Path('data/precios_historicos.db')
+DB_PATH = Path(os.getenv('DB_PATH', 'data/precios_historicos.db'))
 
 UPDATE_INTERVAL = 60  # segundos
 HISTORY_LIMIT = 50   # Aumentado para mejor análisis técnico
 
+# Ingesta: 'rest' (polling cada UPDATE_INTERVAL) o 'websocket'
+INGESTION_MODE = os.getenv('INGESTION_MODE', 'rest')
+STREAM_URL = 'wss://stream.binance.com:9443/ws/!miniTicker@arr'
+STREAM_ANALYSIS_INTERVAL = 5  # segundos entre análisis en modo websocket
+STREAM_STALE_AFTER = 10  # segundos sin mensajes antes de usar REST
+
+# Tablero de terminal: 'ansi' (redibuja solo lo que cambia), 'headless' (sin
+# salida por consola) o 'auto' (ansi si la salida es una terminal)
+DASHBOARD_MODE = os.getenv('DASHBOARD_MODE', 'auto')
+DASHBOARD_REFRESH = 0.25  # segundos mínimos entre cuadros
+DASHBOARD_ALERTAS = 8  # alertas recientes visibles
+
+# API HTTP local (utils/api_server.py); API_PORT=0 la desactiva
+API_HOST = os.getenv('API_HOST', '127.0.0.1')
+API_PORT = int(os.getenv('API_PORT', '0'))
+API_HISTORY_LIMIT = 5000  # ticks máximos por página de historial
+
+# Universo de símbolos (utils/symbol_universe.py): además de SUPPORTED_COINS,
+# todos los pares de Binance cotizados en UNIVERSE_QUOTES (p. ej. "USDT,BTC"),
+# repartidos entre UNIVERSE_WORKERS hilos
+UNIVERSE_QUOTES = [q.strip().upper() for q in os.getenv('UNIVERSE_QUOTES', '').split(',') if q.strip()]
+UNIVERSE_WORKERS = int(os.getenv('UNIVERSE_WORKERS', '4'))
+UNIVERSE_REFRESH = 3600  # segundos entre sincronizaciones con el listado del exchange
+
+# Peticiones REST (utils/request_scheduler.py): peso por minuto que el
+# monitor se permite gastar (Binance corta a 6000 por IP; el margen queda
+# para otros clientes), TTL de las respuestas de precios y reintentos
+RATE_LIMIT_WEIGHT = 4800
+REQUEST_TTL = 1.0  # segundos
+REQUEST_RETRIES = 4
+
+# Instrumentación (utils/instrumentation.py): INSTRUMENTATION=1 mide cada
+# etapa y, en uno de cada INSTRUMENTATION_SAMPLE ciclos, cada símbolo. El
+# reporte va al log cada INSTRUMENTATION_REPORT ciclos y, con
+# INSTRUMENTATION_FILE, también a ese JSON. PROFILER_FILE activa el
+# perfilador por muestreo (pilas en formato folded)
+INSTRUMENTATION = os.getenv('INSTRUMENTATION', '') not in ('', '0')
+INSTRUMENTATION_FILE = os.getenv('INSTRUMENTATION_FILE')
+INSTRUMENTATION_REPORT = 60  # ciclos
+INSTRUMENTATION_SAMPLE = 10  # ciclos por cada uno con tiempos por símbolo
+PROFILER_FILE = os.getenv('PROFILER_FILE')
+PROFILER_INTERVAL = 0.01  # segundos entre muestras
+
+# Arranque: con LAZY_IMPORTS (por defecto) pandas se importa en su primer
+# uso (utils/lazy_modules.py) y el cliente de Binance en el primer pedido;
+# LAZY_IMPORTS=0 importa pandas al arrancar
+LAZY_IMPORTS = os.getenv('LAZY_IMPORTS', '1') not in ('', '0')
+
+# Checkpoints del estado en memoria (utils/checkpoint.py): ventanas de
+# precios, indicadores incrementales y alertas se guardan en CHECKPOINT_FILE
+# cada CHECKPOINT_INTERVAL segundos (0 los desactiva) y al salir; al arrancar
+# se cargan y solo se reaplican los ticks guardados después
+CHECKPOINT_FILE = Path(os.getenv('CHECKPOINT_FILE', 'data/estado_monitor.npz'))
+CHECKPOINT_INTERVAL = int(os.getenv('CHECKPOINT_INTERVAL', '300'))
+
+# Velas agregadas que se mantienen al guardar cada tick (segundos)
+INTERVALOS_AGREGADOS = (300, 3600, 86400)
+
+# Archivo columnar: los ticks más viejos que ARCHIVE_AFTER_DAYS salen de SQLite
+ARCHIVE_DIR = Path(os.getenv('ARCHIVE_DIR', 'data/archivo'))
+ARCHIVE_AFTER_DAYS = 30
+
+# Mantenimiento de la base: retención en días por resolución (0 = ticks
+# crudos, el resto son velas de `velas_ohlcv`); None conserva todo
+MAINTENANCE_INTERVAL = 6 * 3600  # segundos entre ejecuciones
+MAINTENANCE_ARCHIVE = True  # archivar los ticks en vez de solo borrarlos
+RETENCION_DIAS = {
+    0: ARCHIVE_AFTER_DAYS,
+    60: 365,
+    300: 730,
+    3600: None,
+    86400: None,
+}
+
 RSI_PERIOD = 14
+RSI_WILDER = False  # False: medias simples, igual que calcular_indicadores()
 MACD_FAST = 12
 MACD_SLOW = 26
 MACD_SIGNAL = 9
 
+# Alertas (utils/alert_rules.py): cada regla dispara cuando `indicador` cruza
+# `nivel` hacia `direccion`; sin `symbol` aplica a todos. `mensaje` admite
+# {symbol}, {valor} y {nivel}.
+ALERT_COOLDOWN = 15 * 60  # segundos antes de repetir la misma alerta
+ALERT_RULES = [
+    {'indicador': 'dist_soporte', 'nivel': 1.0, 'direccion': 'abajo', 'color': 'RED',
+     'mensaje': '⚠️ PRECIO CERCA DEL SOPORTE'},
+    {'indicador': 'dist_resistencia', 'nivel': 1.0, 'direccion': 'abajo', 'color': 'RED',
+     'mensaje': '⚠️ PRECIO CERCA DE LA RESISTENCIA'},
+    {'indicador': 'rsi', 'nivel': 30, 'direccion': 'abajo', 'color': 'GREEN',
+     'mensaje': '🔥 RSI EN SOBREVENTA ({valor:.1f}) - Posible rebote alcista'},
+    {'indicador': 'rsi', 'nivel': 70, 'direccion': 'arriba', 'color': 'RED',
+     'mensaje': '💫 RSI EN SOBRECOMPRA ({valor:.1f}) - Posible corrección'},
+    {'indicador': 'macd', 'nivel': 0, 'direccion': 'arriba', 'color': 'YELLOW',
+     'mensaje': '⚡ CRUCE MACD ALCISTA'},
+    {'indicador': 'macd', 'nivel': 0, 'direccion': 'abajo', 'color': 'YELLOW',
+     'mensaje': '⚡ CRUCE MACD BAJISTA'},
+    {'indicador': 'confianza', 'nivel': 4, 'direccion': 'arriba', 'color': 'GREEN',
+     'mensaje': '🚀 SEÑAL ALCISTA FUERTE - Considerar compra'},
+    {'indicador': 'confianza', 'nivel': -4, 'direccion': 'abajo', 'color': 'RED',
+     'mensaje': '🔻 SEÑAL BAJISTA FUERTE - Considerar venta'},
+    {'indicador': 'variacion_5', 'nivel': 3, 'direccion': 'arriba', 'color': 'GREEN',
+     'mensaje': '📈 SUBA DE {valor:.1f}% EN 5 TICKS'},
+    {'indicador': 'variacion_5', 'nivel': -3, 'direccion': 'abajo', 'color': 'RED',
+     'mensaje': '📉 CAÍDA DE {valor:.1f}% EN 5 TICKS'},
+]
+
+# Entrega de alertas (utils/notifier.py): sin destinos configurados solo se
+# muestran en consola. NOTIFY_SOCKET es 'host:puerto' o la ruta de un socket Unix.
+NOTIFY_WEBHOOK_URL = os.getenv('NOTIFY_WEBHOOK_URL')
+NOTIFY_FILE = os.getenv('NOTIFY_FILE')
+NOTIFY_SOCKET = os.getenv('NOTIFY_SOCKET')
+NOTIFY_QUEUE_SIZE = 1000  # alertas pendientes por destino antes de descartar
+
 SUPPORTED_COINS = {
     'BTC': 'Bitcoin',
     'ETH': 'Ethereum',
@@ -4,179 +4,263 @@ Crypto Price Monitor
 Un bot que monitorea los precios de las principales criptomonedas y analiza sus tendencias.
 """
 
-import os
+from __future__ import annotations
+
+import asyncio
+import functools
 import time
+from dataclasses import dataclass
 from datetime import datetime
-from threading import Lock
-from binance.client import Client
-from typing import Optional, Tuple
-from colorama import init, Fore, Back, Style
-import pandas as pd
+from typing import Any, Dict, List, Optional, Tuple
+
 import numpy as np
+from colorama import init, Fore
 
 from config.settings import (
     API_KEY, API_SECRET, UPDATE_INTERVAL,
-    HISTORY_LIMIT, SUPPORTED_COINS
+    HISTORY_LIMIT, SUPPORTED_COINS,
+    INGESTION_MODE, STREAM_ANALYSIS_INTERVAL,
+    UNIVERSE_QUOTES, UNIVERSE_REFRESH
 )
 from utils.logger import logger
-from database.connection import init_db
-from database.operations import save_price, get_price_history
+from utils.async_pipeline import Etapa, MonitorPipeline
+from database.connection import init_db, close_db_connections
+from database.write_behind import WriteBehindWriter
+from database.maintenance import MantenimientoPeriodico
+from utils.price_cache import PriceCache
+from utils.streaming_indicators import MotorIndicadores
 from utils.technical_analysis import generar_recomendacion
-from utils.alert_signals import (
-    generar_alerta_precio,
-    analizar_momentum,
-    generar_alerta_tendencia
+from utils.trend_analyzer import identificar_tendencia
+from utils.price_source import BinancePriceSource
+from utils.request_scheduler import ClienteProgramado
+from utils.symbol_universe import (
+    EXCHANGE_DEFECTO, QUOTE_DEFECTO, BinanceAdaptador, Par, ShardPool, UniversoSimbolos
 )
+from utils.stream_ingestion import BinanceWebsocketFeed, StreamIngestor
+from utils.alert_rules import MotorAlertas, calcular_valores
+from utils.notifier import Notificador, evento_alerta
+from utils.dashboard import Dashboard
+from utils.api_server import ServidorAPI
+from utils.instrumentation import PerfiladorMuestreo, instrumentacion
+from utils.checkpoint import CheckpointPeriodico
+from utils.lazy_modules import modulo_diferido
 
-init(autoreset=True)
+pd = modulo_diferido('pandas')
 
-print_lock = Lock()
-client = Client(API_KEY, API_SECRET)
+def crear_cliente_binance():
+    """Cliente de python-binance; lo crea el planificador en el primer pedido."""
+    from binance.client import Client
+    return Client(API_KEY, API_SECRET)
 
-def clear_console():
-    """Limpia la consola según el sistema operativo."""
-    os.system('cls' if os.name == 'nt' else 'clear')
+# Todas las peticiones REST pasan por el planificador (límite de peso, caché, reintentos)
+client = ClienteProgramado(fabrica=crear_cliente_binance)
+price_source = BinancePriceSource(client)
+adaptadores = {EXCHANGE_DEFECTO: BinanceAdaptador(client)}
+universo = UniversoSimbolos.desde_config()
+shards = ShardPool(universo, adaptadores)
+price_cache = PriceCache(HISTORY_LIMIT)
+price_writer = WriteBehindWriter()
+mantenimiento = MantenimientoPeriodico()
+motores: Dict[str, MotorIndicadores] = {}
+motor_alertas = MotorAlertas.desde_config()
+checkpoints = CheckpointPeriodico.desde_config(price_cache, motores, motor_alertas)
+notificador = Notificador.desde_config()
+dashboard = Dashboard.desde_config()
+api = ServidorAPI.desde_config()
+perfilador = PerfiladorMuestreo.desde_config()
+instrumentacion.agregar_contadores('planificador', client.planificador.metricas)
+ingestor: Optional[StreamIngestor] = None
+_ultimo_bloque: Optional[int] = None
+_ultima_sincronizacion: Optional[float] = None
 
 def get_current_price(symbol: str) -> Optional[float]:
-    """Obtiene el precio actual de una criptomoneda."""
+    """Obtiene el precio actual de un par por su id ('BTC', 'ETH-BTC', ...)."""
+    par = universo.par(symbol) or Par.desde_id(symbol)
     try:
-        ticker = client.get_symbol_ticker(symbol=symbol+"USDT")
-        return float(ticker['price'])
+        return adaptadores[par.exchange].precios([par])[par]
     except Exception as e:
         logger.error(f"Error al obtener precio de {symbol}: {e}")
         return None
 
-def mostrar_banner():
-    """Muestra el banner inicial del programa."""
-    print(Fore.CYAN + """
-    ╔═══════════════════════════════════════════════════════════════╗
-    ║""" + Fore.YELLOW + """                                                               """ + Fore.CYAN + """║
-    ║""" + Fore.GREEN + """   🚀 CRYPTO MONITOR v2.0                                     """ + Fore.CYAN + """║
-    ║""" + Fore.WHITE + """   Monitor de Criptomonedas y Análisis Técnico                """ + Fore.CYAN + """║
-    ║""" + Fore.YELLOW + """                                                               """ + Fore.CYAN + """║
-    ║""" + Fore.WHITE + """   Desarrollado por NightmaresDev                            """ + Fore.CYAN + """║
-    ║""" + Fore.WHITE + """   © 2024 - Todos los derechos reservados                    """ + Fore.CYAN + """║
-    ║""" + Fore.YELLOW + """                                                               """ + Fore.CYAN + """║
-    ╚═══════════════════════════════════════════════════════════════╝
-    """)
+def symbols_stream() -> set:
+    """Ids que cubre el stream de Binance (los pares en QUOTE_DEFECTO)."""
+    return {par.id for par in universo.pares()
+            if par.exchange == EXCHANGE_DEFECTO and par.quote == QUOTE_DEFECTO}
 
-def update_prices() -> None:
-    """Actualiza y muestra los precios con alertas."""
-    with print_lock:
-        clear_console()
-        mostrar_banner()
-        
-        timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        print(Fore.CYAN + "=" * 80)
-        print(Fore.CYAN + f"📊 ANÁLISIS DE MERCADO CRYPTO - {Fore.YELLOW}{timestamp}")
-        print(Fore.CYAN + "=" * 80)
-
-        for symbol, name in SUPPORTED_COINS.items():
-            try:
-                price = get_current_price(symbol)
-                if price:
-                    save_price(timestamp, symbol, price)
-                    df = get_price_history(symbol, HISTORY_LIMIT)
-                    recomendacion = generar_recomendacion(df)
-                    
-                    print(f"\n{Fore.WHITE}{'=' * 40}")
-                    print(f"{Fore.YELLOW}🪙 {name} ({symbol}/USDT)")
-                    print(f"{Fore.WHITE}{'=' * 40}")
-                    
-                    var_24h = ((price - df['price'].iloc[-1]) / df['price'].iloc[-1]) * 100
-                    var_color = Fore.GREEN if var_24h >= 0 else Fore.RED
-                    print(f"{Fore.WHITE}💵 Precio: {Fore.GREEN}${price:,.2f} {var_color}({var_24h:+.2f}%)")
-                    
-                    alertas_precio = generar_alerta_precio(price, recomendacion['niveles'])
-                    alertas_momentum = analizar_momentum(recomendacion['indicadores'])
-                    alertas_tendencia = generar_alerta_tendencia(df, recomendacion)
-                    
-                    if alertas_precio or alertas_momentum or alertas_tendencia:
-                        print(f"\n{Fore.YELLOW}📢 ALERTAS CRÍTICAS:")
-                        print(f"{Fore.WHITE}{'─' * 30}")
-                        if alertas_precio:
-                            print(alertas_precio)
-                        if alertas_momentum:
-                            print(alertas_momentum)
-                        if alertas_tendencia:
-                            print(alertas_tendencia)
-                    
-                    print(f"\n{Fore.CYAN}📊 ANÁLISIS TÉCNICO:")
-                    print(f"{Fore.WHITE}{'─' * 30}")
-                    
-                    rsi = recomendacion['indicadores']['rsi']
-                    rsi_color = (Fore.RED if rsi > 70 else 
-                                Fore.GREEN if rsi < 30 else 
-                                Fore.YELLOW)
-                    rsi_zona = ("SOBRECOMPRA" if rsi > 70 else 
-                               "SOBREVENTA" if rsi < 30 else 
-                               "NEUTRAL")
-                    print(f"RSI (14): {rsi_color}{rsi:.1f} - {rsi_zona}")
-                    
-                    macd = recomendacion['indicadores']['macd']
-                    macd_color = Fore.GREEN if macd > 0 else Fore.RED
-                    print(f"MACD: {macd_color}{macd:.8f}")
-                    
-                    niveles = recomendacion['niveles']
-                    print(f"\n{Fore.CYAN}📈 NIVELES CLAVE:")
-                    print(f"{Fore.WHITE}{'─' * 30}")
-                    print(f"Soporte: {Fore.GREEN}${niveles['soporte']:,.2f} ({niveles['distancia_soporte']:.1f}%)")
-                    print(f"Resistencia: {Fore.RED}${niveles['resistencia']:,.2f} ({niveles['distancia_resistencia']:.1f}%)")
-                    
-                    print(f"\n{Fore.WHITE}🎯 RECOMENDACIÓN FINAL:")
-                    print(f"{Fore.WHITE}{'─' * 30}")
-                    accion_color = (Fore.GREEN if recomendacion['accion'] == 'COMPRAR' else 
-                                  Fore.RED if recomendacion['accion'] == 'VENDER' else 
-                                  Fore.YELLOW)
-                    print(f"Acción: {accion_color}{recomendacion['accion']}")
-                    print(f"Confianza: {accion_color}{abs(recomendacion['confianza'])}/5")
-
-            except Exception as e:
-                logger.error(f"Error en el análisis de {symbol}: {e}")
-                print(f"{Fore.RED}❌ Error al analizar {symbol}: {str(e)}")
-
-        print(f"\n{Fore.CYAN}{'=' * 80}")
-        print(f"{Fore.YELLOW}Próxima actualización en {UPDATE_INTERVAL} segundos...")
-
-def identificar_tendencia(df: pd.DataFrame, 
-                         periodo_ema: int = 20,
-                         periodo_atr: int = 14,
-                         umbral_tendencia: float = 0.02) -> Tuple[bool, str]:
+def cambio_universo(agregados: List[Par], quitados: List[Par]) -> None:
+    """Precarga los pares nuevos y libera el estado de los que salen."""
+    price_cache.warm_up([par.id for par in agregados])
+    for par in quitados:
+        motores.pop(par.id, None)
+        price_cache.descartar(par.id)
+    if ingestor is not None:
+        ingestor.symbols = symbols_stream()
+
+universo.suscribir(cambio_universo)
+
+def sincronizar_universo() -> None:
+    """Cada UNIVERSE_REFRESH segundos alinea el universo con el listado de Binance."""
+    global _ultima_sincronizacion
+    if not UNIVERSE_QUOTES or (_ultima_sincronizacion is not None and
+                               time.monotonic() - _ultima_sincronizacion < UNIVERSE_REFRESH):
+        return
+    _ultima_sincronizacion = time.monotonic()
+    try:
+        universo.sincronizar(adaptadores[EXCHANGE_DEFECTO], UNIVERSE_QUOTES, fijos=SUPPORTED_COINS)
+    except Exception as e:
+        logger.error(f"Error al sincronizar el universo de símbolos: {e}")
+
+def actualizar_motores(precios: Dict[str, float]) -> None:
+    """Actualiza los indicadores incrementales con los precios del ciclo."""
+    for symbol, price in precios.items():
+        motor = motores.get(symbol)
+        if motor is None:
+            # La caché ya incluye el precio de este ciclo
+            motor = motores[symbol] = MotorIndicadores()
+            motor.seed(price_cache.precios(symbol))
+        else:
+            motor.update(price)
+
+@dataclass
+class Ciclo:
     """
-    Identifica si hay una tendencia clara en el mercado
-    
-    Args:
-        df: DataFrame con datos OHLCV
-        periodo_ema: Período para la media móvil exponencial
-        periodo_atr: Período para el ATR
-        umbral_tendencia: Umbral mínimo de pendiente para considerar tendencia
-    
-    Returns:
-        Tuple[bool, str]: (hay_tendencia, dirección)
+    Precios obtenidos en un tick del monitor.
+
+    Un ciclo provisional (modo websocket, entre dos cierres de
+    UPDATE_INTERVAL) se analiza y se muestra, pero no se guarda ni avanza los
+    indicadores.
     """
-    
-    df['EMA'] = df['close'].ewm(span=periodo_ema, adjust=False).mean()
-    
-    df['TR'] = np.maximum(
-        df['high'] - df['low'],
-        np.maximum(
-            abs(df['high'] - df['close'].shift(1)),
-            abs(df['low'] - df['close'].shift(1))
-        )
-    )
-    df['ATR'] = df['TR'].rolling(window=periodo_atr).mean()
-    
-    pendiente = (df['EMA'].iloc[-1] - df['EMA'].iloc[-5]) / 5
-    pendiente_normalizada = pendiente / df['close'].iloc[-1]
-    
-    volatilidad = df['ATR'].iloc[-1] / df['close'].iloc[-1]
-    
-    hay_tendencia = abs(pendiente_normalizada) > umbral_tendencia and \
-                    volatilidad < umbral_tendencia * 2
-    
-    direccion = 'alcista' if pendiente_normalizada > 0 else 'bajista'
-    
-    return hay_tendencia, direccion
+    ts: int
+    timestamp: str
+    precios: Dict[str, float]
+    provisional: bool = False
+
+def obtener_ciclo() -> Ciclo:
+    """Obtiene los precios de todo el universo, en paralelo por shard."""
+    sincronizar_universo()
+    ahora = datetime.now()
+    precios = shards.obtener_precios()
+    stats = shards.last_stats
+    logger.info(f"Precios obtenidos: {stats.recibidos}/{stats.solicitados} "
+                f"en {stats.duracion_ms:.1f} ms")
+    for symbol in stats.faltantes:
+        logger.error(f"Error al obtener precio de {symbol}: sin ticker")
+    return Ciclo(int(ahora.timestamp()), ahora.strftime('%Y-%m-%d %H:%M:%S'), precios)
+
+def obtener_ciclo_stream() -> Ciclo:
+    """
+    Toma la última instantánea del stream, o usa REST si el stream está caído.
+
+    El primer ciclo de cada bloque de UPDATE_INTERVAL segundos es el que se
+    confirma; los demás son provisionales.
+    """
+    global _ultimo_bloque
+    if not ingestor.activo():
+        logger.warning("Stream inactivo, usando REST para este ciclo")
+        ciclo = obtener_ciclo()
+    else:
+        sincronizar_universo()
+        ahora = datetime.now()
+        precios = ingestor.instantanea()
+        if len(universo) > len(ingestor.symbols):
+            # Pares de otras quotes o exchanges: por REST
+            precios.update(shards.obtener_precios(excluir=ingestor.symbols))
+        ciclo = Ciclo(int(ahora.timestamp()), ahora.strftime('%Y-%m-%d %H:%M:%S'), precios)
+
+    bloque = ciclo.ts // UPDATE_INTERVAL
+    ciclo.provisional = bloque == _ultimo_bloque
+    _ultimo_bloque = bloque
+    return ciclo
+
+def analizar_simbolos(ciclo: Ciclo, symbols: List[str],
+                      medir: bool = False) -> List[Dict[str, Any]]:
+    """
+    Actualiza caché e indicadores y genera recomendaciones y alertas de
+    `symbols` (los de un shard; cada símbolo lo analiza siempre un solo hilo).
+    Con `medir`, registra el tiempo de cada símbolo en la instrumentación.
+    """
+    precios = {symbol: ciclo.precios[symbol] for symbol in symbols if symbol in ciclo.precios}
+    if ciclo.provisional:
+        motores_ciclo = {}
+        for symbol, price in precios.items():
+            if symbol in motores:
+                motores_ciclo[symbol] = motores[symbol].copia()
+                motores_ciclo[symbol].update(price)
+    else:
+        with instrumentacion.span('indicadores'):
+            price_cache.append_many(ciclo.ts, precios)
+            actualizar_motores(precios)
+        motores_ciclo = motores
+
+    resultados = []
+    muestras = []
+    for symbol in symbols:
+        name = universo.nombre(symbol)
+        price = precios.get(symbol)
+        if not price or symbol not in motores_ciclo:
+            continue
+        try:
+            ventana = price_cache.precios(symbol)
+            if ciclo.provisional:
+                # La caché no tiene el precio de un ciclo provisional; sin él,
+                # variacion_<n> y var_24h mirarían un tick más atrás
+                ventana = np.append(ventana[max(len(ventana) + 1 - price_cache.capacidad, 0):], price)
+            if medir:
+                t0 = time.perf_counter_ns()
+            recomendacion = generar_recomendacion(ventana, motores_ciclo[symbol])
+            if medir:
+                t1 = time.perf_counter_ns()
+            valores = calcular_valores(motor_alertas.indicadores(symbol), price,
+                                       recomendacion, ventana)
+            alertas = motor_alertas.evaluar(symbol, valores, ciclo.ts)
+            if medir:
+                muestras.append((symbol, t1 - t0, time.perf_counter_ns() - t1))
+            if notificador is not None:
+                for alerta in alertas:
+                    notificador.publicar(evento_alerta(alerta))
+            resultados.append({
+                'symbol': symbol,
+                'name': name,
+                'price': price,
+                'var_24h': ((price - ventana[0]) / ventana[0]) * 100,
+                'recomendacion': recomendacion,
+                'alertas': [
+                    f"{getattr(Fore, alerta.regla.color, Fore.YELLOW)}{alerta.mensaje}"
+                    for alerta in alertas
+                ]
+            })
+        except Exception as e:
+            logger.error(f"Error en el análisis de {symbol}: {e}")
+            resultados.append({'symbol': symbol, 'name': name, 'error': str(e)})
+    instrumentacion.registrar_simbolos(('recomendacion', 'alertas'), muestras)
+    return resultados
+
+def analizar_ciclo(ciclo: Ciclo) -> Tuple[Ciclo, List[Dict[str, Any]]]:
+    """Analiza el ciclo en los shards y ordena los resultados como el universo."""
+    medir = instrumentacion.muestrear()
+    resultados = shards.map(functools.partial(analizar_simbolos, ciclo, medir=medir))
+    if checkpoints is not None and not ciclo.provisional:
+        # Con todos los shards terminados el estado del ciclo está completo
+        checkpoints.ciclo()
+    orden = {symbol: i for i, symbol in enumerate(universo.ids())}
+    resultados.sort(key=lambda r: orden.get(r['symbol'], len(orden)))
+    return ciclo, resultados
+
+def persistir_y_publicar(analisis: Tuple[Ciclo, List[Dict[str, Any]]]) -> None:
+    """Encola los precios del ciclo para guardarlos y publica los resultados."""
+    ciclo, resultados = analisis
+    if not ciclo.provisional:
+        price_writer.submit(ciclo.ts, ciclo.precios)
+    if api is not None:
+        api.publicar(ciclo.timestamp, ciclo.ts, resultados, ciclo.provisional)
+    if dashboard is not None:
+        intervalo = STREAM_ANALYSIS_INTERVAL if ingestor is not None else UPDATE_INTERVAL
+        dashboard.publicar(ciclo.timestamp, resultados, intervalo, ciclo.provisional)
+    instrumentacion.ciclo()
+
+def update_prices() -> None:
+    """Actualiza y muestra los precios con alertas (un ciclo completo en serie)."""
+    persistir_y_publicar(analizar_ciclo(obtener_ciclo()))
 
 def ejecutar_estrategia(df: pd.DataFrame) -> bool:
     """
@@ -191,26 +275,77 @@ def ejecutar_estrategia(df: pd.DataFrame) -> bool:
     print(f"Tendencia {direccion} detectada. Procediendo con la estrategia.")
     return True
 
+def crear_pipeline() -> MonitorPipeline:
+    """
+    Pipeline de obtención, análisis y persistencia/salida en ticks fijos.
+
+    En modo websocket la fuente es la instantánea del stream y el análisis
+    corre cada STREAM_ANALYSIS_INTERVAL segundos; REST queda como respaldo.
+    """
+    global ingestor
+    etapas = [Etapa('analisis', analizar_ciclo), Etapa('persistencia', persistir_y_publicar)]
+    if INGESTION_MODE != 'websocket':
+        return MonitorPipeline(obtener_ciclo, etapas, UPDATE_INTERVAL)
+
+    ingestor = StreamIngestor(BinanceWebsocketFeed(), symbols_stream(),
+                              respaldo=price_source)
+    ingestor.start()
+    # Esperar el primer mensaje para no arrancar con un ciclo vacío
+    for _ in range(50):
+        if ingestor.activo():
+            break
+        time.sleep(0.1)
+    return MonitorPipeline(obtener_ciclo_stream, etapas, STREAM_ANALYSIS_INTERVAL)
+
 def main():
     """Función principal."""
+    init(autoreset=True)
     try:
+        if perfilador is not None:
+            perfilador.start()
         init_db()
+        # Los símbolos del checkpoint no se precargan ni se siembran de nuevo
+        restaurados = checkpoints.restaurar(universo.ids()) if checkpoints is not None else set()
+        price_cache.warm_up([symbol for symbol in universo.ids() if symbol not in restaurados])
+        sincronizar_universo()
+        price_writer.start()
+        mantenimiento.start()
+        if checkpoints is not None:
+            checkpoints.start()
+        if notificador is not None:
+            notificador.start()
+        if api is not None:
+            api.start()
+        if dashboard is not None:
+            dashboard.start()
         logger.info("Iniciando monitor de criptomonedas...")
-        
-        while True:
-            try:
-                update_prices()
-                time.sleep(UPDATE_INTERVAL)
-            except Exception as e:
-                logger.error(f"Error en el ciclo de monitoreo: {e}")
-                time.sleep(10)
+        asyncio.run(crear_pipeline().run())
+        logger.info("Deteniendo el monitor de criptomonedas...")
 
     except KeyboardInterrupt:
-        clear_console()
         logger.info("Deteniendo el monitor de criptomonedas...")
     except Exception as e:
         logger.error(f"Error fatal: {e}")
         raise
+    finally:
+        if dashboard is not None:
+            dashboard.stop()
+        if api is not None:
+            api.stop()
+        if ingestor is not None:
+            ingestor.stop()
+        mantenimiento.stop()
+        shards.stop()
+        if checkpoints is not None:
+            checkpoints.stop()
+        logger.info(f"Peticiones al exchange: {client.planificador.metricas()}")
+        if notificador is not None:
+            notificador.stop()
+        price_writer.stop()
+        close_db_connections()
+        instrumentacion.registrar_reporte()
+        if perfilador is not None:
+            perfilador.stop()
 
 if __name__ == "__main__":
     main() 
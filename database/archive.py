@@ -0,0 +1,252 @@
+"""
+Archivo columnar de ticks para el historial de largo plazo.
+
+Los ticks viejos de `crypto_precios` se compactan en dos archivos por
+símbolo, solo de anexado: `<SYMBOL>.ts` (int64 epoch) y `<SYMBOL>.price`
+(float64), ambos little-endian y en orden cronológico. La lectura usa
+`numpy.memmap` y retorna vistas del rango pedido sin copiar ni pasar por SQL.
+
+Si una compactación se interrumpe, los archivos pueden quedar con largos
+distintos: el lector usa el menor y la siguiente compactación los recorta
+antes de anexar. Las filas se borran de SQLite solo después de sincronizar
+los archivos en disco, y solo las que se anexaron (por clave, no por rango).
+Un tick tardío (un backfill, por ejemplo) con ts anterior al último
+archivado no puede anexarse sin romper el orden: queda en SQLite y
+`leer_historial()` lo intercala con el archivo.
+
+Uso (desde la raíz del proyecto):
+    python -m database.archive [--dias 30] [--sin-borrar]
+"""
+import argparse
+import itertools
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from config.settings import ARCHIVE_DIR, ARCHIVE_AFTER_DAYS
+from utils.logger import logger
+from database.connection import get_db_connection, init_db
+
+TS_DTYPE = np.dtype('<i8')
+PRECIO_DTYPE = np.dtype('<f8')
+TAMANO_LOTE = 200_000
+
+def _rutas(directorio: Path, symbol: str) -> Tuple[Path, Path]:
+    return directorio / f'{symbol}.ts', directorio / f'{symbol}.price'
+
+def _largo(ruta_ts: Path, ruta_precio: Path) -> int:
+    """Registros completos: el menor de los dos archivos."""
+    if not ruta_ts.exists() or not ruta_precio.exists():
+        return 0
+    return min(ruta_ts.stat().st_size // TS_DTYPE.itemsize,
+               ruta_precio.stat().st_size // PRECIO_DTYPE.itemsize)
+
+def _symbols(conn: sqlite3.Connection) -> List[str]:
+    """Símbolos de `crypto_precios`, saltando por la clave primaria."""
+    symbols = []
+    anterior = ''
+    while True:
+        anterior = conn.execute('SELECT MIN(symbol) FROM crypto_precios WHERE symbol > ?',
+                                (anterior,)).fetchone()[0]
+        if anterior is None:
+            return symbols
+        symbols.append(anterior)
+
+class ArchivoPrecios:
+    """Lector del archivo columnar; reabre el mapeo cuando un archivo crece."""
+
+    def __init__(self, directorio: Path = ARCHIVE_DIR):
+        self.directorio = Path(directorio)
+        self._mapas: Dict[str, Tuple[int, np.ndarray, np.ndarray]] = {}
+        self._lock = threading.Lock()
+
+    def symbols(self) -> List[str]:
+        return sorted(ruta.stem for ruta in self.directorio.glob('*.ts'))
+
+    def _columnas(self, symbol: str) -> Tuple[np.ndarray, np.ndarray]:
+        ruta_ts, ruta_precio = _rutas(self.directorio, symbol)
+        n = _largo(ruta_ts, ruta_precio)
+        with self._lock:
+            cache = self._mapas.get(symbol)
+            if cache is None or cache[0] != n:
+                if n == 0:
+                    vacio = (np.empty(0, TS_DTYPE), np.empty(0, PRECIO_DTYPE))
+                    cache = (0, *vacio)
+                else:
+                    cache = (n,
+                             np.memmap(ruta_ts, TS_DTYPE, mode='r', shape=(n,)),
+                             np.memmap(ruta_precio, PRECIO_DTYPE, mode='r', shape=(n,)))
+                self._mapas[symbol] = cache
+        return cache[1], cache[2]
+
+    def ultimo_ts(self, symbol: str) -> Optional[int]:
+        ts, _ = self._columnas(symbol)
+        return int(ts[-1]) if len(ts) else None
+
+    def serie(self, symbol: str, desde: Optional[int] = None,
+              hasta: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Timestamps y precios de [desde, hasta) como vistas de solo lectura
+        sobre el archivo (sin copia).
+        """
+        ts, precios = self._columnas(symbol)
+        inicio = 0 if desde is None else int(np.searchsorted(ts, desde, side='left'))
+        fin = len(ts) if hasta is None else int(np.searchsorted(ts, hasta, side='left'))
+        return ts[inicio:fin], precios[inicio:fin]
+
+def _anexar(directorio: Path, symbol: str, ts: np.ndarray, precios: np.ndarray) -> None:
+    ruta_ts, ruta_precio = _rutas(directorio, symbol)
+    n = _largo(ruta_ts, ruta_precio)
+    for ruta, datos, dtype in ((ruta_ts, ts, TS_DTYPE), (ruta_precio, precios, PRECIO_DTYPE)):
+        with open(ruta, 'ab') as f:
+            # Descartar un registro parcial de una compactación interrumpida
+            if f.tell() != n * dtype.itemsize:
+                f.truncate(n * dtype.itemsize)
+            f.write(np.ascontiguousarray(datos, dtype=dtype).tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+
+def _en_archivo(ts_archivo: np.ndarray, ts: np.ndarray) -> np.ndarray:
+    """Máscara de los `ts` que ya están en `ts_archivo` (ordenado)."""
+    if not len(ts_archivo):
+        return np.zeros(len(ts), dtype=bool)
+    pos = np.minimum(np.searchsorted(ts_archivo, ts), len(ts_archivo) - 1)
+    return ts_archivo[pos] == ts
+
+def _borrar_archivados(conn: sqlite3.Connection, symbol: str, ts: np.ndarray) -> None:
+    """Borra de SQLite exactamente los ticks `ts` (ordenados) de `symbol`, ya anexados al archivo."""
+    if not len(ts):
+        return
+    primero, ultimo = int(ts[0]), int(ts[-1])
+    try:
+        with conn:
+            # Por rango si en él no hay más filas que las archivadas (en una
+            # sola sentencia, sin carrera con el escritor); si no, por clave
+            borradas = conn.execute('''DELETE FROM crypto_precios
+                                       WHERE symbol = ? AND ts BETWEEN ? AND ?
+                                       AND (SELECT COUNT(*) FROM crypto_precios
+                                            WHERE symbol = ? AND ts BETWEEN ? AND ?) = ?''',
+                                    (symbol, primero, ultimo, symbol, primero, ultimo,
+                                     len(ts))).rowcount
+            if borradas == 0:
+                conn.executemany('DELETE FROM crypto_precios WHERE symbol = ? AND ts = ?',
+                                 zip(itertools.repeat(symbol), ts.tolist()))
+    except sqlite3.Error as e:
+        logger.error(f"Error al borrar ticks archivados de {symbol}: {e}")
+
+def _depurar_anteriores(conn: sqlite3.Connection, lector: ArchivoPrecios, symbol: str,
+                        hasta: int, tamano_lote: int) -> int:
+    """
+    Filas de SQLite con ts < `hasta` (a lo sumo el último archivado): borra
+    las que ya están en el archivo, de una compactación que no llegó a
+    borrarlas o sin borrado, y retorna cuántas quedan (los ticks tardíos).
+    """
+    ts_archivo, _ = lector.serie(symbol)
+    desde = -2**62
+    tardios = 0
+    while True:
+        filas = conn.execute('''SELECT ts FROM crypto_precios
+                                WHERE symbol = ? AND ts >= ? AND ts < ?
+                                ORDER BY ts LIMIT ?''',
+                             (symbol, desde, hasta, tamano_lote)).fetchall()
+        if not filas:
+            return tardios
+        ts = np.array([fila[0] for fila in filas], dtype=TS_DTYPE)
+        archivados = _en_archivo(ts_archivo, ts)
+        if archivados.any():
+            _borrar_archivados(conn, symbol, ts[archivados])
+        tardios += len(ts) - int(archivados.sum())
+        desde = int(ts[-1]) + 1
+
+def compactar(antes_de: Optional[int] = None, directorio: Path = ARCHIVE_DIR,
+              borrar: bool = True, tamano_lote: int = TAMANO_LOTE) -> int:
+    """
+    Mueve al archivo los ticks con ts < `antes_de` (por defecto, los de más
+    de ARCHIVE_AFTER_DAYS días) y retorna cuántos se archivaron.
+    """
+    if antes_de is None:
+        antes_de = int(time.time()) - ARCHIVE_AFTER_DAYS * 86400
+    directorio = Path(directorio)
+    directorio.mkdir(parents=True, exist_ok=True)
+    lector = ArchivoPrecios(directorio)
+    conn = get_db_connection()
+    inicio = time.perf_counter()
+    total = 0
+    tardios = 0
+
+    for symbol in _symbols(conn):
+        ultimo = lector.ultimo_ts(symbol)
+        desde = ultimo + 1 if ultimo is not None else -2**62
+        if borrar and ultimo is not None:
+            tardios += _depurar_anteriores(conn, lector, symbol, min(desde, antes_de),
+                                           tamano_lote)
+        while True:
+            filas = conn.execute('''SELECT ts, price FROM crypto_precios
+                                    WHERE symbol = ? AND ts >= ? AND ts < ?
+                                    ORDER BY ts LIMIT ?''',
+                                 (symbol, desde, antes_de, tamano_lote)).fetchall()
+            if not filas:
+                break
+            lote = np.array(filas, dtype=[('ts', TS_DTYPE), ('price', PRECIO_DTYPE)])
+            _anexar(directorio, symbol, lote['ts'], lote['price'])
+            desde = int(lote['ts'][-1]) + 1
+            total += len(lote)
+            if borrar:
+                _borrar_archivados(conn, symbol, lote['ts'])
+
+    logger.info(f"Archivo: {total:,} ticks compactados en {time.perf_counter() - inicio:.1f} s"
+                + (f"; {tardios:,} ticks tardíos quedan en SQLite" if tardios else ""))
+    return total
+
+def leer_historial(symbol: str, desde: Optional[int] = None, hasta: Optional[int] = None,
+                   archivo: Optional[ArchivoPrecios] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Ticks de [desde, hasta) combinando el archivo y `crypto_precios`.
+
+    Si SQLite no tiene filas del rango (ni recientes ni tardías) se retornan
+    las vistas del archivo; si no, se combinan con ellas (con copia).
+    """
+    archivo = archivo or ArchivoPrecios()
+    ts, precios = archivo.serie(symbol, desde, hasta)
+    try:
+        filas = get_db_connection().execute(
+            '''SELECT ts, price FROM crypto_precios
+               WHERE symbol = ? AND ts >= ? AND ts < ? ORDER BY ts''',
+            (symbol, desde if desde is not None else -2**62,
+             hasta if hasta is not None else 2**62)).fetchall()
+    except sqlite3.Error as e:
+        logger.error(f"Error al leer ticks recientes de {symbol}: {e}")
+        filas = []
+    if not filas:
+        return ts, precios
+    sql = np.array(filas, dtype=[('ts', TS_DTYPE), ('price', PRECIO_DTYPE)])
+    # Las filas que también están en el archivo (compactación sin borrado) se descartan
+    sql = sql[~_en_archivo(ts, sql['ts'])]
+    if not len(sql):
+        return ts, precios
+    todos_ts = np.concatenate([ts, sql['ts']])
+    todos_precios = np.concatenate([precios, sql['price']])
+    if len(ts) and sql['ts'][0] < ts[-1]:
+        # Ticks tardíos: quedaron en SQLite con ts anterior al último archivado
+        orden = np.argsort(todos_ts, kind='stable')
+        return todos_ts[orden], todos_precios[orden]
+    return todos_ts, todos_precios
+
+def main():
+    parser = argparse.ArgumentParser(description="Compacta ticks viejos en el archivo columnar")
+    parser.add_argument('--dias', type=float, default=ARCHIVE_AFTER_DAYS,
+                        help="archivar ticks con más de N días")
+    parser.add_argument('--sin-borrar', action='store_true',
+                        help="copiar al archivo sin borrar de SQLite")
+    args = parser.parse_args()
+
+    init_db()
+    compactar(int(time.time() - args.dias * 86400), borrar=not args.sin_borrar)
+
+if __name__ == "__main__":
+    main()
@@ -1,30 +1,79 @@
 """Gestión de conexiones a la base de datos."""
 import sqlite3
+import threading
 from pathlib import Path
+from typing import List
 from utils.logger import logger
 from config.settings import DB_PATH
+from database.migrations import aplicar_migraciones
+
+PRAGMAS = (
+    # Solo tiene efecto en bases nuevas; las existentes se convierten en el mantenimiento
+    'PRAGMA auto_vacuum=INCREMENTAL',
+    'PRAGMA journal_mode=WAL',
+    'PRAGMA synchronous=NORMAL',
+    'PRAGMA temp_store=MEMORY',
+    'PRAGMA cache_size=-16000',
+    'PRAGMA busy_timeout=5000',
+)
+
+_local = threading.local()
+_conexiones: List[sqlite3.Connection] = []
+_conexiones_lock = threading.Lock()
+_generacion = 0
 
 def ensure_db_directory():
     """Asegura que existe el directorio para la base de datos."""
     DB_PATH.parent.mkdir(parents=True, exist_ok=True)
 
-def get_db_connection():
-    """Retorna una conexión a la base de datos."""
+def _abrir_conexion() -> sqlite3.Connection:
+    """Abre una conexión nueva y aplica los pragmas de rendimiento."""
+    conn = sqlite3.connect(DB_PATH, check_same_thread=False)
+    for pragma in PRAGMAS:
+        conn.execute(pragma)
+    return conn
+
+def get_db_connection() -> sqlite3.Connection:
+    """
+    Retorna la conexión persistente del hilo actual.
+
+    Cada hilo reutiliza su propia conexión durante toda la vida del proceso,
+    por lo que `with get_db_connection() as conn:` solo delimita la
+    transacción y no abre ni cierra el archivo.
+    """
+    conn = getattr(_local, 'conn', None)
+    if conn is not None and getattr(_local, 'generacion', None) == _generacion:
+        return conn
+
     ensure_db_directory()
     try:
-        return sqlite3.connect(DB_PATH)
+        conn = _abrir_conexion()
     except sqlite3.Error as e:
         logger.error(f"Error al conectar a la base de datos: {e}")
         raise
 
+    with _conexiones_lock:
+        _conexiones.append(conn)
+        _local.conn = conn
+        _local.generacion = _generacion
+    return conn
+
+def close_db_connections():
+    """Cierra todas las conexiones persistentes abiertas por el proceso."""
+    global _generacion
+    with _conexiones_lock:
+        for conn in _conexiones:
+            try:
+                conn.close()
+            except sqlite3.Error as e:
+                logger.error(f"Error al cerrar la base de datos: {e}")
+        _conexiones.clear()
+        _generacion += 1
+
 def init_db():
     """Inicializa la estructura de la base de datos."""
     try:
-        with get_db_connection() as conn:
-            c = conn.cursor()
-            c.execute('''CREATE TABLE IF NOT EXISTS crypto_precios
-                        (timestamp TEXT, symbol TEXT, price REAL)''')
-            conn.commit()
+        aplicar_migraciones(get_db_connection())
     except sqlite3.Error as e:
         logger.error(f"Error al inicializar la base de datos: {e}")
-        raise 
\ No newline at end of file
+        raise
@@ -0,0 +1,260 @@
+"""
+Mantenimiento periódico de la base de precios.
+
+Cada ejecución aplica la retención de RETENCION_DIAS (archivando antes los
+ticks si MAINTENANCE_ARCHIVE está activo), libera páginas con
+`incremental_vacuum`, actualiza las estadísticas del planificador y deja en
+el log el tamaño de la base y la latencia de las consultas antes y después.
+
+Los borrados se hacen en lotes chicos, cada uno en su propia transacción y
+con una pausa entre lotes, para que el hilo de escritura nunca espere más
+que un lote.
+
+Una base creada antes de `auto_vacuum=INCREMENTAL` necesita un VACUUM
+completo para convertirse, que bloquea la base mientras la reescribe; el
+mantenimiento periódico no lo hace y solo lo avisa en el log. La conversión
+se hace a mano, con el monitor detenido:
+
+Uso (desde la raíz del proyecto):
+    python -m database.maintenance [--activar-vacuum]
+"""
+import argparse
+import sqlite3
+import statistics
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from config.settings import (
+    DB_PATH, HISTORY_LIMIT, MAINTENANCE_INTERVAL, MAINTENANCE_ARCHIVE, RETENCION_DIAS,
+    SUPPORTED_COINS
+)
+from utils.logger import logger
+from database.connection import get_db_connection, init_db
+
+TAMANO_LOTE = 2000
+PAUSA_LOTE = 0.005  # segundos entre lotes
+PAGINAS_VACUUM = 1000  # páginas liberadas por transacción
+
+@dataclass
+class EstadoBase:
+    """Tamaño de la base y latencia de las consultas frecuentes."""
+    bytes_db: int
+    bytes_wal: int
+    paginas_libres: int
+    historial_ms: float
+    velas_ms: float
+
+    def __str__(self) -> str:
+        return (f"{self.bytes_db / 2**20:,.1f} MiB (+{self.bytes_wal / 2**20:,.1f} MiB WAL, "
+                f"{self.paginas_libres:,} páginas libres), historial {self.historial_ms:.2f} ms, "
+                f"velas {self.velas_ms:.2f} ms")
+
+@dataclass
+class InformeMantenimiento:
+    antes: EstadoBase
+    despues: EstadoBase
+    borrados: Dict[str, int] = field(default_factory=dict)
+    archivados: int = 0
+    duracion_s: float = 0.0
+
+def _symbols(conn: sqlite3.Connection, tabla: str) -> List[str]:
+    """Símbolos de `tabla`, saltando por la clave primaria."""
+    symbols = []
+    anterior = ''
+    while True:
+        anterior = conn.execute(f'SELECT MIN(symbol) FROM {tabla} WHERE symbol > ?',
+                                (anterior,)).fetchone()[0]
+        if anterior is None:
+            return symbols
+        symbols.append(anterior)
+
+def medir_estado(conn: sqlite3.Connection, muestras: int = 3) -> EstadoBase:
+    """Toma el tamaño de la base y la mediana de latencia de las consultas del monitor."""
+    from database.operations import get_price_history, get_velas
+
+    tamano_pagina = conn.execute('PRAGMA page_size').fetchone()[0]
+    paginas = conn.execute('PRAGMA page_count').fetchone()[0]
+    libres = conn.execute('PRAGMA freelist_count').fetchone()[0]
+    wal = DB_PATH.with_name(DB_PATH.name + '-wal')
+
+    historial, velas = [], []
+    for symbol in list(SUPPORTED_COINS)[:muestras]:
+        inicio = time.perf_counter()
+        get_price_history(symbol, HISTORY_LIMIT)
+        historial.append((time.perf_counter() - inicio) * 1000)
+        inicio = time.perf_counter()
+        get_velas(symbol, 3600, limit=24)
+        velas.append((time.perf_counter() - inicio) * 1000)
+
+    return EstadoBase(
+        bytes_db=paginas * tamano_pagina,
+        bytes_wal=wal.stat().st_size if wal.exists() else 0,
+        paginas_libres=libres,
+        historial_ms=statistics.median(historial) if historial else 0.0,
+        velas_ms=statistics.median(velas) if velas else 0.0,
+    )
+
+def _borrar_en_lotes(conn: sqlite3.Connection, tabla: str, columnas: Tuple[str, ...],
+                     filtro: tuple, antes_de: int, tamano_lote: int, pausa: float) -> int:
+    """Borra las filas de `tabla` con ts < `antes_de` y `columnas` = `filtro`."""
+    condicion = ' AND '.join(f'{c} = ?' for c in columnas)
+    # Cada lote localiza sus filas por la clave primaria (row values de SQLite)
+    consulta = f'''DELETE FROM {tabla} WHERE ({', '.join(columnas)}, ts) IN (
+                       SELECT {', '.join(columnas)}, ts FROM {tabla}
+                       WHERE {condicion} AND ts < ? ORDER BY ts LIMIT ?)'''
+    total = 0
+    while True:
+        try:
+            with conn:
+                borradas = conn.execute(consulta, filtro + (antes_de, tamano_lote)).rowcount
+        except sqlite3.Error as e:
+            logger.error(f"Error al borrar lote de {tabla} {filtro}: {e}")
+            break
+        total += borradas
+        if borradas < tamano_lote:
+            break
+        time.sleep(pausa)
+    return total
+
+def aplicar_retencion(conn: sqlite3.Connection, ahora: Optional[int] = None,
+                      retencion: Dict[int, Optional[float]] = RETENCION_DIAS,
+                      tamano_lote: int = TAMANO_LOTE, pausa: float = PAUSA_LOTE) -> Dict[str, int]:
+    """Borra lo que excede la retención de cada resolución; retorna filas borradas por resolución."""
+    ahora = ahora if ahora is not None else int(time.time())
+    borrados: Dict[str, int] = {}
+    for intervalo, dias in sorted(retencion.items()):
+        if dias is None:
+            continue
+        antes_de = ahora - int(dias * 86400)
+        if intervalo == 0:
+            total = sum(_borrar_en_lotes(conn, 'crypto_precios', ('symbol',), (symbol,),
+                                         antes_de, tamano_lote, pausa)
+                        for symbol in _symbols(conn, 'crypto_precios'))
+            borrados['ticks'] = total
+        else:
+            total = sum(_borrar_en_lotes(conn, 'velas_ohlcv', ('symbol', 'intervalo'),
+                                         (symbol, intervalo), antes_de, tamano_lote, pausa)
+                        for symbol in _symbols(conn, 'velas_ohlcv'))
+            borrados[f'{intervalo}s'] = total
+    return borrados
+
+def vacuum_incremental_activo(conn: sqlite3.Connection) -> bool:
+    return conn.execute('PRAGMA auto_vacuum').fetchone()[0] == 2
+
+def activar_vacuum_incremental(conn: sqlite3.Connection) -> None:
+    """
+    Convierte una base creada sin auto_vacuum; requiere un VACUUM completo una
+    sola vez, con la base bloqueada. Solo fuera del monitor.
+    """
+    if vacuum_incremental_activo(conn):
+        return
+    logger.info("Activando auto_vacuum incremental (VACUUM completo, única vez)")
+    conn.execute('PRAGMA auto_vacuum=INCREMENTAL')
+    conn.execute('VACUUM')
+
+def vacuum_incremental(conn: sqlite3.Connection, paginas: int = PAGINAS_VACUUM,
+                       pausa: float = PAUSA_LOTE) -> int:
+    """Devuelve al sistema las páginas libres en pasos cortos; retorna cuántas liberó."""
+    liberadas = 0
+    while True:
+        libres = conn.execute('PRAGMA freelist_count').fetchone()[0]
+        if libres == 0:
+            break
+        # execute() avanza el pragma un solo paso (una página); executescript lo completa
+        conn.executescript(f'PRAGMA incremental_vacuum({min(paginas, libres)});')
+        nuevas = conn.execute('PRAGMA freelist_count').fetchone()[0]
+        if nuevas >= libres:
+            break
+        liberadas += libres - nuevas
+        time.sleep(pausa)
+    conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+    return liberadas
+
+def actualizar_estadisticas(conn: sqlite3.Connection) -> None:
+    """ANALYZE acotado: muestrea cada índice en vez de recorrerlo entero."""
+    conn.execute('PRAGMA analysis_limit=1000')
+    conn.execute('ANALYZE')
+    if conn.in_transaction:
+        conn.commit()
+
+def ejecutar_mantenimiento(archivar: bool = MAINTENANCE_ARCHIVE,
+                           retencion: Dict[int, Optional[float]] = RETENCION_DIAS) -> InformeMantenimiento:
+    """Una pasada completa de mantenimiento."""
+    conn = get_db_connection()
+    inicio = time.perf_counter()
+    antes = medir_estado(conn)
+    logger.info(f"Mantenimiento: antes {antes}")
+
+    archivados = 0
+    if archivar and retencion.get(0) is not None:
+        from database.archive import compactar
+
+        archivados = compactar(int(time.time() - retencion[0] * 86400),
+                               tamano_lote=TAMANO_LOTE)
+        # compactar() ya borró lo archivado; lo que queda son ticks tardíos que no se archivaron
+        retencion = {intervalo: dias for intervalo, dias in retencion.items() if intervalo != 0}
+    borrados = aplicar_retencion(conn, retencion=retencion)
+    try:
+        if vacuum_incremental_activo(conn):
+            vacuum_incremental(conn)
+        else:
+            logger.warning("La base no tiene auto_vacuum incremental: las páginas libres no se "
+                           "devuelven. Para convertirla, con el monitor detenido: "
+                           "python -m database.maintenance --activar-vacuum")
+        actualizar_estadisticas(conn)
+    except sqlite3.Error as e:
+        logger.error(f"Error en vacuum/ANALYZE: {e}")
+
+    informe = InformeMantenimiento(antes=antes, despues=medir_estado(conn), borrados=borrados,
+                                   archivados=archivados,
+                                   duracion_s=time.perf_counter() - inicio)
+    logger.info(f"Mantenimiento: después {informe.despues}; {archivados:,} ticks archivados, "
+                f"borrados {borrados}, {informe.duracion_s:.1f} s")
+    return informe
+
+class MantenimientoPeriodico:
+    """Ejecuta `ejecutar_mantenimiento()` cada `intervalo` segundos en un hilo de fondo."""
+
+    def __init__(self, intervalo: float = MAINTENANCE_INTERVAL):
+        self.intervalo = intervalo
+        self.ultimo: Optional[InformeMantenimiento] = None
+        self._detener = threading.Event()
+        self._hilo: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._hilo is None:
+            self._detener.clear()
+            self._hilo = threading.Thread(target=self._run, name='mantenimiento', daemon=True)
+            self._hilo.start()
+
+    def _run(self) -> None:
+        while not self._detener.wait(self.intervalo):
+            try:
+                self.ultimo = ejecutar_mantenimiento()
+            except Exception as e:
+                logger.error(f"Error en el mantenimiento de la base: {e}")
+
+    def stop(self, timeout: float = 30.0) -> None:
+        """Detiene el hilo, esperando hasta `timeout` a que termine una pasada en curso."""
+        if self._hilo is None:
+            return
+        self._detener.set()
+        self._hilo.join(timeout)
+        self._hilo = None
+
+def main():
+    parser = argparse.ArgumentParser(description="Mantenimiento de la base de precios")
+    parser.add_argument('--activar-vacuum', action='store_true',
+                        help="convertir la base a auto_vacuum incremental (VACUUM completo; "
+                             "con el monitor detenido)")
+    args = parser.parse_args()
+
+    init_db()
+    if args.activar_vacuum:
+        activar_vacuum_incremental(get_db_connection())
+    ejecutar_mantenimiento()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""Migraciones versionadas del esquema de la base de datos."""
+import sqlite3
+from datetime import datetime
+from functools import lru_cache
+from typing import Callable, List, Optional
+from config.settings import INTERVALOS_AGREGADOS
+from utils.logger import logger
+
+FORMATO_TIMESTAMP = '%Y-%m-%d %H:%M:%S'
+
+# Todos los símbolos de un mismo ciclo comparten timestamp.
+@lru_cache(maxsize=4096)
+def _a_epoch(timestamp: str) -> Optional[int]:
+    """Convierte un timestamp 'YYYY-mm-dd HH:MM:SS' en hora local a epoch."""
+    try:
+        return int(datetime.strptime(timestamp, FORMATO_TIMESTAMP).timestamp())
+    except (TypeError, ValueError):
+        return None
+
+def _columnas(conn: sqlite3.Connection, tabla: str) -> List[str]:
+    return [fila[1] for fila in conn.execute(f'PRAGMA table_info({tabla})')]
+
+def _v1_precios_indexados(conn: sqlite3.Connection) -> None:
+    """
+    Tabla agrupada por (symbol, ts) con timestamps enteros en epoch.
+
+    Convierte en el mismo archivo la tabla original
+    `(timestamp TEXT, symbol TEXT, price REAL)` si existe.
+    """
+    legacy = 'timestamp' in _columnas(conn, 'crypto_precios')
+    if legacy:
+        conn.execute('ALTER TABLE crypto_precios RENAME TO crypto_precios_v0')
+
+    conn.execute('''CREATE TABLE crypto_precios (
+                        symbol TEXT NOT NULL,
+                        ts INTEGER NOT NULL,
+                        price REAL NOT NULL,
+                        PRIMARY KEY (symbol, ts)
+                    ) WITHOUT ROWID''')
+
+    if legacy:
+        conn.create_function('a_epoch', 1, _a_epoch, deterministic=True)
+        conn.execute('''INSERT OR REPLACE INTO crypto_precios (symbol, ts, price)
+                        SELECT symbol, ts, price FROM (
+                            SELECT symbol, a_epoch(timestamp) AS ts, price
+                            FROM crypto_precios_v0
+                        )
+                        WHERE symbol IS NOT NULL AND ts IS NOT NULL
+                              AND price IS NOT NULL
+                        ORDER BY symbol, ts''')
+        conn.execute('DROP TABLE crypto_precios_v0')
+
+def _v2_velas_ohlcv(conn: sqlite3.Connection) -> None:
+    """Velas OHLCV por intervalo (segundos) y registro de cargas masivas."""
+    conn.execute('''CREATE TABLE IF NOT EXISTS velas_ohlcv (
+                        symbol TEXT NOT NULL,
+                        intervalo INTEGER NOT NULL,
+                        ts INTEGER NOT NULL,
+                        open REAL NOT NULL,
+                        high REAL NOT NULL,
+                        low REAL NOT NULL,
+                        close REAL NOT NULL,
+                        volume REAL NOT NULL DEFAULT 0,
+                        PRIMARY KEY (symbol, intervalo, ts)
+                    ) WITHOUT ROWID''')
+    conn.execute('''CREATE TABLE IF NOT EXISTS cargas_ohlcv (
+                        archivo TEXT PRIMARY KEY,
+                        tamano INTEGER NOT NULL,
+                        symbol TEXT NOT NULL,
+                        intervalo INTEGER NOT NULL,
+                        filas INTEGER NOT NULL DEFAULT 0,
+                        completada INTEGER NOT NULL DEFAULT 0,
+                        actualizado INTEGER NOT NULL
+                    )''')
+
+def _v3_agregados_desde_ticks(conn: sqlite3.Connection) -> None:
+    """Genera las velas de INTERVALOS_AGREGADOS a partir de los ticks existentes."""
+    for intervalo in INTERVALOS_AGREGADOS:
+        conn.execute(f'''INSERT OR REPLACE INTO velas_ohlcv
+                             (symbol, intervalo, ts, open, high, low, close, volume)
+                         SELECT symbol, {intervalo}, cubeta,
+                                MAX(CASE WHEN primero = 1 THEN price END), MAX(price),
+                                MIN(price), MAX(CASE WHEN ultimo = 1 THEN price END), 0
+                         FROM (SELECT symbol, price, ts - ts % {intervalo} AS cubeta,
+                                      ROW_NUMBER() OVER (PARTITION BY symbol, ts - ts % {intervalo}
+                                                         ORDER BY ts) AS primero,
+                                      ROW_NUMBER() OVER (PARTITION BY symbol, ts - ts % {intervalo}
+                                                         ORDER BY ts DESC) AS ultimo
+                               FROM crypto_precios)
+                         GROUP BY symbol, cubeta''')
+
+MIGRACIONES: List[Callable[[sqlite3.Connection], None]] = [
+    _v1_precios_indexados,
+    _v2_velas_ohlcv,
+    _v3_agregados_desde_ticks,
+]
+
+def version_esquema(conn: sqlite3.Connection) -> int:
+    """Retorna la versión actual del esquema (PRAGMA user_version)."""
+    return conn.execute('PRAGMA user_version').fetchone()[0]
+
+def aplicar_migraciones(conn: sqlite3.Connection) -> None:
+    """Aplica en orden las migraciones pendientes, cada una en su transacción."""
+    version = version_esquema(conn)
+    for numero, migracion in enumerate(MIGRACIONES[version:], start=version + 1):
+        logger.info(f"Aplicando migración de esquema v{numero}: {migracion.__name__}")
+        try:
+            conn.execute('BEGIN')
+            migracion(conn)
+            conn.execute(f'PRAGMA user_version = {numero}')
+            conn.commit()
+        except sqlite3.Error as e:
+            conn.rollback()
+            logger.error(f"Error en la migración v{numero}: {e}")
+            raise
@@ -0,0 +1,170 @@
+"""
+Carga masiva de velas OHLCV desde volcados CSV o Parquet.
+
+La lectura es por bloques (memoria acotada) y cada bloque se inserta junto
+con el avance en `cargas_ohlcv` y la reconstrucción de las velas agregadas
+que toca, dentro de la misma transacción. Si la carga
+se interrumpe, la siguiente ejecución continúa desde el último bloque
+confirmado; volver a cargar el mismo archivo no duplica velas.
+
+Formatos aceptados:
+- CSV con encabezado (`open_time`/`timestamp`/`ts`, `open`, `high`, `low`,
+  `close` y opcionalmente `volume`).
+- CSV sin encabezado con el formato de los klines de Binance
+  (open_time, open, high, low, close, volume, ...).
+- Parquet con las mismas columnas (requiere `pyarrow`).
+
+Uso (desde la raíz del proyecto):
+    python -m database.ohlcv_loader archivo.csv --symbol BTC [--intervalo 60]
+"""
+import argparse
+import sqlite3
+import time
+from pathlib import Path
+from typing import Iterator, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from utils.logger import logger
+from database.connection import get_db_connection, init_db
+from database.operations import recalcular_agregados
+
+COLUMNAS = ['ts', 'open', 'high', 'low', 'close', 'volume']
+ALIAS_TS = ('open_time', 'timestamp', 'ts', 'time')
+TAMANO_LOTE = 100_000
+
+INSERT_VELA = '''INSERT OR REPLACE INTO velas_ohlcv
+                 (symbol, intervalo, ts, open, high, low, close, volume)
+                 VALUES (?, ?, ?, ?, ?, ?, ?, ?)'''
+
+def _a_segundos(ts: np.ndarray) -> np.ndarray:
+    """Normaliza timestamps en s, ms o µs a segundos epoch."""
+    ts = ts.astype(np.int64)
+    if len(ts) == 0:
+        return ts
+    muestra = int(ts.max())
+    if muestra > 10**14:
+        return ts // 1_000_000
+    if muestra > 10**11:
+        return ts // 1_000
+    return ts
+
+def _normalizar(df: pd.DataFrame) -> pd.DataFrame:
+    """Renombra las columnas al formato interno."""
+    df = df.rename(columns={c: c.lower().strip() for c in df.columns})
+    for alias in ALIAS_TS:
+        if alias in df.columns:
+            df = df.rename(columns={alias: 'ts'})
+            break
+    if 'volume' not in df.columns:
+        df['volume'] = 0.0
+    faltantes = [c for c in COLUMNAS if c not in df.columns]
+    if faltantes:
+        raise ValueError(f"Columnas faltantes en el archivo: {faltantes}")
+    return df[COLUMNAS]
+
+def _tiene_encabezado(ruta: Path) -> bool:
+    with open(ruta, 'r', encoding='utf-8') as f:
+        primero = f.readline().split(',')[0].strip()
+    try:
+        float(primero)
+        return False
+    except ValueError:
+        return True
+
+def leer_bloques(ruta: Path, desde: int = 0,
+                 tamano_lote: int = TAMANO_LOTE) -> Iterator[pd.DataFrame]:
+    """Itera el archivo en bloques de `tamano_lote` filas, saltando las primeras `desde`."""
+    if ruta.suffix.lower() in ('.parquet', '.pq'):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("Se requiere pyarrow para leer archivos Parquet")
+        saltar = desde
+        for lote in pq.ParquetFile(ruta).iter_batches(batch_size=tamano_lote):
+            if saltar >= lote.num_rows:
+                saltar -= lote.num_rows
+                continue
+            yield _normalizar(lote.slice(saltar).to_pandas())
+            saltar = 0
+        return
+
+    if _tiene_encabezado(ruta):
+        lector = pd.read_csv(ruta, chunksize=tamano_lote,
+                             skiprows=range(1, desde + 1) if desde else None)
+    else:
+        lector = pd.read_csv(ruta, header=None, usecols=range(6), names=COLUMNAS,
+                             chunksize=tamano_lote, skiprows=desde or None)
+    for bloque in lector:
+        yield _normalizar(bloque)
+
+def _filas(df: pd.DataFrame, symbol: str, intervalo: int) -> List[Tuple]:
+    ts = _a_segundos(df['ts'].to_numpy())
+    n = len(df)
+    return list(zip([symbol] * n, [intervalo] * n, ts.tolist(),
+                    *(df[c].to_numpy(dtype=np.float64).tolist()
+                      for c in ('open', 'high', 'low', 'close', 'volume'))))
+
+def cargar_velas(ruta, symbol: str, intervalo: int = 60,
+                 tamano_lote: int = TAMANO_LOTE) -> int:
+    """
+    Carga un archivo de velas para `symbol` y retorna las filas insertadas
+    en esta ejecución (0 si el archivo ya estaba cargado).
+    """
+    ruta = Path(ruta).resolve()
+    tamano = ruta.stat().st_size
+    conn = get_db_connection()
+
+    registro = conn.execute('SELECT tamano, filas, completada FROM cargas_ohlcv '
+                            'WHERE archivo = ?', (str(ruta),)).fetchone()
+    desde = 0
+    if registro is not None and registro[0] == tamano:
+        if registro[2]:
+            logger.info(f"{ruta.name} ya estaba cargado ({registro[1]:,} filas)")
+            return 0
+        desde = registro[1]
+        logger.info(f"Reanudando carga de {ruta.name} desde la fila {desde:,}")
+
+    cargadas = 0
+    inicio = time.perf_counter()
+    for bloque in leer_bloques(ruta, desde, tamano_lote):
+        filas = _filas(bloque, symbol, intervalo)
+        desde += len(filas)
+        try:
+            with conn:
+                conn.executemany(INSERT_VELA, filas)
+                recalcular_agregados(conn, symbol, intervalo, filas[0][2], filas[-1][2] + 1)
+                conn.execute('''INSERT OR REPLACE INTO cargas_ohlcv
+                                (archivo, tamano, symbol, intervalo, filas, completada, actualizado)
+                                VALUES (?, ?, ?, ?, ?, 0, ?)''',
+                             (str(ruta), tamano, symbol, intervalo, desde, int(time.time())))
+        except sqlite3.Error as e:
+            logger.error(f"Error al cargar {ruta.name} en la fila {desde - len(filas):,}: {e}")
+            raise
+        cargadas += len(filas)
+
+    with conn:
+        conn.execute('''INSERT OR REPLACE INTO cargas_ohlcv
+                        (archivo, tamano, symbol, intervalo, filas, completada, actualizado)
+                        VALUES (?, ?, ?, ?, ?, 1, ?)''',
+                     (str(ruta), tamano, symbol, intervalo, desde, int(time.time())))
+    duracion = time.perf_counter() - inicio
+    logger.info(f"{ruta.name}: {cargadas:,} velas en {duracion:.1f} s "
+                f"({cargadas / max(duracion, 1e-9):,.0f} filas/s)")
+    return cargadas
+
+def main():
+    parser = argparse.ArgumentParser(description="Carga masiva de velas OHLCV")
+    parser.add_argument('archivos', nargs='+')
+    parser.add_argument('--symbol', required=True)
+    parser.add_argument('--intervalo', type=int, default=60, help="segundos por vela")
+    parser.add_argument('--lote', type=int, default=TAMANO_LOTE)
+    args = parser.parse_args()
+
+    init_db()
+    for archivo in args.archivos:
+        cargar_velas(archivo, args.symbol, args.intervalo, args.lote)
+
+if __name__ == "__main__":
+    main()
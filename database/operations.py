@@ -1,27 +1,210 @@
 """Operaciones de la base de datos."""
-import pandas as pd
+from __future__ import annotations
+
+import numpy as np
 import sqlite3
+from typing import Dict, List, Optional, Tuple
+from config.settings import INTERVALOS_AGREGADOS
+from utils.lazy_modules import modulo_diferido
 from utils.logger import logger
 from database.connection import get_db_connection
 
-def save_price(timestamp: str, symbol: str, price: float) -> None:
-    """Guarda un nuevo precio en la base de datos."""
+# Solo las consultas que retornan DataFrames lo usan (no la escritura ni la precarga)
+pd = modulo_diferido('pandas')
+
+INSERT_PRECIO = '''INSERT OR REPLACE INTO crypto_precios (symbol, ts, price)
+                   VALUES (?, ?, ?)'''
+
+# Los ticks llegan en orden, así que el último aplicado es el cierre
+UPSERT_AGREGADO = '''INSERT INTO velas_ohlcv
+                     (symbol, intervalo, ts, open, high, low, close, volume)
+                     VALUES (?, ?, ?, ?, ?, ?, ?, 0)
+                     ON CONFLICT (symbol, intervalo, ts) DO UPDATE SET
+                         high = MAX(high, excluded.high),
+                         low = MIN(low, excluded.low),
+                         close = excluded.close'''
+
+def _actualizar_agregados(conn: sqlite3.Connection, ts: int,
+                          precios: Dict[str, float]) -> None:
+    """Incorpora los ticks de un ciclo a las velas de INTERVALOS_AGREGADOS."""
+    conn.executemany(UPSERT_AGREGADO, [
+        (symbol, intervalo, ts - ts % intervalo, price, price, price, price)
+        for intervalo in INTERVALOS_AGREGADOS
+        for symbol, price in precios.items()
+    ])
+
+def save_price(ts: int, symbol: str, price: float) -> None:
+    """Guarda un nuevo precio en la base de datos (ts en segundos epoch)."""
     try:
         with get_db_connection() as conn:
             c = conn.cursor()
-            c.execute('INSERT INTO crypto_precios VALUES (?, ?, ?)',
-                     (timestamp, symbol, price))
+            c.execute(INSERT_PRECIO, (symbol, ts, price))
+            _actualizar_agregados(conn, ts, {symbol: price})
             conn.commit()
     except sqlite3.Error as e:
         logger.error(f"Error al guardar precio para {symbol}: {e}")
 
+def save_prices_bulk(ts: int, precios: Dict[str, float]) -> None:
+    """Guarda los precios de un ciclo completo en una sola transacción."""
+    if not precios:
+        return
+    try:
+        with get_db_connection() as conn:
+            conn.executemany(INSERT_PRECIO,
+                             [(symbol, ts, price)
+                              for symbol, price in precios.items()])
+            _actualizar_agregados(conn, ts, precios)
+    except sqlite3.Error as e:
+        logger.error(f"Error al guardar {len(precios)} precios: {e}")
+
 def get_price_history(symbol: str, limit: int = 30) -> pd.DataFrame:
     """Obtiene el historial de precios para un símbolo."""
     try:
         with get_db_connection() as conn:
-            query = '''SELECT timestamp, price FROM crypto_precios 
-                      WHERE symbol = ? ORDER BY timestamp DESC LIMIT ?'''
+            query = '''SELECT ts, price FROM crypto_precios
+                      WHERE symbol = ? ORDER BY ts DESC LIMIT ?'''
             return pd.read_sql_query(query, conn, params=(symbol, limit))
     except sqlite3.Error as e:
         logger.error(f"Error al obtener historial para {symbol}: {e}")
-        return pd.DataFrame() 
\ No newline at end of file
+        return pd.DataFrame() 
+
+def get_historial_pagina(symbol: str, limite: int, antes: Optional[int] = None,
+                         desde: Optional[int] = None) -> List[Tuple[int, float]]:
+    """
+    Página de ticks de `symbol` del más reciente al más viejo, con ts en
+    [desde, antes). La siguiente página se pide con `antes` = último ts recibido.
+    """
+    try:
+        return get_db_connection().execute(
+            '''SELECT ts, price FROM crypto_precios
+               WHERE symbol = ? AND ts >= ? AND ts < ?
+               ORDER BY ts DESC LIMIT ?''',
+            (symbol, desde if desde is not None else -2**62,
+             antes if antes is not None else 2**62, limite)).fetchall()
+    except sqlite3.Error as e:
+        logger.error(f"Error al obtener historial para {symbol}: {e}")
+        return []
+
+def get_ticks_posteriores(symbols: List[str], desde: int,
+                          lote: int = 500) -> List[Tuple[str, int, float]]:
+    """
+    Ticks (symbol, ts, precio) de `symbols` con ts > `desde`, en orden
+    cronológico. Una consulta por lote de símbolos: cada uno es un rango de la
+    clave primaria, sin recorrer el resto del historial.
+    """
+    ticks: List[Tuple[str, int, float]] = []
+    try:
+        conn = get_db_connection()
+        for i in range(0, len(symbols), lote):
+            parte = symbols[i:i + lote]
+            ticks.extend(conn.execute(
+                f'''SELECT symbol, ts, price FROM crypto_precios
+                   WHERE symbol IN ({', '.join('?' * len(parte))}) AND ts > ?''',
+                (*parte, desde)).fetchall())
+    except sqlite3.Error as e:
+        logger.error(f"Error al obtener ticks posteriores a {desde}: {e}")
+        return []
+    ticks.sort(key=lambda tick: tick[1])
+    return ticks
+
+COLUMNAS_VELAS = ['ts', 'open', 'high', 'low', 'close', 'volume']
+
+CONSULTA_VELAS = '''SELECT ts, open, high, low, close, volume FROM velas_ohlcv
+                    WHERE symbol = ? AND intervalo = ? AND ts >= ? AND ts < ?
+                    ORDER BY ts'''
+CONSULTA_TICKS = '''SELECT ts, price AS open, price AS high, price AS low,
+                           price AS close, 0.0 AS volume FROM crypto_precios
+                    WHERE symbol = ? AND ts >= ? AND ts < ?
+                    ORDER BY ts'''
+
+def _intervalo_base(conn, symbol: str, intervalo: int) -> Optional[int]:
+    """Mayor intervalo almacenado que divide exactamente a `intervalo`."""
+    # Salto por la clave primaria: un seek por intervalo en vez de recorrer las velas
+    almacenados = []
+    anterior = -1
+    while True:
+        anterior = conn.execute('SELECT MIN(intervalo) FROM velas_ohlcv '
+                                'WHERE symbol = ? AND intervalo > ?',
+                                (symbol, anterior)).fetchone()[0]
+        if anterior is None:
+            break
+        almacenados.append(anterior)
+    candidatos = [i for i in almacenados if intervalo % i == 0]
+    return max(candidatos) if candidatos else None
+
+def _agregar_velas(df: pd.DataFrame, intervalo: int) -> pd.DataFrame:
+    """Agrupa velas ordenadas por ts en velas de `intervalo` segundos."""
+    ts = df['ts'].to_numpy()
+    cubetas = ts - ts % intervalo
+    inicios = np.flatnonzero(np.r_[True, cubetas[1:] != cubetas[:-1]])
+    finales = np.r_[inicios[1:], len(ts)] - 1
+    return pd.DataFrame({
+        'ts': cubetas[inicios],
+        'open': df['open'].to_numpy()[inicios],
+        'high': np.maximum.reduceat(df['high'].to_numpy(), inicios),
+        'low': np.minimum.reduceat(df['low'].to_numpy(), inicios),
+        'close': df['close'].to_numpy()[finales],
+        'volume': np.add.reduceat(df['volume'].to_numpy(), inicios),
+    })
+
+def recalcular_agregados(conn: sqlite3.Connection, symbol: str, base: int,
+                         desde: int, hasta: int) -> None:
+    """
+    Reconstruye las velas de INTERVALOS_AGREGADOS que cubren [desde, hasta)
+    a partir de las velas de `base` segundos. No confirma la transacción.
+    """
+    intervalos = [i for i in INTERVALOS_AGREGADOS if i > base and i % base == 0]
+    if not intervalos:
+        return
+    mayor = max(intervalos)
+    desde -= desde % mayor
+    hasta += -hasta % mayor
+    df = pd.read_sql_query(CONSULTA_VELAS, conn, params=(symbol, base, desde, hasta))
+    if df.empty:
+        return
+    for intervalo in intervalos:
+        agregado = _agregar_velas(df, intervalo)
+        conn.executemany('''INSERT OR REPLACE INTO velas_ohlcv
+                            (symbol, intervalo, ts, open, high, low, close, volume)
+                            VALUES (?, ?, ?, ?, ?, ?, ?, ?)''',
+                         [(symbol, intervalo, *fila)
+                          for fila in agregado.itertuples(index=False, name=None)])
+
+def get_velas(symbol: str, intervalo: int = 60, desde: Optional[int] = None,
+              hasta: Optional[int] = None, limit: Optional[int] = None) -> pd.DataFrame:
+    """
+    Obtiene velas OHLCV de `intervalo` segundos en orden cronológico.
+
+    Se leen las velas almacenadas del mayor intervalo que divide al pedido
+    (p. ej. las agregadas de 1h para pedir 4h) y se agregan en memoria; si no
+    hay ninguno, se construyen desde los ticks de `crypto_precios`.
+    `desde`/`hasta` acotan por ts (hasta exclusivo) y `limit` retorna solo
+    las últimas velas.
+    """
+    hasta = hasta if hasta is not None else 2**62
+    try:
+        conn = get_db_connection()
+        base = _intervalo_base(conn, symbol, intervalo)
+        if base is not None:
+            query, filtro = CONSULTA_VELAS, (symbol, base)
+            query_ultimo = '''SELECT MAX(ts) FROM velas_ohlcv
+                              WHERE symbol = ? AND intervalo = ? AND ts < ?'''
+        else:
+            query, filtro = CONSULTA_TICKS, (symbol,)
+            query_ultimo = 'SELECT MAX(ts) FROM crypto_precios WHERE symbol = ? AND ts < ?'
+
+        if limit is not None and desde is None:
+            ultimo = conn.execute(query_ultimo, filtro + (hasta,)).fetchone()[0]
+            if ultimo is None:
+                return pd.DataFrame(columns=COLUMNAS_VELAS)
+            desde = ultimo - ultimo % intervalo - (limit - 1) * intervalo
+
+        df = pd.read_sql_query(query, conn, params=filtro + (
+            desde if desde is not None else -2**62, hasta))
+    except sqlite3.Error as e:
+        logger.error(f"Error al obtener velas para {symbol}: {e}")
+        return pd.DataFrame(columns=COLUMNAS_VELAS)
+
+    if base != intervalo and not df.empty:
+        df = _agregar_velas(df, intervalo)
+    return df.tail(limit).reset_index(drop=True) if limit is not None else df
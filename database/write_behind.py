@@ -0,0 +1,61 @@
+"""Escritura diferida de precios en un hilo de fondo."""
+import queue
+import threading
+from typing import Dict, Optional
+from utils.logger import logger
+from utils.instrumentation import instrumentacion
+from database.operations import save_prices_bulk
+
+_FIN = None
+
+class WriteBehindWriter:
+    """
+    Persiste los ciclos de precios fuera del bucle principal.
+
+    `submit()` nunca bloquea: si la cola está llena el ciclo se descarta y se
+    registra el error. `stop()` vacía la cola antes de terminar.
+    """
+
+    def __init__(self, max_pendientes: int = 1000):
+        self._cola = queue.Queue(maxsize=max_pendientes)
+        self._hilo: Optional[threading.Thread] = None
+        self.descartados = 0
+
+    def start(self) -> None:
+        """Inicia el hilo de escritura."""
+        if self._hilo is None:
+            self._hilo = threading.Thread(target=self._run, name='write-behind',
+                                          daemon=True)
+            self._hilo.start()
+
+    def submit(self, ts: int, precios: Dict[str, float]) -> None:
+        """Encola los precios de un ciclo para guardarlos."""
+        if not precios:
+            return
+        try:
+            self._cola.put_nowait((ts, dict(precios)))
+        except queue.Full:
+            self.descartados += 1
+            logger.error(f"Cola de escritura llena, ciclo {ts} descartado")
+
+    def pendientes(self) -> int:
+        """Ciclos en espera de ser guardados."""
+        return self._cola.qsize()
+
+    def _run(self) -> None:
+        while True:
+            item = self._cola.get()
+            if item is _FIN:
+                break
+            with instrumentacion.span('guardar'):
+                save_prices_bulk(*item)
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """Guarda lo pendiente y detiene el hilo."""
+        if self._hilo is None:
+            return
+        self._cola.put(_FIN)
+        self._hilo.join(timeout)
+        if self._hilo.is_alive():
+            logger.error(f"Escritura diferida sin terminar, {self.pendientes()} ciclos pendientes")
+        self._hilo = None
@@ -1,10 +1,14 @@
-import pandas as pd
-import numpy as np
+from __future__ import annotations
+
+import warnings
 from typing import Dict
 from dataclasses import dataclass
 from enum import Enum
-from crypto_monitor import identificar_tendencia
+from utils.lazy_modules import modulo_diferido
 from utils.technical_analysis import analizar_resistencias
+from utils.trend_analyzer import identificar_tendencia
+
+pd = modulo_diferido('pandas')
 
 class NivelRiesgo(Enum):
     BAJO = "BAJO"
@@ -19,14 +23,15 @@ class Recomendacion:
     precio_objetivo: float
     stop_loss: float
 
-def generar_recomendacion(
+def recomendar_por_tendencia(
     df: pd.DataFrame,
     precio_actual: float,
     analisis_tendencia: Dict,
     analisis_resistencia: Dict
 ) -> Recomendacion:
     """
-    Genera una recomendación clara basada en el análisis técnico
+    Genera una recomendación clara basada en la tendencia (estrategia
+    'tendencia' del registro de indicadores) y la próxima resistencia
     """
     hay_tendencia = analisis_tendencia['hay_tendencia']
     direccion_tendencia = analisis_tendencia['direccion']
@@ -65,6 +70,12 @@ def generar_recomendacion(
         stop_loss=None
     )
 
+def generar_recomendacion(*args, **kwargs) -> Recomendacion:
+    """Nombre anterior de `recomendar_por_tendencia()`, conservado por compatibilidad"""
+    warnings.warn("recomendaciones.generar_recomendacion() ahora se llama "
+                  "recomendar_por_tendencia()", DeprecationWarning, stacklevel=2)
+    return recomendar_por_tendencia(*args, **kwargs)
+
 def generar_mensaje_usuario(recomendacion: Recomendacion) -> str:
     """
     Genera un mensaje amigable para el usuario
@@ -106,7 +117,7 @@ def analizar_mercado(df: pd.DataFrame):
         hay_tendencia, direccion = identificar_tendencia(df)
         analisis_resistencia = analizar_resistencias(df, precio_actual)
         
-        recomendacion = generar_recomendacion(
+        recomendacion = recomendar_por_tendencia(
             df,
             precio_actual,
             {'hay_tendencia': hay_tendencia, 'direccion': direccion},
@@ -0,0 +1,228 @@
+"""
+Motor de alertas declarativas.
+
+Cada regla vigila un indicador de un símbolo (o de todos, con `'*'`) y se
+dispara cuando el valor cruza su `nivel` en la `direccion` indicada:
+`arriba` (anterior < nivel <= actual) o `abajo` (anterior > nivel >= actual).
+Al ser por cruce, una condición que se mantiene no repite la alerta; además
+cada regla respeta un `cooldown` por símbolo.
+
+Las reglas se indexan por (símbolo, indicador) en listas de niveles
+ordenadas, así que en cada tick solo se miran las reglas cuyo nivel quedó
+entre el valor anterior y el actual (dos búsquedas binarias por serie).
+
+Indicadores disponibles: `precio`, `rsi`, `macd` (MACD - señal, cruza 0 en
+los cruces de MACD), `confianza`, `dist_soporte` y `dist_resistencia` (en %)
+y `variacion_<n>` (variación % respecto de hace n ticks).
+"""
+import hashlib
+import json
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+from config.settings import ALERT_RULES, ALERT_COOLDOWN
+
+TODOS = '*'
+ARRIBA = 'arriba'
+ABAJO = 'abajo'
+PREFIJO_VARIACION = 'variacion_'
+INDICADORES = ('precio', 'rsi', 'macd', 'confianza', 'dist_soporte', 'dist_resistencia')
+
+@dataclass(frozen=True)
+class Regla:
+    """Regla compilada: dispara al cruzar `nivel` en `direccion`."""
+    id: str
+    symbol: str
+    indicador: str
+    nivel: float
+    direccion: str
+    mensaje: str
+    color: str = 'YELLOW'
+    cooldown: Optional[float] = None
+
+@dataclass
+class Alerta:
+    regla: Regla
+    symbol: str
+    valor: float
+    ts: float
+
+    @property
+    def mensaje(self) -> str:
+        return self.regla.mensaje.format(symbol=self.symbol, valor=self.valor,
+                                         nivel=self.regla.nivel)
+
+def compilar_regla(definicion: Dict[str, Any]) -> Regla:
+    """Valida una regla de configuración y la convierte en `Regla`."""
+    indicador = definicion['indicador']
+    if indicador not in INDICADORES and not (
+            indicador.startswith(PREFIJO_VARIACION)
+            and indicador[len(PREFIJO_VARIACION):].isdigit()):
+        raise ValueError(f"Indicador de alerta desconocido: {indicador}")
+    direccion = definicion.get('direccion', ARRIBA)
+    if direccion not in (ARRIBA, ABAJO):
+        raise ValueError(f"Dirección de alerta inválida: {direccion}")
+
+    clave = {k: definicion.get(k) for k in ('symbol', 'indicador', 'nivel', 'direccion')}
+    clave['symbol'] = clave['symbol'] or TODOS
+    clave['direccion'] = direccion
+    id_ = definicion.get('id') or hashlib.sha1(
+        json.dumps(clave, sort_keys=True).encode()).hexdigest()[:12]
+    return Regla(
+        id=id_,
+        symbol=clave['symbol'],
+        indicador=indicador,
+        nivel=float(definicion.get('nivel', 0.0)),
+        direccion=direccion,
+        mensaje=definicion.get('mensaje', f"{indicador} cruzó {{nivel}} hacia {direccion}"),
+        color=definicion.get('color', 'YELLOW'),
+        cooldown=definicion.get('cooldown'),
+    )
+
+class _Niveles:
+    """Niveles ordenados de una serie, separados por dirección."""
+
+    def __init__(self):
+        self.arriba: List[float] = []
+        self.reglas_arriba: List[Regla] = []
+        self.abajo: List[float] = []
+        self.reglas_abajo: List[Regla] = []
+
+    def agregar(self, regla: Regla) -> None:
+        niveles, reglas = ((self.arriba, self.reglas_arriba) if regla.direccion == ARRIBA
+                           else (self.abajo, self.reglas_abajo))
+        i = bisect_right(niveles, regla.nivel)
+        niveles.insert(i, regla.nivel)
+        reglas.insert(i, regla)
+
+    def cruzadas(self, anterior: float, actual: float) -> List[Regla]:
+        if actual > anterior:
+            return self.reglas_arriba[bisect_right(self.arriba, anterior):
+                                      bisect_right(self.arriba, actual)]
+        if actual < anterior:
+            return self.reglas_abajo[bisect_left(self.abajo, actual):
+                                     bisect_left(self.abajo, anterior)]
+        return []
+
+class MotorAlertas:
+    """Evalúa las reglas tick a tick, manteniendo el último valor de cada serie."""
+
+    def __init__(self, reglas: Iterable[Regla] = (), cooldown: float = ALERT_COOLDOWN):
+        self.cooldown = cooldown
+        self.reglas: Dict[str, Regla] = {}
+        self.disparadas = 0
+        self.suprimidas = 0
+        self._indice: Dict[str, Dict[str, _Niveles]] = {}
+        self._indicadores: Dict[str, Set[str]] = {}
+        self._por_symbol: Dict[str, Set[str]] = {}
+        self._anteriores: Dict[str, Dict[str, float]] = {}
+        self._ultimo_disparo: Dict[Tuple[str, str], float] = {}
+        for regla in reglas:
+            self.agregar(regla)
+
+    @classmethod
+    def desde_config(cls, definiciones: Iterable[Dict[str, Any]] = ALERT_RULES,
+                     cooldown: float = ALERT_COOLDOWN) -> 'MotorAlertas':
+        return cls((compilar_regla(d) for d in definiciones), cooldown)
+
+    def agregar(self, regla: Regla) -> None:
+        """Indexa una regla; una regla repetida (mismo id) se ignora."""
+        if regla.id in self.reglas:
+            return
+        self.reglas[regla.id] = regla
+        por_indicador = self._indice.setdefault(regla.symbol, {})
+        por_indicador.setdefault(regla.indicador, _Niveles()).agregar(regla)
+        self._indicadores.setdefault(regla.symbol, set()).add(regla.indicador)
+        self._por_symbol.clear()
+
+    def indicadores(self, symbol: str) -> Set[str]:
+        """Indicadores que alguna regla vigila para `symbol`."""
+        conjunto = self._por_symbol.get(symbol)
+        if conjunto is None:
+            conjunto = self._por_symbol[symbol] = (self._indicadores.get(symbol, set())
+                                                   | self._indicadores.get(TODOS, set()))
+        return conjunto
+
+    def evaluar(self, symbol: str, valores: Dict[str, float], ts: float) -> List[Alerta]:
+        """Procesa los valores de un tick de `symbol` y retorna las alertas disparadas."""
+        alertas = []
+        propias = self._indice.get(symbol, {})
+        globales = self._indice.get(TODOS, {})
+        anteriores = self._anteriores.setdefault(symbol, {})
+        for indicador, actual in valores.items():
+            if actual is None or actual != actual:  # NaN: la serie aún no tiene valor
+                continue
+            # float nativo: comparar escalares de NumPy en bisect es varias veces más lento
+            actual = float(actual)
+            anterior = anteriores.get(indicador)
+            anteriores[indicador] = actual
+            if anterior is None or anterior == actual:
+                continue
+            for niveles in (propias.get(indicador), globales.get(indicador)):
+                if niveles is None:
+                    continue
+                for regla in niveles.cruzadas(anterior, actual):
+                    if self._en_cooldown(regla, symbol, ts):
+                        self.suprimidas += 1
+                        continue
+                    self._ultimo_disparo[(regla.id, symbol)] = ts
+                    alertas.append(Alerta(regla, symbol, actual, ts))
+        self.disparadas += len(alertas)
+        return alertas
+
+    def estado(self) -> Dict[str, Any]:
+        """
+        Último valor de cada serie y último disparo de cada regla por símbolo,
+        serializable como JSON (para los checkpoints).
+        """
+        return {
+            'anteriores': {symbol: dict(valores)
+                           for symbol, valores in list(self._anteriores.items())},
+            'disparos': [[regla, symbol, ts]
+                         for (regla, symbol), ts in list(self._ultimo_disparo.items())],
+        }
+
+    def restaurar(self, estado: Dict[str, Any]) -> None:
+        """Carga un `estado()`; los cooldowns de reglas que ya no existen se descartan."""
+        for symbol, valores in estado.get('anteriores', {}).items():
+            self._anteriores.setdefault(symbol, {}).update(valores)
+        for regla, symbol, ts in estado.get('disparos', []):
+            if regla in self.reglas:
+                self._ultimo_disparo[(regla, symbol)] = ts
+
+    def _en_cooldown(self, regla: Regla, symbol: str, ts: float) -> bool:
+        ultimo = self._ultimo_disparo.get((regla.id, symbol))
+        cooldown = regla.cooldown if regla.cooldown is not None else self.cooldown
+        return ultimo is not None and ts - ultimo < cooldown
+
+def calcular_valores(indicadores: Set[str], precio: float, recomendacion: Dict[str, Any],
+                     ventana: np.ndarray) -> Dict[str, float]:
+    """
+    Calcula solo los indicadores pedidos a partir del análisis del tick.
+    `ventana` termina en `precio`.
+    """
+    valores: Dict[str, float] = {}
+    if 'indicadores' not in recomendacion:
+        return valores
+    for indicador in indicadores:
+        if indicador == 'precio':
+            valores[indicador] = precio
+        elif indicador == 'rsi':
+            valores[indicador] = recomendacion['indicadores']['rsi']
+        elif indicador == 'macd':
+            valores[indicador] = (recomendacion['indicadores']['macd']
+                                  - recomendacion['indicadores']['signal'])
+        elif indicador == 'confianza':
+            valores[indicador] = recomendacion['confianza']
+        elif indicador == 'dist_soporte':
+            valores[indicador] = recomendacion['niveles']['distancia_soporte']
+        elif indicador == 'dist_resistencia':
+            valores[indicador] = recomendacion['niveles']['distancia_resistencia']
+        else:
+            n = int(indicador[len(PREFIJO_VARIACION):])
+            if len(ventana) > n:
+                valores[indicador] = (precio / ventana[-1 - n] - 1.0) * 100
+    return valores
@@ -0,0 +1,280 @@
+"""
+API HTTP/JSON local con el último análisis del monitor.
+
+El servidor (aiohttp) corre en un hilo con su propio event loop. El pipeline
+llama a `ServidorAPI.publicar()`, que solo reemplaza la instantánea; cada
+recurso se serializa una vez por instantánea, en el primer pedido que lo
+necesite, y se sirve desde memoria con un ETag del contenido. Un cliente que
+repite el pedido con `If-None-Match` recibe 304 sin cuerpo mientras los
+datos no cambien. Solo el historial consulta SQLite.
+
+Endpoints (GET):
+    /api/salud                       estado del servidor y edad de los datos
+    /api/precios                     precio y recomendación de todos los símbolos
+    /api/precios/{symbol}            lo mismo para un símbolo
+    /api/indicadores                 indicadores y niveles de todos los símbolos
+    /api/indicadores/{symbol}        lo mismo para un símbolo
+    /api/historial/{symbol}          ticks de `crypto_precios`, del más reciente
+                                     al más viejo; parámetros `limite`, `antes`
+                                     y `desde` (epoch); `siguiente` trae la URL
+                                     de la página siguiente
+    /metrics                         tiempos por etapa y contadores en formato
+                                     de texto de Prometheus (utils/instrumentation.py)
+"""
+import asyncio
+import hashlib
+import json
+import math
+import re
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from config.settings import API_HOST, API_PORT, API_HISTORY_LIMIT
+from utils.logger import logger
+from utils.instrumentation import instrumentacion
+from database.operations import get_historial_pagina
+
+ANSI = re.compile(r'\x1b\[[0-9;]*m')
+
+def _limpiar(valor: Any) -> Any:
+    """Convierte tipos de NumPy y NaN/inf (no válidos en JSON) recursivamente."""
+    if isinstance(valor, dict):
+        return {k: _limpiar(v) for k, v in valor.items()}
+    if isinstance(valor, (list, tuple)):
+        return [_limpiar(v) for v in valor]
+    if isinstance(valor, np.generic):
+        valor = valor.item()
+    if isinstance(valor, float) and not math.isfinite(valor):
+        return None
+    return valor
+
+def documento_simbolo(resultado: Dict[str, Any]) -> Dict[str, Any]:
+    """Resultado de `analizar_ciclo()` listo para JSON, sin códigos de color."""
+    documento = {k: v for k, v in resultado.items() if k != 'alertas'}
+    documento['alertas'] = [ANSI.sub('', a) for a in resultado.get('alertas', ())]
+    return _limpiar(documento)
+
+def _indicadores(documento: Dict[str, Any]) -> Dict[str, Any]:
+    recomendacion = documento.get('recomendacion', {})
+    return {
+        'symbol': documento['symbol'],
+        'price': documento.get('price'),
+        'indicadores': recomendacion.get('indicadores'),
+        'niveles': recomendacion.get('niveles'),
+    }
+
+def _serializar(datos: Any) -> Tuple[bytes, str]:
+    cuerpo = json.dumps(datos, ensure_ascii=False, separators=(',', ':')).encode()
+    return cuerpo, '"' + hashlib.blake2b(cuerpo, digest_size=8).hexdigest() + '"'
+
+def _coincide(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    etiquetas = [e.strip() for e in if_none_match.split(',')]
+    return '*' in etiquetas or etag in etiquetas or f'W/{etag}' in etiquetas
+
+class ServidorAPI:
+    """Servidor HTTP de la API; `publicar()` se puede llamar desde cualquier hilo."""
+
+    def __init__(self, host: str = API_HOST, puerto: int = 0,
+                 limite_historial: int = API_HISTORY_LIMIT):
+        self.host = host
+        self.puerto = puerto
+        self.limite_historial = limite_historial
+        self.pedidos = 0
+        self.no_modificados = 0
+        self._instantanea: Optional[Tuple[int, str, int, List[Dict[str, Any]], bool]] = None
+        self._version = 0
+        self._lock = threading.Lock()
+        # Solo se usan desde el event loop del servidor
+        self._documentos: Tuple[int, Dict[str, Dict[str, Any]]] = (0, {})
+        self._cache: Dict[str, Tuple[int, bytes, str]] = {}
+        self._hilo: Optional[threading.Thread] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._runner = None
+        self._error: Optional[BaseException] = None
+
+    @classmethod
+    def desde_config(cls) -> Optional['ServidorAPI']:
+        """Servidor en API_HOST:API_PORT, o None si API_PORT no está configurado."""
+        return cls(API_HOST, API_PORT) if API_PORT else None
+
+    def publicar(self, timestamp: str, ts: int, resultados: List[Dict[str, Any]],
+                 provisional: bool = False) -> None:
+        """Reemplaza la instantánea servida; no serializa nada."""
+        with self._lock:
+            self._version += 1
+            self._instantanea = (self._version, timestamp, ts, resultados, provisional)
+
+    def start(self) -> None:
+        """
+        Inicia el servidor y espera a que acepte conexiones. Si el puerto no
+        está disponible se registra el error y el monitor sigue sin API.
+        """
+        if self._hilo is not None:
+            return
+        listo = threading.Event()
+        self._hilo = threading.Thread(target=self._run, args=(listo,), name='api', daemon=True)
+        self._hilo.start()
+        listo.wait()
+        if self._error is not None:
+            self._hilo = None
+            return
+        logger.info(f"API escuchando en http://{self.host}:{self.puerto}/api")
+
+    def _run(self, listo: threading.Event) -> None:
+        from aiohttp import web
+
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        app = web.Application()
+        app.router.add_get('/api/salud', self._salud)
+        app.router.add_get('/api/precios', self._precios)
+        app.router.add_get('/api/precios/{symbol}', self._precio)
+        app.router.add_get('/api/indicadores', self._indicadores)
+        app.router.add_get('/api/indicadores/{symbol}', self._indicador)
+        app.router.add_get('/api/historial/{symbol}', self._historial)
+        app.router.add_get('/metrics', self._metricas)
+        self._runner = web.AppRunner(app, access_log=None)
+        try:
+            self._loop.run_until_complete(self._runner.setup())
+            sitio = web.TCPSite(self._runner, self.host, self.puerto)
+            self._loop.run_until_complete(sitio.start())
+            self.puerto = self._runner.addresses[0][1]
+        except OSError as e:
+            logger.error(f"No se pudo iniciar la API en {self.host}:{self.puerto}: {e}")
+            self._error = e
+            listo.set()
+            self._loop.close()
+            return
+        listo.set()
+        try:
+            self._loop.run_forever()
+        finally:
+            self._loop.run_until_complete(self._runner.cleanup())
+            self._loop.close()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        if self._hilo is None:
+            return
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._hilo.join(timeout)
+        self._hilo = None
+        logger.info(f"API: {self.pedidos:,} pedidos, {self.no_modificados:,} respondidos con 304")
+
+    # Respuestas
+
+    def _json(self, request, cuerpo: bytes, etag: Optional[str] = None, status: int = 200):
+        from aiohttp import web
+
+        self.pedidos += 1
+        headers = {'Cache-Control': 'no-cache'}
+        if etag is not None:
+            headers['ETag'] = etag
+            if _coincide(request.headers.get('If-None-Match'), etag):
+                self.no_modificados += 1
+                return web.Response(status=304, headers=headers)
+        return web.Response(body=cuerpo, status=status, headers=headers,
+                            content_type='application/json', charset='utf-8')
+
+    def _error_json(self, request, status: int, mensaje: str):
+        cuerpo = json.dumps({'error': mensaje}, ensure_ascii=False).encode()
+        return self._json(request, cuerpo, status=status)
+
+    @staticmethod
+    def _symbol(request) -> str:
+        """Symbol pedido con la forma de los ids ('eth-btc' -> 'ETH-BTC')."""
+        exchange, punto, par = request.match_info['symbol'].rpartition('.')
+        return exchange.lower() + punto + par.upper()
+
+    def _documentos_actuales(self) -> Optional[Tuple[int, str, int, bool, Dict[str, Dict[str, Any]]]]:
+        """Instantánea actual con los resultados ya convertidos (una vez por versión)."""
+        instantanea = self._instantanea
+        if instantanea is None:
+            return None
+        version, timestamp, ts, resultados, provisional = instantanea
+        if self._documentos[0] != version:
+            self._documentos = (version, {r['symbol']: documento_simbolo(r) for r in resultados})
+        return version, timestamp, ts, provisional, self._documentos[1]
+
+    def _recurso(self, request, clave: str,
+                 construir: Callable[[str, int, bool, Dict[str, Dict[str, Any]]], Any]):
+        """Responde `clave` desde la caché, serializándola si cambió la instantánea."""
+        actual = self._documentos_actuales()
+        if actual is None:
+            return self._error_json(request, 503, 'Todavía no hay datos')
+        version, timestamp, ts, provisional, documentos = actual
+        cache = self._cache.get(clave)
+        if cache is None or cache[0] != version:
+            datos = construir(timestamp, ts, provisional, documentos)
+            if datos is None:
+                return self._error_json(request, 404, f'Recurso desconocido: {clave}')
+            cache = self._cache[clave] = (version, *_serializar(datos))
+        return self._json(request, cache[1], cache[2])
+
+    async def _salud(self, request):
+        instantanea = self._instantanea
+        datos = {'version': self._version, 'pedidos': self.pedidos}
+        if instantanea is not None:
+            datos.update(timestamp=instantanea[1], antiguedad_s=round(time.time() - instantanea[2], 1),
+                         symbols=len(instantanea[3]))
+        return self._json(request, json.dumps(datos).encode())
+
+    async def _precios(self, request):
+        return self._recurso(request, 'precios', lambda timestamp, ts, provisional, docs: {
+            'timestamp': timestamp, 'ts': ts, 'provisional': provisional,
+            'symbols': docs,
+        })
+
+    async def _precio(self, request):
+        symbol = self._symbol(request)
+        return self._recurso(request, f'precios/{symbol}',
+                             lambda timestamp, ts, provisional, docs: docs.get(symbol) and {
+                                 'timestamp': timestamp, 'ts': ts, 'provisional': provisional,
+                                 **docs[symbol]})
+
+    async def _indicadores(self, request):
+        return self._recurso(request, 'indicadores', lambda timestamp, ts, provisional, docs: {
+            'timestamp': timestamp, 'ts': ts, 'provisional': provisional,
+            'symbols': {symbol: _indicadores(doc) for symbol, doc in docs.items()},
+        })
+
+    async def _indicador(self, request):
+        symbol = self._symbol(request)
+        return self._recurso(request, f'indicadores/{symbol}',
+                             lambda timestamp, ts, provisional, docs: docs.get(symbol) and {
+                                 'timestamp': timestamp, 'ts': ts, 'provisional': provisional,
+                                 **_indicadores(docs[symbol])})
+
+    async def _metricas(self, request):
+        from aiohttp import web
+
+        self.pedidos += 1
+        return web.Response(text=instrumentacion.texto_prometheus(),
+                            content_type='text/plain', charset='utf-8',
+                            headers={'Cache-Control': 'no-cache'})
+
+    async def _historial(self, request):
+        symbol = self._symbol(request)
+        try:
+            limite = min(int(request.query.get('limite', 100)), self.limite_historial)
+            antes = int(request.query['antes']) if 'antes' in request.query else None
+            desde = int(request.query['desde']) if 'desde' in request.query else None
+        except ValueError:
+            return self._error_json(request, 400, 'limite, antes y desde deben ser enteros')
+        if limite < 1:
+            return self._error_json(request, 400, 'limite debe ser mayor que cero')
+
+        # La consulta bloquea: va al pool de hilos (cada uno con su conexión)
+        filas = await asyncio.get_running_loop().run_in_executor(
+            None, get_historial_pagina, symbol, limite, antes, desde)
+        siguiente = None
+        if len(filas) == limite:
+            siguiente = f'/api/historial/{symbol}?limite={limite}&antes={filas[-1][0]}'
+            if desde is not None:
+                siguiente += f'&desde={desde}'
+        cuerpo, etag = _serializar({'symbol': symbol, 'precios': filas, 'siguiente': siguiente})
+        return self._json(request, cuerpo, etag)
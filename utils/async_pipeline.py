@@ -0,0 +1,166 @@
+"""
+Pipeline asíncrono del monitor: obtención, análisis y persistencia/salida.
+
+Cada etapa corre en su propio hilo (un executor de un solo worker, para
+conservar el orden y la afinidad de hilo de SQLite) y se conecta con la
+siguiente mediante colas acotadas. Si una etapa se atrasa, la cola se llena
+y la etapa anterior espera (contrapresión); el programador omite los ticks
+cuya hora ya pasó en lugar de acumularlos.
+"""
+import asyncio
+import signal
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+from utils.logger import logger
+from utils.instrumentation import instrumentacion
+
+_FIN = object()
+
+@dataclass
+class MetricasEtapa:
+    """Latencias acumuladas de una etapa, en milisegundos."""
+    ejecuciones: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+    ultimo_ms: float = 0.0
+    errores: int = 0
+
+    def registrar(self, ms: float) -> None:
+        self.ejecuciones += 1
+        self.total_ms += ms
+        self.ultimo_ms = ms
+        self.max_ms = max(self.max_ms, ms)
+
+    @property
+    def promedio_ms(self) -> float:
+        return self.total_ms / self.ejecuciones if self.ejecuciones else 0.0
+
+@dataclass
+class Etapa:
+    """Función de una etapa: recibe el resultado de la anterior."""
+    nombre: str
+    funcion: Callable[[Any], Any]
+
+class MonitorPipeline:
+    """
+    Ejecuta `fuente()` en horas fijas (`t0 + k * intervalo`) y pasa cada
+    resultado por las `etapas` en orden.
+    """
+
+    def __init__(self, fuente: Callable[[], Any], etapas: List[Etapa],
+                 intervalo: float, tamano_cola: int = 2):
+        self.fuente = fuente
+        self.etapas = etapas
+        self.intervalo = intervalo
+        self.tamano_cola = tamano_cola
+        self.metricas: Dict[str, MetricasEtapa] = {
+            nombre: MetricasEtapa() for nombre in ['fuente'] + [e.nombre for e in etapas]
+        }
+        self.retraso = MetricasEtapa()
+        self.ticks_omitidos = 0
+        self._colas: List[asyncio.Queue] = []
+        self._detener: Optional[asyncio.Event] = None
+
+    def detener(self) -> None:
+        """Solicita una parada ordenada: termina el tick actual y vacía las colas."""
+        if self._detener is not None:
+            self._detener.set()
+
+    def profundidad_colas(self) -> List[int]:
+        return [cola.qsize() for cola in self._colas]
+
+    async def _ejecutar(self, executor: ThreadPoolExecutor, nombre: str,
+                        funcion: Callable, *args) -> Any:
+        loop = asyncio.get_running_loop()
+        inicio = time.perf_counter()
+        try:
+            return await loop.run_in_executor(executor, funcion, *args)
+        except Exception as e:
+            self.metricas[nombre].errores += 1
+            logger.error(f"Error en la etapa {nombre}: {e}")
+            return None
+        finally:
+            duracion = time.perf_counter() - inicio
+            self.metricas[nombre].registrar(duracion * 1000)
+            instrumentacion.registrar(f'pipeline.{nombre}', int(duracion * 1e9))
+
+    async def _programador(self, executor: ThreadPoolExecutor, salida: asyncio.Queue) -> None:
+        loop = asyncio.get_running_loop()
+        t0 = loop.time()
+        k = 0
+        try:
+            while not self._detener.is_set():
+                programado = t0 + k * self.intervalo
+                try:
+                    await asyncio.wait_for(self._detener.wait(),
+                                           timeout=max(0.0, programado - loop.time()))
+                    break
+                except asyncio.TimeoutError:
+                    pass
+
+                self.retraso.registrar((loop.time() - programado) * 1000)
+                resultado = await self._ejecutar(executor, 'fuente', self.fuente)
+                if resultado is not None:
+                    await salida.put(resultado)
+
+                siguiente = int((loop.time() - t0) // self.intervalo) + 1
+                if siguiente > k + 1:
+                    omitidos = siguiente - k - 1
+                    self.ticks_omitidos += omitidos
+                    logger.warning(f"Ciclo atrasado: {omitidos} tick(s) omitido(s)")
+                k = siguiente
+        finally:
+            await salida.put(_FIN)
+
+    async def _etapa(self, executor: ThreadPoolExecutor, etapa: Etapa,
+                     entrada: asyncio.Queue, salida: Optional[asyncio.Queue]) -> None:
+        while True:
+            item = await entrada.get()
+            if item is _FIN:
+                break
+            resultado = await self._ejecutar(executor, etapa.nombre, etapa.funcion, item)
+            if salida is not None and resultado is not None:
+                await salida.put(resultado)
+        if salida is not None:
+            await salida.put(_FIN)
+
+    def _instalar_senales(self) -> None:
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, self.detener)
+            except (NotImplementedError, RuntimeError, ValueError):
+                # Windows o hilo secundario: Ctrl-C llega como KeyboardInterrupt
+                pass
+
+    async def run(self) -> None:
+        """Ejecuta el pipeline hasta que se llame a `detener()`."""
+        self._detener = asyncio.Event()
+        self._instalar_senales()
+        self._colas = [asyncio.Queue(maxsize=self.tamano_cola) for _ in self.etapas]
+        executors = [ThreadPoolExecutor(max_workers=1, thread_name_prefix=nombre)
+                     for nombre in self.metricas]
+        tareas = [asyncio.ensure_future(self._programador(executors[0], self._colas[0]))]
+        for i, etapa in enumerate(self.etapas):
+            salida = self._colas[i + 1] if i + 1 < len(self._colas) else None
+            tareas.append(asyncio.ensure_future(
+                self._etapa(executors[i + 1], etapa, self._colas[i], salida)))
+        try:
+            await asyncio.gather(*tareas)
+        finally:
+            for tarea in tareas:
+                tarea.cancel()
+            for executor in executors:
+                executor.shutdown(wait=True)
+            self.registrar_resumen()
+
+    def registrar_resumen(self) -> None:
+        """Escribe en el log las latencias acumuladas por etapa."""
+        for nombre, m in self.metricas.items():
+            logger.info(f"Etapa {nombre}: {m.ejecuciones} ejecuciones, "
+                        f"prom {m.promedio_ms:.1f} ms, máx {m.max_ms:.1f} ms, "
+                        f"{m.errores} errores")
+        logger.info(f"Retraso de programación: prom {self.retraso.promedio_ms:.1f} ms, "
+                    f"máx {self.retraso.max_ms:.1f} ms, {self.ticks_omitidos} ticks omitidos")
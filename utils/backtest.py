@@ -0,0 +1,231 @@
+"""
+Backtesting vectorizado de la estrategia de `generar_recomendacion()`.
+
+Las señales de todas las barras se calculan de una vez: cada barra se ve
+como una ventana de `HISTORY_LIMIT` precios (una vista deslizante, sin
+copiar la serie) y los bloques de ventanas pasan por `analizar_lote()`.
+La simulación recorre operaciones, no barras: la salida de cada posición
+se busca con `searchsorted` sobre las señales de venta y con una búsqueda
+del stop dentro del tramo abierto.
+
+Uso (desde la raíz del proyecto):
+    python -m utils.backtest BTC [--intervalo 60] [--comision 0.001]
+"""
+import argparse
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from config.settings import HISTORY_LIMIT
+from utils.batch_analysis import analizar_lote
+from utils.indicator_registry import (
+    ACCION_COMPRAR, ACCION_MANTENER, ACCION_VENDER, HIGH, LOW, PRECIO, estrategia_tendencia,
+    evaluar
+)
+
+# Mismo stop que `recomendaciones.Recomendacion` (precio de entrada * 0.95)
+STOP_LOSS = 0.05
+COMISION = 0.001
+TAMANO_BLOQUE = 20_000
+
+SALIDA_SENAL = 0
+SALIDA_STOP = 1
+SALIDA_FIN = 2
+
+OPERACION_DTYPE = np.dtype([
+    ('entrada', 'i8'),
+    ('salida', 'i8'),
+    ('precio_entrada', 'f8'),
+    ('precio_salida', 'f8'),
+    ('retorno', 'f8'),
+    ('motivo', 'i1'),
+])
+
+@dataclass
+class ResultadoBacktest:
+    """Operaciones simuladas y curva de capital (1.0 = capital inicial)."""
+    operaciones: np.ndarray
+    capital: np.ndarray
+
+    @property
+    def pnl_pct(self) -> float:
+        return (self.capital[-1] - 1.0) * 100 if len(self.capital) else 0.0
+
+    @property
+    def max_drawdown_pct(self) -> float:
+        if not len(self.capital):
+            return 0.0
+        return float((1.0 - self.capital / np.maximum.accumulate(self.capital)).max() * 100)
+
+    @property
+    def tasa_acierto(self) -> float:
+        if not len(self.operaciones):
+            return 0.0
+        return float((self.operaciones['retorno'] > 0).mean() * 100)
+
+    def resumen(self) -> Dict[str, float]:
+        return {
+            'operaciones': len(self.operaciones),
+            'pnl_pct': self.pnl_pct,
+            'max_drawdown_pct': self.max_drawdown_pct,
+            'tasa_acierto_pct': self.tasa_acierto,
+            'stops': int((self.operaciones['motivo'] == SALIDA_STOP).sum()),
+        }
+
+def senales_historicas(precios: np.ndarray, ventana: int = HISTORY_LIMIT,
+                       tamano_bloque: int = TAMANO_BLOQUE, **parametros) -> np.ndarray:
+    """
+    Acción sugerida en cada barra, con la ventana de `ventana` precios que
+    termina en ella. Las primeras `ventana - 1` barras quedan en MANTENER.
+    Los `parametros` se pasan a `analizar_lote()`.
+    """
+    precios = np.ascontiguousarray(precios, dtype=np.float64)
+    acciones = np.full(len(precios), ACCION_MANTENER, dtype=np.int8)
+    if len(precios) < ventana:
+        return acciones
+    ventanas = sliding_window_view(precios, ventana)
+    for inicio in range(0, len(ventanas), tamano_bloque):
+        bloque = ventanas[inicio:inicio + tamano_bloque]
+        fin = inicio + ventana - 1
+        acciones[fin:fin + len(bloque)] = analizar_lote(bloque, **parametros)['accion']
+    return acciones
+
+def tendencia_alcista(cierres: np.ndarray, maximos: Optional[np.ndarray] = None,
+                      minimos: Optional[np.ndarray] = None, periodo_ema: int = 20,
+                      periodo_atr: int = 14, umbral_tendencia: float = 0.02,
+                      ventana: int = HISTORY_LIMIT,
+                      tamano_bloque: int = TAMANO_BLOQUE) -> np.ndarray:
+    """
+    Criterio de `identificar_tendencia()` (la estrategia 'tendencia' del
+    registro) evaluado en cada barra, con la ventana de `ventana` barras que
+    termina en ella: True donde hay tendencia alcista. Las primeras
+    `ventana - 1` barras quedan en False.
+    """
+    cierres = np.ascontiguousarray(cierres, dtype=np.float64)
+    maximos = cierres if maximos is None else np.ascontiguousarray(maximos, dtype=np.float64)
+    minimos = cierres if minimos is None else np.ascontiguousarray(minimos, dtype=np.float64)
+    alcista = np.zeros(len(cierres), dtype=bool)
+    if len(cierres) < ventana:
+        return alcista
+    estrategia = estrategia_tendencia(periodo_ema, periodo_atr, umbral_tendencia)
+    ventanas = {PRECIO: sliding_window_view(cierres, ventana),
+                HIGH: sliding_window_view(maximos, ventana),
+                LOW: sliding_window_view(minimos, ventana)}
+    for inicio in range(0, len(ventanas[PRECIO]), tamano_bloque):
+        bloque = {clave: v[inicio:inicio + tamano_bloque] for clave, v in ventanas.items()}
+        resultado = evaluar(bloque, [estrategia])[estrategia.nombre]
+        fin = inicio + ventana - 1
+        alcista[fin:fin + len(bloque[PRECIO])] = (resultado['hay_tendencia']
+                                                  & (resultado['pendiente'] > 0))
+    return alcista
+
+def simular(precios: np.ndarray, acciones: np.ndarray,
+            minimos: Optional[np.ndarray] = None,
+            comision: float = COMISION, stop_loss: float = STOP_LOSS) -> ResultadoBacktest:
+    """
+    Simula posiciones largas: entra al cierre de una barra COMPRAR y sale al
+    cierre de la siguiente VENDER, o antes si el mínimo toca el stop.
+
+    Sin `minimos` el stop se evalúa y ejecuta con el precio de cierre.
+    La comisión se cobra en la entrada y en la salida.
+    """
+    precios = np.asarray(precios, dtype=np.float64)
+    con_minimos = minimos is not None
+    minimos = np.asarray(minimos, dtype=np.float64) if con_minimos else precios
+    n = len(precios)
+    compras = np.flatnonzero(acciones == ACCION_COMPRAR)
+    ventas = np.flatnonzero(acciones == ACCION_VENDER)
+
+    operaciones = []
+    log_retornos = np.zeros(n)
+    costo = np.log1p(-comision)
+    i = 0
+    while i < len(compras):
+        entrada = int(compras[i])
+        k = np.searchsorted(ventas, entrada, side='right')
+        salida = int(ventas[k]) if k < len(ventas) else n - 1
+        motivo = SALIDA_SENAL if k < len(ventas) else SALIDA_FIN
+
+        stop = precios[entrada] * (1.0 - stop_loss)
+        tocados = np.flatnonzero(minimos[entrada + 1:salida + 1] <= stop)
+        if len(tocados):
+            salida = entrada + 1 + int(tocados[0])
+            motivo = SALIDA_STOP
+            # Con mínimos se asume la orden ejecutada en el precio del stop
+            precio_salida = stop if con_minimos else precios[salida]
+        else:
+            precio_salida = precios[salida]
+
+        if salida > entrada:
+            tramo = slice(entrada + 1, salida)
+            log_retornos[tramo] = np.log(precios[tramo] / precios[entrada:salida - 1])
+            log_retornos[salida] = np.log(precio_salida / precios[salida - 1])
+        log_retornos[entrada] += costo
+        log_retornos[salida] += costo
+
+        retorno = precio_salida / precios[entrada] * (1.0 - comision) ** 2 - 1.0
+        operaciones.append((entrada, salida, precios[entrada], precio_salida, retorno, motivo))
+        i = np.searchsorted(compras, salida, side='right')
+
+    return ResultadoBacktest(
+        operaciones=np.array(operaciones, dtype=OPERACION_DTYPE),
+        capital=np.exp(np.cumsum(log_retornos)),
+    )
+
+def backtest(precios: np.ndarray, minimos: Optional[np.ndarray] = None,
+             ventana: int = HISTORY_LIMIT, comision: float = COMISION,
+             stop_loss: float = STOP_LOSS, maximos: Optional[np.ndarray] = None,
+             umbral_tendencia: Optional[float] = None, **parametros) -> ResultadoBacktest:
+    """
+    Calcula las señales de toda la serie y simula las operaciones.
+
+    Con `umbral_tendencia` solo se compra donde `tendencia_alcista()` lo confirma.
+    """
+    acciones = senales_historicas(precios, ventana, **parametros)
+    if umbral_tendencia is not None:
+        filtro = tendencia_alcista(precios, maximos, minimos, umbral_tendencia=umbral_tendencia,
+                                   ventana=ventana)
+        acciones[(acciones == ACCION_COMPRAR) & ~filtro] = ACCION_MANTENER
+    return simular(precios, acciones, minimos, comision, stop_loss)
+
+def backtest_symbol(symbol: str, intervalo: Optional[int] = 60, desde: Optional[int] = None,
+                    hasta: Optional[int] = None, **kwargs) -> ResultadoBacktest:
+    """
+    Backtest sobre las velas guardadas (o los ticks agregados) de `symbol`.
+    Con `intervalo=None` usa los ticks crudos del archivo columnar y SQLite.
+    """
+    if intervalo is None:
+        from database.archive import leer_historial
+
+        _, precios = leer_historial(symbol, desde, hasta)
+        return backtest(precios, **kwargs)
+
+    from database.operations import get_velas
+
+    velas = get_velas(symbol, intervalo, desde, hasta)
+    return backtest(velas['close'].to_numpy(), velas['low'].to_numpy(),
+                    maximos=velas['high'].to_numpy(), **kwargs)
+
+def main():
+    parser = argparse.ArgumentParser(description="Backtest de la estrategia del monitor")
+    parser.add_argument('symbol')
+    parser.add_argument('--intervalo', type=int, default=60, help="segundos por barra")
+    parser.add_argument('--ticks', action='store_true', help="usar los ticks crudos como barras")
+    parser.add_argument('--desde', type=int, help="ts epoch inicial")
+    parser.add_argument('--hasta', type=int, help="ts epoch final (exclusivo)")
+    parser.add_argument('--ventana', type=int, default=HISTORY_LIMIT)
+    parser.add_argument('--comision', type=float, default=COMISION)
+    parser.add_argument('--stop', type=float, default=STOP_LOSS)
+    args = parser.parse_args()
+
+    resultado = backtest_symbol(args.symbol, None if args.ticks else args.intervalo,
+                                args.desde, args.hasta,
+                                ventana=args.ventana, comision=args.comision,
+                                stop_loss=args.stop)
+    for clave, valor in resultado.resumen().items():
+        print(f"{clave:>18}: {valor:,.2f}" if isinstance(valor, float) else f"{clave:>18}: {valor}")
+
+if __name__ == "__main__":
+    main()
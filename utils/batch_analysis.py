@@ -0,0 +1,61 @@
+"""
+Análisis técnico vectorizado para muchos símbolos a la vez.
+
+`analizar_lote()` recibe una matriz símbolos × tiempo (orden cronológico) y
+reproduce, fila por fila, el resultado de `generar_recomendacion()` sobre
+esa ventana, en una sola pasada de NumPy. Indicadores y regla salen del
+registro de `utils/indicator_registry.py`.
+"""
+import numpy as np
+
+from config.settings import (
+    RSI_PERIOD, RSI_WILDER, MACD_FAST, MACD_SLOW, MACD_SIGNAL
+)
+from utils.indicator_registry import (
+    PRECIO, RSI_SOBRECOMPRA, RSI_SOBREVENTA, UMBRAL_ACCION, estrategia_senales, registro,
+    volatilidad
+)
+
+RESULTADO_DTYPE = np.dtype([
+    ('rsi', 'f8'),
+    ('macd', 'f8'),
+    ('signal', 'f8'),
+    ('soporte', 'f8'),
+    ('resistencia', 'f8'),
+    ('volatilidad', 'f8'),
+    ('confianza', 'i1'),
+    ('accion', 'i1'),
+])
+
+def analizar_lote(matriz: np.ndarray,
+                  rsi_periodo: int = RSI_PERIOD,
+                  rsi_wilder: bool = RSI_WILDER,
+                  macd_rapida: int = MACD_FAST,
+                  macd_lenta: int = MACD_SLOW,
+                  macd_senal: int = MACD_SIGNAL,
+                  rsi_sobreventa: float = RSI_SOBREVENTA,
+                  rsi_sobrecompra: float = RSI_SOBRECOMPRA,
+                  umbral_accion: int = UMBRAL_ACCION) -> np.ndarray:
+    """
+    Analiza todas las filas de `matriz` (símbolos × tiempo) de una vez.
+
+    Las filas deben estar completas (sin NaN); una fila con NaN produce NaN en
+    sus indicadores. Retorna un arreglo estructurado `RESULTADO_DTYPE` con un
+    elemento por fila.
+    """
+    matriz = np.asarray(matriz, dtype=np.float64)
+    if matriz.ndim != 2 or matriz.shape[1] < 2:
+        raise ValueError("Se requiere una matriz símbolos × tiempo con al menos 2 columnas")
+
+    estrategia = estrategia_senales(rsi_periodo, rsi_wilder, macd_rapida, macd_lenta,
+                                    macd_senal, rsi_sobreventa, rsi_sobrecompra, umbral_accion)
+    indicadores = dict(estrategia.indicadores, volatilidad=volatilidad())
+    valores = registro.calcular({PRECIO: matriz}, indicadores.values())
+    regla = estrategia.aplicar(valores)
+
+    resultado = np.empty(matriz.shape[0], dtype=RESULTADO_DTYPE)
+    for campo in ('rsi', 'macd', 'signal', 'soporte', 'resistencia', 'volatilidad'):
+        resultado[campo] = valores[indicadores[campo]]
+    resultado['confianza'] = regla['confianza']
+    resultado['accion'] = regla['accion']
+    return resultado
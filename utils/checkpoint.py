@@ -0,0 +1,258 @@
+"""
+Checkpoints del estado en memoria del monitor, para reinicios en caliente.
+
+Sin checkpoint, al arrancar se relee de SQLite la ventana de cada símbolo y
+los indicadores se recalculan desde cero en el primer ciclo.
+`CheckpointPeriodico` guarda cada CHECKPOINT_INTERVAL segundos (y al salir)
+las ventanas de `PriceCache`, el estado de cada `MotorIndicadores` y el de
+`MotorAlertas` (último valor de cada serie y cooldowns) en un `.npz` sin
+comprimir, en columnas: una matriz por tipo de dato con una fila por
+símbolo, que se lee sin pickle. Al arrancar, `restaurar()` lo carga y
+reaplica solo los ticks de SQLite posteriores al último de cada símbolo.
+
+El estado se captura al final de un ciclo confirmado, cuando ningún shard lo
+está modificando, y se escribe en un hilo de fondo: primero a un temporal en
+el mismo directorio y después con `os.replace()`, así que un corte deja el
+checkpoint anterior entero. Un checkpoint de otra configuración (ventana,
+períodos de RSI y MACD) o más viejo que la ventana se ignora y esos
+símbolos se precargan en frío.
+"""
+import contextlib
+import gc
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+import numpy as np
+
+from config.settings import (
+    CHECKPOINT_FILE, CHECKPOINT_INTERVAL, HISTORY_LIMIT, MACD_FAST, MACD_SIGNAL, MACD_SLOW,
+    RSI_PERIOD, RSI_WILDER, UPDATE_INTERVAL
+)
+from database.operations import get_ticks_posteriores
+from utils.alert_rules import MotorAlertas
+from utils.instrumentation import instrumentacion
+from utils.logger import logger
+from utils.price_cache import PriceCache
+from utils.streaming_indicators import MotorIndicadores
+
+VERSION = 2
+
+@contextlib.contextmanager
+def _sin_gc():
+    """
+    Pausa el recolector de ciclos. Crear decenas de miles de objetos seguidos
+    (motores, colas, listas) lo dispara una y otra vez y cada pasada recorre
+    todo lo ya creado; la mayor parte del tiempo de restaurar 10000 símbolos
+    se iba en eso. Estos objetos no forman ciclos.
+    """
+    activo = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if activo:
+            gc.enable()
+
+def _matriz(filas: List[List[float]], dtype) -> np.ndarray:
+    """Filas de igual largo como matriz (también sin filas)."""
+    return np.array(filas, dtype=dtype) if filas else np.empty((0, 0), dtype=dtype)
+
+class CheckpointPeriodico:
+    """Captura y guarda el estado del monitor en un hilo de fondo; lo restaura al arrancar."""
+
+    def __init__(self, cache: PriceCache, motores: Dict[str, MotorIndicadores],
+                 alertas: MotorAlertas, ruta: Path = CHECKPOINT_FILE,
+                 intervalo: float = CHECKPOINT_INTERVAL):
+        self.cache = cache
+        self.motores = motores
+        self.alertas = alertas
+        self.ruta = Path(ruta)
+        self.intervalo = intervalo
+        self.escritos = 0
+        self._ultima_captura = time.monotonic()
+        self._ciclos = 0  # ciclos confirmados desde la última captura
+        self._pendiente: Optional[Dict[str, Any]] = None
+        self._lock = threading.Lock()
+        # Una escritura a la vez: comparten el temporal
+        self._lock_escritura = threading.Lock()
+        self._hay_pendiente = threading.Event()
+        self._detener = threading.Event()
+        self._hilo: Optional[threading.Thread] = None
+
+    @classmethod
+    def desde_config(cls, cache: PriceCache, motores: Dict[str, MotorIndicadores],
+                     alertas: MotorAlertas) -> Optional['CheckpointPeriodico']:
+        """Checkpoints en CHECKPOINT_FILE, o None si CHECKPOINT_INTERVAL es 0."""
+        return cls(cache, motores, alertas) if CHECKPOINT_INTERVAL > 0 else None
+
+    def configuracion(self) -> Dict[str, Any]:
+        """Lo que tiene que coincidir para que un checkpoint sirva."""
+        return {'version': VERSION, 'capacidad': self.cache.capacidad, 'ventana': HISTORY_LIMIT,
+                'rsi': [RSI_PERIOD, RSI_WILDER], 'macd': [MACD_FAST, MACD_SLOW, MACD_SIGNAL]}
+
+    def start(self) -> None:
+        if self._hilo is None:
+            self._detener.clear()
+            self._hilo = threading.Thread(target=self._run, name='checkpoint', daemon=True)
+            self._hilo.start()
+
+    def _run(self) -> None:
+        while not self._detener.is_set():
+            self._hay_pendiente.wait()
+            self._hay_pendiente.clear()
+            self._escribir_pendiente()
+
+    def ciclo(self) -> None:
+        """
+        Al final de cada ciclo confirmado: si pasaron `intervalo` segundos,
+        captura el estado y lo deja para el hilo de escritura.
+        """
+        self._ciclos += 1
+        if time.monotonic() - self._ultima_captura < self.intervalo:
+            return
+        captura = self.capturar()
+        with self._lock:
+            # Si la escritura anterior no terminó, solo se escribe la más nueva
+            self._pendiente = captura
+        self._hay_pendiente.set()
+
+    def capturar(self) -> Dict[str, Any]:
+        """Copia del estado actual, independiente de los objetos del monitor."""
+        with instrumentacion.span('checkpoint.captura'), _sin_gc():
+            symbols, ts, precios, largos = self.cache.exportar(list(self.motores))
+            escalares, largos_secuencias, secuencias = [], [], []
+            for fila, symbol in enumerate(symbols):
+                motor = self.motores.get(symbol)
+                if motor is None:
+                    # Lo quitó un cambio de universo mientras tanto: la fila no se restaura
+                    largos[fila] = 0
+                    motor = MotorIndicadores()
+                fila_escalares, fila_secuencias = [], []
+                motor.estado(fila_escalares, fila_secuencias)
+                escalares.append(fila_escalares)
+                largos_secuencias.append([len(s) for s in fila_secuencias])
+                for secuencia in fila_secuencias:
+                    secuencias.extend(secuencia)
+            alertas = self.alertas.estado()
+        self._ultima_captura = time.monotonic()
+        self._ciclos = 0
+        return {'symbols': symbols, 'ts': ts, 'precios': precios, 'largos': largos,
+                'escalares': escalares, 'largos_secuencias': largos_secuencias,
+                'secuencias': secuencias, 'alertas': alertas}
+
+    def escribir(self, captura: Dict[str, Any]) -> None:
+        """Escribe una captura de forma atómica (temporal y `os.replace()`)."""
+        with self._lock_escritura, instrumentacion.span('checkpoint.escritura'):
+            arreglos = {
+                'meta': np.array(json.dumps({'configuracion': self.configuracion(),
+                                             'creado': time.time()})),
+                'symbols': np.array(captura['symbols'], dtype=str),
+                'ts': captura['ts'],
+                'precios': captura['precios'],
+                'largos': captura['largos'],
+                'escalares': _matriz(captura['escalares'], np.float64),
+                'largos_secuencias': _matriz(captura['largos_secuencias'], np.int64),
+                'secuencias': np.array(captura['secuencias'], dtype=np.float64),
+                'alertas': np.array(json.dumps(captura['alertas'])),
+            }
+            self.ruta.parent.mkdir(parents=True, exist_ok=True)
+            temporal = self.ruta.with_name(self.ruta.name + '.tmp')
+            try:
+                with open(temporal, 'wb') as archivo:
+                    np.savez(archivo, **arreglos)
+                    archivo.flush()
+                    os.fsync(archivo.fileno())
+                os.replace(temporal, self.ruta)
+                self.escritos += 1
+            except OSError as e:
+                logger.error(f"Error al escribir el checkpoint {self.ruta}: {e}")
+
+    def _escribir_pendiente(self) -> None:
+        with self._lock:
+            captura, self._pendiente = self._pendiente, None
+        if captura is not None:
+            self.escribir(captura)
+
+    def stop(self, timeout: float = 30.0) -> None:
+        """
+        Detiene el hilo y guarda el estado final, si hubo ciclos desde la última
+        captura (un arranque que falló no pisa el checkpoint anterior). Si el
+        hilo sigue escribiendo después de `timeout`, la escritura final espera
+        a que termine.
+        """
+        if self._hilo is not None:
+            self._detener.set()
+            self._hay_pendiente.set()
+            self._hilo.join(timeout)
+            self._hilo = None
+        if self._ciclos:
+            with self._lock:
+                self._pendiente = self.capturar()
+        self._escribir_pendiente()
+
+    def restaurar(self, symbols: Iterable[str]) -> Set[str]:
+        """
+        Carga el checkpoint de los `symbols` pedidos y reaplica los ticks
+        guardados en la base después del último de cada uno. Retorna los
+        restaurados; los demás quedan para la precarga en frío.
+        """
+        if not self.ruta.exists():
+            return set()
+        with _sin_gc():
+            return self._restaurar(set(symbols))
+
+    def _restaurar(self, pedidos: Set[str]) -> Set[str]:
+        inicio = time.perf_counter()
+        try:
+            with np.load(self.ruta, allow_pickle=False) as datos:
+                meta = json.loads(str(datos['meta']))
+                if meta.get('configuracion') != self.configuracion():
+                    logger.warning(f"Checkpoint {self.ruta} de otra configuración, "
+                                   f"se ignora")
+                    return set()
+                guardados = datos['symbols'].tolist()
+                ts, precios, largos = datos['ts'], datos['precios'], datos['largos']
+                escalares = datos['escalares'].tolist()
+                largos_secuencias = datos['largos_secuencias']
+                secuencias = datos['secuencias'].tolist()
+                alertas = json.loads(str(datos['alertas']))
+        except Exception as e:
+            logger.error(f"Error al leer el checkpoint {self.ruta}: {e}")
+            return set()
+
+        con_datos = (largos > 0).tolist()
+        filas = [i for i, symbol in enumerate(guardados) if con_datos[i] and symbol in pedidos]
+        if not filas:
+            return set()
+        ultimos_ts = ts[filas, largos[filas] - 1].tolist()
+        ultimos = {guardados[i]: ultimo for i, ultimo in zip(filas, ultimos_ts)}
+        if time.time() - max(ultimos.values()) > self.cache.capacidad * UPDATE_INTERVAL:
+            # Reaplicar más de una ventana de ticks cuesta más que precargar en frío
+            logger.info(f"Checkpoint {self.ruta} más viejo que la ventana, se ignora")
+            return set()
+
+        restaurados = [guardados[i] for i in filas]
+        self.cache.importar(restaurados, ts[filas], precios[filas], largos[filas])
+        por_motor = largos_secuencias.shape[1]
+        limites = [0] + np.cumsum(largos_secuencias.ravel()).tolist()
+        for i in filas:
+            motor = MotorIndicadores()
+            motor.restaurar(iter(escalares[i]),
+                            (secuencias[limites[j]:limites[j + 1]]
+                             for j in range(i * por_motor, (i + 1) * por_motor)))
+            self.motores[guardados[i]] = motor
+        self.alertas.restaurar(alertas)
+
+        reaplicados = 0
+        for symbol, ts_tick, precio in get_ticks_posteriores(restaurados, min(ultimos.values())):
+            if ts_tick > ultimos[symbol]:
+                self.cache.buffer(symbol).append(ts_tick, precio)
+                self.motores[symbol].update(precio)
+                reaplicados += 1
+        logger.info(f"Checkpoint cargado: {len(restaurados)} símbolos y {reaplicados} ticks "
+                    f"reaplicados en {(time.perf_counter() - inicio) * 1000:.0f} ms")
+        return set(restaurados)
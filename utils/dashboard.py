@@ -0,0 +1,305 @@
+"""
+Tablero de terminal desacoplado del ciclo de análisis.
+
+El pipeline solo llama a `Dashboard.publicar()`, que guarda la última
+instantánea y retorna de inmediato. Un hilo aparte compara cada línea de la
+pantalla con la del cuadro anterior: las que no cambiaron ni se formatean y,
+en las demás, solo las celdas (de ancho fijo) con otro valor se reescriben,
+posicionando el cursor con secuencias ANSI en vez de limpiar la pantalla. El
+cuadro completo se redibuja solo al arrancar o si cambia el tamaño de la
+terminal o la cantidad de filas.
+"""
+import shutil
+import sys
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, TextIO, Tuple
+
+from colorama import Fore, Style
+
+from config.settings import DASHBOARD_MODE, DASHBOARD_REFRESH, DASHBOARD_ALERTAS
+from utils.logger import logger
+from utils.async_pipeline import MetricasEtapa
+from utils.instrumentation import instrumentacion
+
+CSI = '\x1b['
+LIMPIAR_PANTALLA = CSI + '2J'
+LIMPIAR_LINEA = CSI + 'K'
+OCULTAR_CURSOR = CSI + '?25l'
+MOSTRAR_CURSOR = CSI + '?25h'
+SIN_AJUSTE = CSI + '?7l'  # sin salto de línea automático en el borde
+CON_AJUSTE = CSI + '?7h'
+RESTABLECER_REGION = CSI + 'r'  # región de desplazamiento = pantalla completa
+
+# (clave, título, ancho, alineación)
+COLUMNAS = (
+    ('symbol', 'Símbolo', 7, '<'),
+    ('name', 'Nombre', 13, '<'),
+    ('precio', 'Precio', 15, '>'),
+    ('var_24h', 'Var 24h', 9, '>'),
+    ('rsi', 'RSI', 6, '>'),
+    ('zona', 'Zona', 11, '<'),
+    ('macd', 'MACD', 14, '>'),
+    ('soporte', 'Soporte', 20, '>'),
+    ('resistencia', 'Resistencia', 20, '>'),
+    ('accion', 'Acción', 9, '<'),
+    ('confianza', 'Conf.', 5, '>'),
+)
+# columna -> (texto con color, hasta fin de línea)
+Fila = Dict[int, Tuple[str, bool]]
+# Contenido de una línea de pantalla antes de formatear: (tipo, dato)
+Linea = Tuple[str, Any]
+
+def _columnas() -> Dict[str, Tuple[int, int, str]]:
+    """Columna de inicio (1-based), ancho y alineación de cada campo."""
+    posiciones = {}
+    col = 1
+    for clave, _, ancho, alineacion in COLUMNAS:
+        posiciones[clave] = (col, ancho, alineacion)
+        col += ancho + 1
+    return posiciones
+
+POSICIONES = _columnas()
+ANCHO_TABLA = sum(ancho + 1 for _, _, ancho, _ in COLUMNAS)
+
+def _celda(texto: str, ancho: int, alineacion: str = '<', color: str = Fore.WHITE) -> str:
+    texto = texto[:ancho]
+    return f"{color}{texto:{alineacion}{ancho}}{Style.RESET_ALL}"
+
+def _fila_simbolo(resultado: Dict[str, Any]) -> Fila:
+    """Celdas de la fila de un símbolo."""
+    valores: Dict[str, Tuple[str, str]] = {
+        'symbol': (resultado['symbol'], Fore.YELLOW),
+        'name': (resultado.get('name', ''), Fore.WHITE),
+    }
+    if 'error' in resultado:
+        valores['name'] = (f"Error: {resultado['error']}", Fore.RED)
+    else:
+        recomendacion = resultado['recomendacion']
+        var_24h = resultado['var_24h']
+        valores['precio'] = (f"${resultado['price']:,.2f}", Fore.GREEN)
+        valores['var_24h'] = (f"{var_24h:+.2f}%", Fore.GREEN if var_24h >= 0 else Fore.RED)
+
+        rsi = recomendacion['indicadores']['rsi']
+        color_rsi = Fore.RED if rsi > 70 else Fore.GREEN if rsi < 30 else Fore.YELLOW
+        valores['rsi'] = (f"{rsi:.1f}", color_rsi)
+        valores['zona'] = ("SOBRECOMPRA" if rsi > 70 else "SOBREVENTA" if rsi < 30
+                           else "NEUTRAL", color_rsi)
+        macd = recomendacion['indicadores']['macd']
+        valores['macd'] = (f"{macd:.6f}", Fore.GREEN if macd > 0 else Fore.RED)
+
+        niveles = recomendacion['niveles']
+        valores['soporte'] = (f"${niveles['soporte']:,.2f} ({niveles['distancia_soporte']:.1f}%)",
+                              Fore.GREEN)
+        valores['resistencia'] = (f"${niveles['resistencia']:,.2f} "
+                                  f"({niveles['distancia_resistencia']:.1f}%)", Fore.RED)
+        # Sin el emoji: ocupa dos columnas y correría las celdas de la derecha
+        accion = recomendacion['accion'].split()[0]
+        color_accion = (Fore.GREEN if accion == 'COMPRAR' else Fore.RED if accion == 'VENDER'
+                        else Fore.YELLOW)
+        valores['accion'] = (accion, color_accion)
+        valores['confianza'] = (f"{abs(recomendacion['confianza'])}/5", color_accion)
+
+    fila: Fila = {}
+    for clave, _, ancho, alineacion in COLUMNAS:
+        col = POSICIONES[clave][0]
+        # Las celdas sin dato se escriben en blanco para tapar el valor anterior
+        texto, color = valores.get(clave, ('', Fore.WHITE))
+        if clave == 'name' and 'error' in resultado:
+            # El error ocupa el resto de la fila y tapa las demás columnas
+            fila[col] = (_celda(texto, ANCHO_TABLA - col, alineacion, color), False)
+            break
+        fila[col] = (_celda(texto, ancho, alineacion, color), False)
+    return fila
+
+def lineas(timestamp: str, resultados: List[Dict[str, Any]], alertas: List[str],
+           intervalo: float, provisional: bool = False,
+           filas_alertas: int = DASHBOARD_ALERTAS) -> List[Linea]:
+    """Contenido de cada línea de la pantalla, de arriba hacia abajo."""
+    contenido: List[Linea] = [
+        ('titulo', None),
+        ('estado', (timestamp, intervalo, provisional)),
+        ('separador', None),
+        ('columnas', None),
+    ]
+    contenido += [('simbolo', resultado) for resultado in resultados]
+    contenido += [('vacia', None), ('titulo_alertas', None)]
+    # Filas fijas para que el panel no cambie la forma del cuadro
+    contenido += [('alerta', alertas[i] if i < len(alertas) else '')
+                  for i in range(filas_alertas)]
+    return contenido
+
+def formatear(linea: Linea) -> Fila:
+    """Celdas de una línea de pantalla."""
+    tipo, dato = linea
+    if tipo == 'simbolo':
+        return _fila_simbolo(dato)
+    if tipo == 'columnas':
+        return {POSICIONES[clave][0]: (_celda(titulo, ancho, alineacion, Fore.CYAN), False)
+                for clave, titulo, ancho, alineacion in COLUMNAS}
+    if tipo == 'titulo':
+        texto = (f"{Fore.GREEN}CRYPTO MONITOR v2.0 {Fore.WHITE}- Monitor de Criptomonedas y "
+                 f"Análisis Técnico - Desarrollado por NightmaresDev")
+    elif tipo == 'estado':
+        timestamp, intervalo, provisional = dato
+        texto = (f"{Fore.WHITE}Actualizado: {Fore.YELLOW}{timestamp}{Fore.WHITE}"
+                 f"{' (provisional)' if provisional else ''} - análisis cada {intervalo:g} s")
+    elif tipo == 'separador':
+        texto = f"{Fore.CYAN}{'=' * ANCHO_TABLA}"
+    elif tipo == 'titulo_alertas':
+        texto = f"{Fore.YELLOW}ALERTAS RECIENTES"
+    elif tipo == 'alerta':
+        texto = dato
+    else:
+        texto = ''
+    return {1: (f"{texto}{Style.RESET_ALL}", True)}
+
+def diferencias(anteriores: List[Tuple[Linea, Fila]], nuevas: List[Linea], ancho: int,
+                alto: int) -> Tuple[str, int, List[Tuple[Linea, Fila]]]:
+    """
+    Secuencias ANSI que llevan la pantalla de `anteriores` a `nuevas`.
+
+    Una línea con el mismo contenido que antes (el mismo dict de resultado,
+    o un dato igual) se saltea sin formatearla, así que el costo depende de
+    las líneas que cambiaron y no del tamaño del tablero. Retorna la salida,
+    las celdas reescritas y las líneas dibujadas para el siguiente cuadro.
+    """
+    partes = []
+    dibujadas: List[Tuple[Linea, Fila]] = []
+    for i, linea in enumerate(nuevas[:alto]):
+        previa = anteriores[i] if i < len(anteriores) else None
+        if previa is not None and previa[0][0] == linea[0] and (
+                previa[0][1] is linea[1] or previa[0][1] == linea[1]):
+            dibujadas.append(previa)
+            continue
+        fila = formatear(linea)
+        celdas_previas = previa[1] if previa is not None else {}
+        for col, celda in fila.items():
+            if col <= ancho and celdas_previas.get(col) != celda:
+                texto, eol = celda
+                partes.append(f"{CSI}{i + 1};{col}H{texto}{LIMPIAR_LINEA if eol else ''}")
+        dibujadas.append((linea, fila))
+    return ''.join(partes), len(partes), dibujadas
+
+class Dashboard:
+    """
+    Renderiza en su propio hilo la última instantánea publicada, a lo sumo
+    una vez cada `refresco` segundos.
+    """
+
+    def __init__(self, salida: TextIO = None, refresco: float = DASHBOARD_REFRESH,
+                 max_alertas: int = DASHBOARD_ALERTAS,
+                 tamano_terminal: Callable[[], Tuple[int, int]] = None):
+        self.salida = salida or sys.stdout
+        self.refresco = refresco
+        self.tamano_terminal = tamano_terminal or (lambda: tuple(shutil.get_terminal_size()))
+        self.cuadros = 0
+        self.celdas_escritas = 0
+        self.bytes_escritos = 0
+        self.render = MetricasEtapa()
+        self._alertas: Deque[str] = deque(maxlen=max_alertas)
+        self._instantanea: Optional[Tuple[str, List[Dict[str, Any]], float, bool]] = None
+        self._lock = threading.Lock()
+        self._nueva = threading.Event()
+        self._detener = threading.Event()
+        self._hilo: Optional[threading.Thread] = None
+        self._anteriores: List[Tuple[Linea, Fila]] = []
+        self._forma: Optional[Tuple[int, int, int]] = None
+
+    @classmethod
+    def desde_config(cls) -> Optional['Dashboard']:
+        """Tablero según DASHBOARD_MODE, o None en modo headless."""
+        modo = DASHBOARD_MODE
+        if modo == 'auto':
+            modo = 'ansi' if sys.stdout.isatty() else 'headless'
+        if modo == 'headless':
+            return None
+        return cls()
+
+    def publicar(self, timestamp: str, resultados: List[Dict[str, Any]],
+                 intervalo: float, provisional: bool = False) -> None:
+        """Reemplaza la instantánea a mostrar; no espera al renderizado."""
+        with self._lock:
+            for resultado in resultados:
+                for alerta in resultado.get('alertas', ()):
+                    self._alertas.appendleft(
+                        f"{Fore.WHITE}{timestamp[11:]} {resultado['symbol']:<6} {alerta}")
+            self._instantanea = (timestamp, resultados, intervalo, provisional)
+        self._nueva.set()
+
+    def dibujar(self) -> int:
+        """Escribe las celdas que cambiaron desde el último cuadro; retorna cuántas."""
+        with self._lock:
+            if self._instantanea is None:
+                return 0
+            timestamp, resultados, intervalo, provisional = self._instantanea
+            alertas = list(self._alertas)
+        inicio = time.perf_counter()
+        nuevas = lineas(timestamp, resultados, alertas, intervalo, provisional,
+                        self._alertas.maxlen)
+        ancho, alto = self.tamano_terminal()
+        ultima = len(nuevas)
+        forma = (ancho, alto, ultima)
+        if forma != self._forma:
+            # Primer cuadro, terminal redimensionada o cambio de filas
+            self._anteriores = []
+            self._forma = forma
+            prefijo = SIN_AJUSTE + OCULTAR_CURSOR + RESTABLECER_REGION + LIMPIAR_PANTALLA
+            if ultima + 2 < alto:
+                # Lo que se imprima fuera del tablero (logs) se desplaza solo
+                # en las filas de abajo, sin mover el cuadro
+                prefijo += f"{CSI}{ultima + 2};{alto}r"
+        else:
+            prefijo = ''
+        salida, cambiadas, self._anteriores = diferencias(self._anteriores, nuevas, ancho, alto)
+        if salida or prefijo:
+            # Dejar el cursor al pie de la región de desplazamiento
+            cursor = alto if ultima + 2 < alto else min(alto, ultima + 1)
+            salida = prefijo + salida + f"{CSI}{cursor};1H"
+            self.salida.write(salida)
+            self.salida.flush()
+        self.cuadros += 1
+        self.celdas_escritas += cambiadas
+        self.bytes_escritos += len(salida)
+        duracion = time.perf_counter() - inicio
+        self.render.registrar(duracion * 1000)
+        instrumentacion.registrar('dashboard', int(duracion * 1e9))
+        return cambiadas
+
+    def start(self) -> None:
+        """Inicia el hilo de renderizado."""
+        if self._hilo is None:
+            self._detener.clear()
+            self._hilo = threading.Thread(target=self._run, name='dashboard', daemon=True)
+            self._hilo.start()
+
+    def _run(self) -> None:
+        while not self._detener.is_set():
+            if not self._nueva.wait(1.0):
+                # Sin datos nuevos: solo revisar si cambió el tamaño de la terminal
+                if self._forma is not None and self.tamano_terminal() == self._forma[:2]:
+                    continue
+            if self._detener.is_set():
+                break
+            self._nueva.clear()
+            try:
+                self.dibujar()
+            except Exception as e:
+                logger.error(f"Error al dibujar el tablero: {e}")
+            self._detener.wait(self.refresco)
+
+    def stop(self, timeout: float = 2.0) -> None:
+        """Detiene el hilo y devuelve la terminal a su estado normal."""
+        if self._hilo is None:
+            return
+        self._detener.set()
+        self._nueva.set()
+        self._hilo.join(timeout)
+        self._hilo = None
+        if self._forma is not None:
+            alto = self._forma[1]
+            self.salida.write(f"{RESTABLECER_REGION}{CON_AJUSTE}{MOSTRAR_CURSOR}{CSI}{alto};1H\n")
+            self.salida.flush()
+        logger.info(f"Tablero: {self.cuadros} cuadros, {self.celdas_escritas:,} celdas "
+                    f"escritas, render prom {self.render.promedio_ms:.2f} ms")
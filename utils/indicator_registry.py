@@ -0,0 +1,351 @@
+"""
+Registro único de indicadores y estrategias.
+
+Cada indicador se describe una vez (nombre, dependencias y un kernel NumPy)
+y se evalúa sobre matrices símbolos × tiempo en orden cronológico.
+`RegistroIndicadores.calcular()` resuelve las dependencias de todo lo pedido
+y evalúa cada indicador una sola vez por llamada: si MACD y otra estrategia
+usan EMA(12), se calcula una vez por tick para todos los símbolos.
+
+Los kernels reducen la ventana al valor del último tick. Las EMA son
+combinaciones lineales de la ventana, así que se calculan como un producto
+matriz-vector con pesos generados una vez por tamaño de ventana.
+
+Los nombres se generan con las funciones de este módulo (`ema(12)` registra
+y retorna 'ema_12'); las entradas son 'precio' (cierres) y, para los
+indicadores de velas, 'high' y 'low'. Las estrategias (`Estrategia`)
+declaran sus indicadores y aplican su regla a todas las filas a la vez.
+
+El motor incremental (`utils/streaming_indicators.py`) reproduce los mismos
+indicadores tick a tick para el monitor.
+"""
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, List, Tuple
+
+import numpy as np
+
+from config.settings import (
+    RSI_PERIOD, RSI_WILDER, MACD_FAST, MACD_SLOW, MACD_SIGNAL
+)
+
+PRECIO = 'precio'
+HIGH = 'high'
+LOW = 'low'
+ENTRADAS = (PRECIO, HIGH, LOW)
+
+ACCION_COMPRAR = 1
+ACCION_MANTENER = 0
+ACCION_VENDER = -1
+
+ACCIONES = {
+    ACCION_COMPRAR: "COMPRAR 🟢",
+    ACCION_MANTENER: "MANTENER ⏺",
+    ACCION_VENDER: "VENDER 🔴",
+}
+
+RSI_SOBREVENTA = 30
+RSI_SOBRECOMPRA = 70
+UMBRAL_ACCION = 3
+# Soporte y resistencia: extremos de la ventana desplazados un 5% hacia adentro
+FACTOR_SOPORTE = 1.05
+FACTOR_RESISTENCIA = 0.95
+
+class RegistroIndicadores:
+    """Indicadores por nombre, con sus dependencias y kernels."""
+
+    def __init__(self):
+        self._indicadores: Dict[str, Tuple[Tuple[str, ...], Callable[..., np.ndarray]]] = {}
+        self._ordenes: Dict[Tuple[str, ...], Tuple[str, ...]] = {}
+
+    def __contains__(self, nombre: str) -> bool:
+        return nombre in self._indicadores
+
+    def registrar(self, nombre: str, dependencias: Iterable[str],
+                  kernel: Callable[..., np.ndarray]) -> str:
+        """
+        Registra `kernel(*dependencias) -> valor por fila` como `nombre`.
+        Un nombre ya registrado conserva su definición.
+        """
+        self._indicadores.setdefault(nombre, (tuple(dependencias), kernel))
+        return nombre
+
+    def orden(self, nombres: Tuple[str, ...]) -> Tuple[str, ...]:
+        """Indicadores a evaluar para `nombres`, cada uno después de sus dependencias."""
+        orden = self._ordenes.get(nombres)
+        if orden is not None:
+            return orden
+        resultado: List[str] = []
+        vistos = set(ENTRADAS)
+
+        def visitar(nombre: str) -> None:
+            if nombre in vistos:
+                return
+            if nombre not in self._indicadores:
+                raise KeyError(f"Indicador no registrado: {nombre}")
+            vistos.add(nombre)
+            for dependencia in self._indicadores[nombre][0]:
+                visitar(dependencia)
+            resultado.append(nombre)
+
+        for nombre in nombres:
+            visitar(nombre)
+        orden = self._ordenes[nombres] = tuple(resultado)
+        return orden
+
+    def calcular(self, entradas: Dict[str, np.ndarray],
+                 nombres: Iterable[str]) -> Dict[str, np.ndarray]:
+        """
+        Evalúa `nombres` y sus dependencias sobre `entradas` (matrices
+        símbolos × tiempo). Retorna todos los valores calculados.
+        """
+        valores = dict(entradas)
+        for nombre in self.orden(tuple(nombres)):
+            dependencias, kernel = self._indicadores[nombre]
+            valores[nombre] = kernel(*(valores[d] for d in dependencias))
+        return valores
+
+registro = RegistroIndicadores()
+
+# --- Pesos, una vez por tamaño de ventana ---
+
+def _decay(span: float) -> float:
+    return 1.0 - 2.0 / (span + 1.0)
+
+@lru_cache(maxsize=256)
+def _pesos_ajustados(n: int, span: float) -> np.ndarray:
+    """Pesos del último valor de `ewm(span).mean()` sobre `n` valores."""
+    pesos = _decay(span) ** np.arange(n - 1, -1, -1, dtype=np.float64)
+    pesos /= pesos.sum()
+    pesos.flags.writeable = False
+    return pesos
+
+@lru_cache(maxsize=256)
+def _pesos_recursivos(n: int, alpha: float) -> np.ndarray:
+    """Pesos del último valor de `ewm(alpha=alpha, adjust=False)` sobre `n` valores."""
+    pesos = alpha * (1.0 - alpha) ** np.arange(n - 1, -1, -1)
+    pesos[0] = (1.0 - alpha) ** (n - 1)
+    pesos.flags.writeable = False
+    return pesos
+
+@lru_cache(maxsize=256)
+def _pesos_ema(n: int, span: float, ajustada: bool, retraso: int) -> np.ndarray:
+    """Pesos de la EMA `retraso` ticks antes del último, sobre ventanas de `n`."""
+    pesos = np.zeros(n)
+    m = n - retraso
+    if ajustada:
+        pesos[:m] = _pesos_ajustados(m, span)
+    else:
+        pesos[:m] = _pesos_recursivos(m, 2.0 / (span + 1.0))
+    pesos.flags.writeable = False
+    return pesos
+
+def pesos_ema(n: int, span: float, ajustada: bool = True, retraso: int = 0) -> np.ndarray:
+    """Pesos de `ema(span, ajustada, retraso)` sobre ventanas de `n`, para una sola ventana."""
+    return _pesos_ema(n, span, ajustada, retraso)
+
+def _pesos_sobre_ema(pesos_serie: np.ndarray, span: float) -> np.ndarray:
+    """
+    Pesos sobre los precios de `pesos_serie · ewm(span).mean()`: el precio j
+    entra en la EMA del tick t con decay^(t-j) / Σ_{k≤t} decay^k, así que su
+    peso es v[j] = c[j] + decay · v[j+1], con c[t] = pesos_serie[t] / Σ_{k≤t}
+    decay^k. Una pasada hacia atrás, O(n).
+    """
+    decay = _decay(span)
+    n = len(pesos_serie)
+    normas = np.cumsum(decay ** np.arange(n, dtype=np.float64))
+    acumulado = 0.0
+    pesos = []
+    for c in reversed((pesos_serie / normas).tolist()):
+        acumulado = c + decay * acumulado
+        pesos.append(acumulado)
+    return np.array(pesos[::-1])
+
+@lru_cache(maxsize=256)
+def pesos_senal(n: int, rapida: int = MACD_FAST, lenta: int = MACD_SLOW,
+                senal: int = MACD_SIGNAL) -> np.ndarray:
+    """Pesos del último valor de la señal de MACD (EMA de la serie MACD)."""
+    pesos_macd = _pesos_ajustados(n, senal)
+    pesos = _pesos_sobre_ema(pesos_macd, rapida) - _pesos_sobre_ema(pesos_macd, lenta)
+    pesos.flags.writeable = False
+    return pesos
+
+def _nan(matriz: np.ndarray) -> np.ndarray:
+    return np.full(matriz.shape[0], np.nan)
+
+# --- Indicadores ---
+
+def ultimo() -> str:
+    return registro.registrar('ultimo', (PRECIO,), lambda p: p[:, -1])
+
+def maximo() -> str:
+    return registro.registrar('maximo', (PRECIO,), lambda p: p.max(axis=1))
+
+def minimo() -> str:
+    return registro.registrar('minimo', (PRECIO,), lambda p: p.min(axis=1))
+
+def media() -> str:
+    return registro.registrar('media', (PRECIO,), lambda p: p.mean(axis=1))
+
+def desvio() -> str:
+    """Desviación estándar de la ventana (ddof=1, como pandas)."""
+    return registro.registrar('desvio', (PRECIO,),
+                              lambda p: p.std(axis=1, ddof=1) if p.shape[1] > 1 else _nan(p))
+
+def volatilidad() -> str:
+    """Desviación estándar relativa a la media, en porcentaje."""
+    return registro.registrar('volatilidad', (desvio(), media()), lambda d, m: d / m * 100)
+
+def soporte() -> str:
+    return registro.registrar('soporte', (minimo(),), lambda m: m * FACTOR_SOPORTE)
+
+def resistencia() -> str:
+    return registro.registrar('resistencia', (maximo(),), lambda m: m * FACTOR_RESISTENCIA)
+
+def distancia_soporte() -> str:
+    return registro.registrar('distancia_soporte', (ultimo(), soporte()),
+                              lambda u, s: (u - s) / u * 100)
+
+def distancia_resistencia() -> str:
+    return registro.registrar('distancia_resistencia', (ultimo(), resistencia()),
+                              lambda u, r: (r - u) / u * 100)
+
+def ema(span: int, ajustada: bool = True, retraso: int = 0) -> str:
+    """
+    EMA de `span` (`ewm(span, adjust=ajustada)`) en el último tick, o
+    `retraso` ticks antes.
+    """
+    nombre = f"ema_{span}{'' if ajustada else '_recursiva'}{f'@{retraso}' if retraso else ''}"
+
+    def kernel(p: np.ndarray) -> np.ndarray:
+        if p.shape[1] <= retraso:
+            return _nan(p)
+        return p @ _pesos_ema(p.shape[1], span, ajustada, retraso)
+    return registro.registrar(nombre, (PRECIO,), kernel)
+
+def macd(rapida: int = MACD_FAST, lenta: int = MACD_SLOW) -> str:
+    return registro.registrar(f'macd_{rapida}_{lenta}', (ema(rapida), ema(lenta)),
+                              lambda r, l: r - l)
+
+def senal_macd(rapida: int = MACD_FAST, lenta: int = MACD_SLOW,
+               senal: int = MACD_SIGNAL) -> str:
+    return registro.registrar(f'senal_macd_{rapida}_{lenta}_{senal}', (PRECIO,),
+                              lambda p: p @ pesos_senal(p.shape[1], rapida, lenta, senal))
+
+def rsi_lote(matriz: np.ndarray, periodo: int = RSI_PERIOD,
+             wilder: bool = RSI_WILDER) -> np.ndarray:
+    """RSI del último tick de cada fila."""
+    if wilder:
+        if matriz.shape[1] < 2:
+            return _nan(matriz)
+        delta = np.diff(matriz, axis=1)
+        pesos = _pesos_recursivos(delta.shape[1], 1.0 / periodo)
+    else:
+        if matriz.shape[1] < periodo:
+            return _nan(matriz)
+        delta = np.diff(matriz[:, -(periodo + 1):], axis=1)
+        if delta.shape[1] < periodo:
+            # Con `periodo` precios, pandas cuenta el primer delta (NaN) como 0
+            delta = np.pad(delta, ((0, 0), (1, 0)))
+        pesos = np.full(periodo, 1.0 / periodo)
+    gain = np.clip(delta, 0, None) @ pesos
+    loss = np.clip(-delta, 0, None) @ pesos
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return 100.0 - 100.0 / (1.0 + gain / loss)
+
+def rsi(periodo: int = RSI_PERIOD, wilder: bool = RSI_WILDER) -> str:
+    return registro.registrar(f"rsi{'_wilder' if wilder else ''}_{periodo}", (PRECIO,),
+                              lambda p: rsi_lote(p, periodo, wilder))
+
+def atr(periodo: int = 14) -> str:
+    """Rango verdadero promedio (media simple de `periodo` valores)."""
+    def kernel(cierre: np.ndarray, high: np.ndarray, low: np.ndarray) -> np.ndarray:
+        if cierre.shape[1] <= periodo:
+            return _nan(cierre)
+        h, l = high[:, -periodo:], low[:, -periodo:]
+        anterior = cierre[:, -periodo - 1:-1]
+        tr = np.maximum(h - l, np.maximum(np.abs(h - anterior), np.abs(l - anterior)))
+        return tr.mean(axis=1)
+    return registro.registrar(f'atr_{periodo}', (PRECIO, HIGH, LOW), kernel)
+
+# --- Estrategias ---
+
+class Estrategia:
+    """
+    Regla vectorizada sobre indicadores del registro.
+
+    `indicadores` asocia cada argumento de `regla` con el nombre del
+    indicador registrado; `regla` retorna un arreglo por fila para cada
+    resultado.
+    """
+
+    def __init__(self, nombre: str, indicadores: Dict[str, str],
+                 regla: Callable[..., Dict[str, np.ndarray]]):
+        self.nombre = nombre
+        self.indicadores = indicadores
+        self.regla = regla
+
+    def aplicar(self, valores: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        return self.regla(**{rol: valores[nombre] for rol, nombre in self.indicadores.items()})
+
+def evaluar(entradas: Dict[str, np.ndarray],
+            estrategias: Iterable[Estrategia]) -> Dict[str, Dict[str, np.ndarray]]:
+    """
+    Aplica varias estrategias a las mismas entradas; los indicadores que
+    comparten se calculan una sola vez. Retorna los resultados por estrategia.
+    """
+    estrategias = list(estrategias)
+    nombres = dict.fromkeys(n for e in estrategias for n in e.indicadores.values())
+    valores = registro.calcular(entradas, nombres)
+    return {e.nombre: e.aplicar(valores) for e in estrategias}
+
+@lru_cache(maxsize=256)
+def estrategia_senales(rsi_periodo: int = RSI_PERIOD, rsi_wilder: bool = RSI_WILDER,
+                       macd_rapida: int = MACD_FAST, macd_lenta: int = MACD_SLOW,
+                       macd_senal: int = MACD_SIGNAL, rsi_sobreventa: float = RSI_SOBREVENTA,
+                       rsi_sobrecompra: float = RSI_SOBRECOMPRA,
+                       umbral_accion: int = UMBRAL_ACCION) -> Estrategia:
+    """
+    Puntuación de `generar_recomendacion()`: RSI en sobreventa/sobrecompra
+    (±2), MACD sobre/bajo su señal (±1) y precio fuera de soporte/resistencia
+    (±2); COMPRAR/VENDER desde ±`umbral_accion`.
+    """
+    def regla(rsi, macd, signal, actual, soporte, resistencia):
+        confianza = np.where(rsi < rsi_sobreventa, 2, np.where(rsi > rsi_sobrecompra, -2, 0))
+        confianza += np.where(macd > signal, 1, -1)
+        confianza += np.where(actual < soporte, 2, np.where(actual > resistencia, -2, 0))
+        accion = np.where(confianza >= umbral_accion, ACCION_COMPRAR,
+                          np.where(confianza <= -umbral_accion, ACCION_VENDER, ACCION_MANTENER))
+        return {'confianza': confianza, 'accion': accion}
+
+    return Estrategia('senales', {
+        'rsi': rsi(rsi_periodo, rsi_wilder),
+        'macd': macd(macd_rapida, macd_lenta),
+        'signal': senal_macd(macd_rapida, macd_lenta, macd_senal),
+        'actual': ultimo(),
+        'soporte': soporte(),
+        'resistencia': resistencia(),
+    }, regla)
+
+@lru_cache(maxsize=64)
+def estrategia_tendencia(periodo_ema: int = 20, periodo_atr: int = 14,
+                         umbral: float = 0.02) -> Estrategia:
+    """
+    Tendencia clara: pendiente de la EMA (recursiva) entre el quinto tick
+    desde el final y el último (dividida por 5), relativa al precio, mayor
+    que `umbral`, con ATR relativo menor que el doble.
+    """
+    def regla(ema_actual, ema_anterior, actual, atr):
+        pendiente = (ema_actual - ema_anterior) / 5 / actual
+        volatilidad = atr / actual
+        return {
+            'hay_tendencia': (np.abs(pendiente) > umbral) & (volatilidad < umbral * 2),
+            'pendiente': pendiente,
+            'volatilidad': volatilidad,
+        }
+
+    return Estrategia('tendencia', {
+        'ema_actual': ema(periodo_ema, ajustada=False),
+        'ema_anterior': ema(periodo_ema, ajustada=False, retraso=4),
+        'actual': ultimo(),
+        'atr': atr(periodo_atr),
+    }, regla)
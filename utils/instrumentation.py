@@ -0,0 +1,423 @@
+"""
+Instrumentación del camino caliente: spans, histogramas y perfilador por muestreo.
+
+    with instrumentacion.span('recomendacion', symbol):
+        ...
+
+Cada span suma su duración al histograma de la etapa y, si se indica
+`symbol`, al de la etapa para ese símbolo. Los histogramas usan cubetas
+logarítmicas (16 por potencia de dos, ~4% de error en los percentiles), así
+que registrar es O(1) y la memoria no crece con la cantidad de muestras.
+
+Un span cuesta unos microsegundos, del orden del análisis de un símbolo, así
+que los bucles por símbolo no abren spans: miden solo uno de cada
+INSTRUMENTATION_SAMPLE ciclos (`muestrear()`) con `perf_counter_ns()` y
+registran el lote al final con `registrar_simbolos()`, ponderado por la tasa
+de muestreo. Desactivada (INSTRUMENTATION sin definir), `span()` retorna un
+contexto nulo compartido y `muestrear()` siempre False.
+
+`texto_prometheus()` alimenta el endpoint /metrics de la API,
+`exportar_json()` escribe INSTRUMENTATION_FILE y `ciclo()` deja en el log un
+reporte por etapa cada INSTRUMENTATION_REPORT ciclos. `PerfiladorMuestreo`
+(PROFILER_FILE) guarda pilas en formato "folded" para flamegraph.pl o
+speedscope.
+"""
+import collections
+import json
+import math
+import os
+import sys
+import threading
+import time
+from contextlib import nullcontext
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from config.settings import (
+    INSTRUMENTATION, INSTRUMENTATION_FILE, INSTRUMENTATION_REPORT, INSTRUMENTATION_SAMPLE,
+    PROFILER_FILE, PROFILER_INTERVAL
+)
+from utils.logger import logger
+
+CUBETAS_POR_OCTAVA = 16
+CUANTILES = (0.5, 0.95, 0.99)
+
+_NULO = nullcontext()
+
+class Histograma:
+    """Histograma de duraciones en nanosegundos con cubetas logarítmicas."""
+    __slots__ = ('cubetas', 'n', 'total_ns', 'max_ns')
+
+    def __init__(self):
+        self.cubetas: Dict[int, int] = {}
+        self.n = 0
+        self.total_ns = 0
+        self.max_ns = 0
+
+    def registrar(self, ns: int, peso: int = 1) -> None:
+        """Suma una duración; `peso` > 1 cuenta una muestra por varias."""
+        i = int(math.log2(ns) * CUBETAS_POR_OCTAVA) if ns > 0 else 0
+        self.cubetas[i] = self.cubetas.get(i, 0) + peso
+        self.n += peso
+        self.total_ns += ns * peso
+        if ns > self.max_ns:
+            self.max_ns = ns
+
+    def fusionar(self, otro: 'Histograma') -> None:
+        for i, n in otro.cubetas.items():
+            self.cubetas[i] = self.cubetas.get(i, 0) + n
+        self.n += otro.n
+        self.total_ns += otro.total_ns
+        self.max_ns = max(self.max_ns, otro.max_ns)
+
+    def percentil(self, q: float) -> float:
+        """Duración (ns) del percentil `q` (0-1), en el centro de su cubeta."""
+        if not self.n:
+            return 0.0
+        objetivo = q * self.n
+        acumulado = 0
+        for i in sorted(self.cubetas):
+            acumulado += self.cubetas[i]
+            if acumulado >= objetivo:
+                return min(2 ** ((i + 0.5) / CUBETAS_POR_OCTAVA), self.max_ns)
+        return float(self.max_ns)
+
+    def resumen(self) -> Dict[str, float]:
+        """Conteo, total y percentiles en milisegundos."""
+        datos = {'n': self.n, 'total_ms': self.total_ns / 1e6, 'max_ms': self.max_ns / 1e6}
+        for q in CUANTILES:
+            datos[f'p{round(q * 100)}_ms'] = self.percentil(q) / 1e6
+        return datos
+
+class MatrizSimbolos:
+    """
+    Histogramas de una etapa para muchos símbolos: una fila de cubetas por
+    símbolo, con las mismas cubetas que `Histograma` entre 2**6 y 2**36 ns,
+    más el agregado de la etapa. Registrar un lote (un valor por símbolo) es
+    una operación vectorizada.
+    """
+    MINIMA = 6 * CUBETAS_POR_OCTAVA
+    COLUMNAS = 30 * CUBETAS_POR_OCTAVA
+
+    def __init__(self):
+        self.cubetas = np.zeros((0, self.COLUMNAS), dtype=np.int32)
+        self.total_ns = np.zeros(0, dtype=np.int64)
+        self.max_ns = np.zeros(0, dtype=np.int64)
+        self.etapa = Histograma()
+        self._etapa_cubetas = np.zeros(self.COLUMNAS, dtype=np.int64)
+
+    def _crecer(self, filas: int) -> None:
+        # Al doble, para amortizar las copias
+        extra = max(filas, 2 * len(self.total_ns), 16) - len(self.total_ns)
+        self.cubetas = np.vstack([self.cubetas, np.zeros((extra, self.COLUMNAS), np.int32)])
+        self.total_ns = np.concatenate([self.total_ns, np.zeros(extra, np.int64)])
+        self.max_ns = np.concatenate([self.max_ns, np.zeros(extra, np.int64)])
+
+    def registrar(self, filas: np.ndarray, ns: np.ndarray, peso: int = 1) -> None:
+        """Suma `ns[i]` a la fila `filas[i]` (sin filas repetidas)."""
+        if len(filas) and filas.max() >= len(self.total_ns):
+            self._crecer(int(filas.max()) + 1)
+        cubetas = (np.log2(np.maximum(ns, 1)) * CUBETAS_POR_OCTAVA).astype(np.intp)
+        columnas = np.clip(cubetas - self.MINIMA, 0, self.COLUMNAS - 1)
+        self.cubetas[filas, columnas] += peso
+        self.total_ns[filas] += ns * peso
+        self.max_ns[filas] = np.maximum(self.max_ns[filas], ns)
+        self._etapa_cubetas += np.bincount(columnas, minlength=self.COLUMNAS) * peso
+        self.etapa.n += len(ns) * peso
+        self.etapa.total_ns += int(ns.sum()) * peso
+        self.etapa.max_ns = max(self.etapa.max_ns, int(ns.max()))
+
+    @classmethod
+    def _histograma(cls, cubetas: np.ndarray, total_ns: int, max_ns: int) -> Histograma:
+        h = Histograma()
+        for columna in np.flatnonzero(cubetas):
+            h.cubetas[int(columna) + cls.MINIMA] = int(cubetas[columna])
+        h.n = sum(h.cubetas.values())
+        h.total_ns = total_ns
+        h.max_ns = max_ns
+        return h
+
+    def histograma(self, fila: int) -> Optional[Histograma]:
+        """Histograma de un símbolo, o None si no tiene datos."""
+        if fila >= len(self.total_ns) or not self.total_ns[fila]:
+            return None
+        return self._histograma(self.cubetas[fila], int(self.total_ns[fila]),
+                                int(self.max_ns[fila]))
+
+    def histograma_etapa(self) -> Histograma:
+        return self._histograma(self._etapa_cubetas, self.etapa.total_ns, self.etapa.max_ns)
+
+class _Span:
+    __slots__ = ('instrumentacion', 'etapa', 'symbol', 'inicio')
+
+    def __init__(self, instrumentacion: 'Instrumentacion', etapa: str, symbol: Optional[str]):
+        self.instrumentacion = instrumentacion
+        self.etapa = etapa
+        self.symbol = symbol
+
+    def __enter__(self) -> '_Span':
+        self.inicio = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.instrumentacion.registrar(self.etapa, time.perf_counter_ns() - self.inicio,
+                                       self.symbol)
+
+class Instrumentacion:
+    """Registro de histogramas por etapa y por (etapa, símbolo)."""
+
+    def __init__(self, activa: bool = INSTRUMENTATION, muestreo: int = INSTRUMENTATION_SAMPLE):
+        self.activa = activa
+        self.muestreo = max(1, muestreo)
+        self.inicio = time.time()
+        self.ciclos = 0
+        self._analisis = 0
+        self._etapas: Dict[str, Histograma] = {}
+        self._simbolos: Dict[Tuple[str, str], Histograma] = {}
+        self._matrices: Dict[str, MatrizSimbolos] = {}
+        # Fila de cada símbolo en las matrices; los shards repiten su lista de
+        # símbolos en cada ciclo, así que se guardan las filas de cada lista
+        self._filas: Dict[str, int] = {}
+        self._filas_lote: Dict[Tuple[str, ...], np.ndarray] = {}
+        self._contadores: Dict[str, Callable[[], Dict[str, float]]] = {}
+        self._lock = threading.Lock()
+
+    def span(self, etapa: str, symbol: Optional[str] = None):
+        """Contexto que mide su duración en `etapa` (y en `symbol`, si se indica)."""
+        if not self.activa:
+            return _NULO
+        return _Span(self, etapa, symbol)
+
+    def registrar(self, etapa: str, ns: int, symbol: Optional[str] = None) -> None:
+        """Suma una duración medida por fuera de `span()`."""
+        if not self.activa:
+            return
+        with self._lock:
+            histograma = self._etapas.get(etapa)
+            if histograma is None:
+                histograma = self._etapas[etapa] = Histograma()
+            histograma.registrar(ns)
+            if symbol is not None:
+                histograma = self._simbolos.get((etapa, symbol))
+                if histograma is None:
+                    histograma = self._simbolos[(etapa, symbol)] = Histograma()
+                histograma.registrar(ns)
+
+    def muestrear(self) -> bool:
+        """True si este ciclo de análisis debe medir cada símbolo."""
+        if not self.activa:
+            return False
+        self._analisis += 1
+        return self._analisis % self.muestreo == 1 % self.muestreo
+
+    def registrar_simbolos(self, etapas: Tuple[str, ...],
+                           muestras: List[Tuple[Any, ...]]) -> None:
+        """
+        Registra un ciclo muestreado: cada muestra es (symbol, ns de etapas[0],
+        ns de etapas[1], ...). Cuenta `muestreo` veces, por los ciclos sin medir.
+        """
+        if not self.activa or not muestras:
+            return
+        symbols, *columnas = zip(*muestras)
+        with self._lock:
+            filas = self._filas_lote.get(symbols)
+            if filas is None:
+                for symbol in symbols:
+                    self._filas.setdefault(symbol, len(self._filas))
+                if len(self._filas_lote) >= 64:
+                    self._filas_lote.clear()
+                filas = self._filas_lote[symbols] = np.array(
+                    [self._filas[symbol] for symbol in symbols], dtype=np.intp)
+            for etapa, columna in zip(etapas, columnas):
+                matriz = self._matrices.get(etapa)
+                if matriz is None:
+                    matriz = self._matrices[etapa] = MatrizSimbolos()
+                matriz.registrar(filas, np.array(columna, dtype=np.int64), self.muestreo)
+
+    def agregar_contadores(self, nombre: str, fuente: Callable[[], Dict[str, float]]) -> None:
+        """Exporta también los valores numéricos de `fuente()` (p. ej. `metricas()`)."""
+        self._contadores[nombre] = fuente
+
+    def _copia(self) -> Tuple[Dict[str, Histograma], Dict[Tuple[str, str], Histograma]]:
+        with self._lock:
+            etapas = {}
+            for etapa, h in self._etapas.items():
+                etapas[etapa] = Histograma()
+                etapas[etapa].fusionar(h)
+            simbolos = {}
+            for clave, h in self._simbolos.items():
+                simbolos[clave] = Histograma()
+                simbolos[clave].fusionar(h)
+            for etapa, matriz in self._matrices.items():
+                etapas.setdefault(etapa, Histograma()).fusionar(matriz.histograma_etapa())
+                for symbol, fila in self._filas.items():
+                    h = matriz.histograma(fila)
+                    if h is not None:
+                        simbolos.setdefault((etapa, symbol), Histograma()).fusionar(h)
+        return etapas, simbolos
+
+    def _valores_contadores(self) -> Dict[str, Dict[str, float]]:
+        valores = {}
+        for nombre, fuente in self._contadores.items():
+            try:
+                valores[nombre] = {k: v for k, v in fuente().items()
+                                   if isinstance(v, (int, float)) and not isinstance(v, bool)}
+            except Exception as e:
+                logger.error(f"Error al leer los contadores de {nombre}: {e}")
+        return valores
+
+    def instantanea(self) -> Dict[str, Any]:
+        """Histogramas y contadores listos para JSON."""
+        etapas, simbolos = self._copia()
+        por_simbolo: Dict[str, Dict[str, Any]] = {}
+        for (etapa, symbol), h in simbolos.items():
+            por_simbolo.setdefault(etapa, {})[symbol] = h.resumen()
+        return {
+            'inicio': self.inicio,
+            'timestamp': time.time(),
+            'ciclos': self.ciclos,
+            'etapas': {etapa: h.resumen() for etapa, h in etapas.items()},
+            'simbolos': por_simbolo,
+            'contadores': self._valores_contadores(),
+        }
+
+    def texto_prometheus(self) -> str:
+        """Métricas en el formato de texto de Prometheus."""
+        etapas, simbolos = self._copia()
+        lineas = ['# TYPE crypto_monitor_span_seconds summary']
+        for etapa, h in sorted(etapas.items()):
+            lineas.extend(_resumen_prometheus('crypto_monitor_span_seconds',
+                                              f'etapa="{etapa}"', h))
+        if simbolos:
+            lineas.append('# TYPE crypto_monitor_symbol_span_seconds summary')
+            for (etapa, symbol), h in sorted(simbolos.items()):
+                lineas.extend(_resumen_prometheus('crypto_monitor_symbol_span_seconds',
+                                                  f'etapa="{etapa}",symbol="{symbol}"', h))
+        lineas.append('# TYPE crypto_monitor_ciclos counter')
+        lineas.append(f'crypto_monitor_ciclos {self.ciclos}')
+        for nombre, valores in sorted(self._valores_contadores().items()):
+            for clave, valor in sorted(valores.items()):
+                lineas.append(f'crypto_monitor_{nombre}_{clave} {valor}')
+        return '\n'.join(lineas) + '\n'
+
+    def exportar_json(self, ruta: Path) -> None:
+        """Escribe la instantánea en `ruta` de forma atómica."""
+        ruta = Path(ruta)
+        ruta.parent.mkdir(parents=True, exist_ok=True)
+        temporal = ruta.with_name(ruta.name + '.tmp')
+        try:
+            temporal.write_text(json.dumps(self.instantanea(), indent=1))
+            os.replace(temporal, ruta)
+        except OSError as e:
+            logger.error(f"Error al exportar métricas a {ruta}: {e}")
+
+    def reporte(self) -> List[str]:
+        """Líneas con el tiempo por etapa, de la más costosa a la menos."""
+        etapas, _ = self._copia()
+        ciclos = max(self.ciclos, 1)
+        lineas = [f"{'etapa':<28}{'n':>9}{'ms/ciclo':>10}{'p50':>9}{'p95':>9}{'p99':>9}{'máx':>9}"]
+        for etapa, h in sorted(etapas.items(), key=lambda e: -e[1].total_ns):
+            r = h.resumen()
+            lineas.append(f"{etapa:<28}{r['n']:>9,}{r['total_ms'] / ciclos:>10.2f}"
+                          f"{r['p50_ms']:>9.3f}{r['p95_ms']:>9.3f}{r['p99_ms']:>9.3f}"
+                          f"{r['max_ms']:>9.3f}")
+        return lineas
+
+    def ciclo(self) -> None:
+        """Marca el fin de un ciclo; cada INSTRUMENTATION_REPORT ciclos reporta y exporta."""
+        if not self.activa:
+            return
+        self.ciclos += 1
+        if self.ciclos % INSTRUMENTATION_REPORT == 0:
+            self.registrar_reporte()
+
+    def registrar_reporte(self) -> None:
+        if not self.activa or not self._etapas:
+            return
+        logger.info(f"Tiempos por etapa tras {self.ciclos} ciclos (ms):\n" +
+                    '\n'.join(self.reporte()))
+        if INSTRUMENTATION_FILE:
+            self.exportar_json(INSTRUMENTATION_FILE)
+
+def _resumen_prometheus(nombre: str, etiquetas: str, h: Histograma) -> List[str]:
+    lineas = [f'{nombre}{{{etiquetas},quantile="{q}"}} {h.percentil(q) / 1e9:.9f}'
+              for q in CUANTILES]
+    lineas.append(f'{nombre}_sum{{{etiquetas}}} {h.total_ns / 1e9:.9f}')
+    lineas.append(f'{nombre}_count{{{etiquetas}}} {h.n}')
+    return lineas
+
+class PerfiladorMuestreo:
+    """
+    Toma la pila de cada hilo cada `intervalo` segundos y cuenta las pilas
+    iguales. `guardar()` las escribe en formato folded: una línea por pila,
+    "hilo;módulo:función;... muestras".
+    """
+
+    def __init__(self, ruta: Path, intervalo: float = PROFILER_INTERVAL, profundidad: int = 64):
+        self.ruta = Path(ruta)
+        self.intervalo = intervalo
+        self.profundidad = profundidad
+        self.muestras = 0
+        self.costo_s = 0.0
+        self.pilas: collections.Counter = collections.Counter()
+        self._detener = threading.Event()
+        self._hilo: Optional[threading.Thread] = None
+
+    @classmethod
+    def desde_config(cls) -> Optional['PerfiladorMuestreo']:
+        """Perfilador que escribe en PROFILER_FILE, o None si no está configurado."""
+        return cls(Path(PROFILER_FILE)) if PROFILER_FILE else None
+
+    def start(self) -> None:
+        if self._hilo is None:
+            self._detener.clear()
+            self._hilo = threading.Thread(target=self._run, name='perfilador', daemon=True)
+            self._hilo.start()
+
+    def _run(self) -> None:
+        propio = threading.get_ident()
+        codigos: Dict[Any, str] = {}
+        while not self._detener.wait(self.intervalo):
+            inicio = time.perf_counter()
+            nombres = {hilo.ident: hilo.name for hilo in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == propio:
+                    continue
+                marcos = []
+                while frame is not None and len(marcos) < self.profundidad:
+                    codigo = frame.f_code
+                    nombre = codigos.get(codigo)
+                    if nombre is None:
+                        modulo = Path(codigo.co_filename).stem
+                        nombre = codigos[codigo] = f'{modulo}:{codigo.co_name}'
+                    marcos.append(nombre)
+                    frame = frame.f_back
+                marcos.append(nombres.get(ident, str(ident)))
+                self.pilas[';'.join(reversed(marcos))] += 1
+            self.muestras += 1
+            self.costo_s += time.perf_counter() - inicio
+
+    def guardar(self) -> None:
+        try:
+            self.ruta.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.ruta, 'w') as f:
+                for pila, n in self.pilas.most_common():
+                    f.write(f'{pila} {n}\n')
+        except OSError as e:
+            logger.error(f"Error al guardar el perfil en {self.ruta}: {e}")
+
+    def stop(self) -> None:
+        """Detiene el muestreo y guarda las pilas."""
+        if self._hilo is None:
+            return
+        self._detener.set()
+        self._hilo.join()
+        self._hilo = None
+        self.guardar()
+        logger.info(f"Perfil: {self.muestras:,} muestras "
+                    f"({self.costo_s / max(self.muestras, 1) * 1e6:.0f} µs c/u), "
+                    f"{len(self.pilas):,} pilas en {self.ruta}")
+
+instrumentacion = Instrumentacion()
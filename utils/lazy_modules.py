@@ -0,0 +1,50 @@
+"""
+Importación diferida de módulos pesados.
+
+`modulo_diferido('pandas')` retorna un sustituto que importa el módulo real
+en el primer acceso a un atributo (`pd.DataFrame`, `pd.read_sql_query`...):
+importar un módulo del proyecto no arrastra pandas si el camino que se
+ejecuta no lo usa. Los módulos que lo aplican declaran
+`from __future__ import annotations`, para que las anotaciones con
+`pd.DataFrame` no cuenten como uso.
+
+Con LAZY_IMPORTS=0 el módulo se importa en el acto: el costo se paga al
+arrancar y no en la primera consulta que lo necesita.
+"""
+import importlib
+import sys
+import threading
+import types
+
+from config.settings import LAZY_IMPORTS
+
+class ModuloDiferido(types.ModuleType):
+    """Sustituto de un módulo que lo importa en el primer acceso a un atributo."""
+
+    def __init__(self, nombre: str):
+        super().__init__(nombre)
+        self._lock = threading.Lock()
+        self._modulo = None
+
+    def _cargar(self) -> types.ModuleType:
+        # Varios hilos pueden llegar a la vez al primer uso
+        with self._lock:
+            if self._modulo is None:
+                modulo = importlib.import_module(self.__name__)
+                # Los accesos siguientes resuelven sin pasar por __getattr__
+                self.__dict__.update(modulo.__dict__)
+                self._modulo = modulo
+        return self._modulo
+
+    def __getattr__(self, atributo: str):
+        return getattr(self._cargar(), atributo)
+
+    def __repr__(self) -> str:
+        estado = 'cargado' if self._modulo is not None else 'diferido'
+        return f"<módulo {self.__name__} ({estado})>"
+
+def modulo_diferido(nombre: str) -> types.ModuleType:
+    """`nombre` importado en su primer uso, o en el acto si ya está cargado o LAZY_IMPORTS=0."""
+    if not LAZY_IMPORTS or nombre in sys.modules:
+        return importlib.import_module(nombre)
+    return ModuloDiferido(nombre)
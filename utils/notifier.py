@@ -0,0 +1,306 @@
+"""
+Entrega asíncrona de alertas a destinos externos.
+
+El `Notificador` corre en un hilo con su propio event loop. `publicar()` se
+puede llamar desde cualquier hilo y nunca bloquea: cada destino (sink) tiene
+su propia cola acotada y, si está llena, el evento se descarta y se cuenta.
+Cada sink agrupa los eventos en lotes y reintenta con espera exponencial; un
+sink lento o caído solo atrasa su propia cola.
+
+Sinks disponibles: webhook HTTP (POST de una lista JSON), archivo JSONL y
+socket local (TCP o Unix, una línea JSON por evento).
+"""
+import asyncio
+import json
+import random
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from config.settings import (
+    NOTIFY_WEBHOOK_URL, NOTIFY_FILE, NOTIFY_SOCKET, NOTIFY_QUEUE_SIZE
+)
+from utils.logger import logger
+from utils.async_pipeline import MetricasEtapa
+
+class Sink:
+    """Destino de alertas: recibe lotes de eventos."""
+    nombre = 'sink'
+
+    async def enviar(self, lote: List[Dict[str, Any]]) -> None:
+        raise NotImplementedError
+
+    async def cerrar(self) -> None:
+        pass
+
+class WebhookSink(Sink):
+    """POST de cada lote como lista JSON; cualquier respuesta no 2xx es un fallo."""
+
+    def __init__(self, url: str, timeout: float = 5.0):
+        self.url = url
+        self.timeout = timeout
+        self.nombre = f'webhook {url}'
+        self._sesion = None
+
+    async def enviar(self, lote: List[Dict[str, Any]]) -> None:
+        import aiohttp
+
+        if self._sesion is None:
+            self._sesion = aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(total=self.timeout))
+        async with self._sesion.post(self.url, json=lote) as respuesta:
+            if respuesta.status >= 300:
+                raise ConnectionError(f"HTTP {respuesta.status}")
+
+    async def cerrar(self) -> None:
+        if self._sesion is not None:
+            await self._sesion.close()
+
+class ArchivoSink(Sink):
+    """Agrega una línea JSON por evento a un archivo."""
+
+    def __init__(self, ruta):
+        self.ruta = Path(ruta)
+        self.nombre = f'archivo {self.ruta}'
+
+    def _escribir(self, lineas: str) -> None:
+        self.ruta.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.ruta, 'a', encoding='utf-8') as f:
+            f.write(lineas)
+
+    async def enviar(self, lote: List[Dict[str, Any]]) -> None:
+        lineas = ''.join(json.dumps(evento, ensure_ascii=False) + '\n' for evento in lote)
+        await asyncio.get_running_loop().run_in_executor(None, self._escribir, lineas)
+
+class SocketSink(Sink):
+    """
+    Escribe una línea JSON por evento en un socket local.
+
+    `direccion` es 'host:puerto' para TCP o una ruta para un socket Unix. La
+    conexión se reabre en el siguiente intento si se corta.
+    """
+
+    def __init__(self, direccion: str, timeout: float = 5.0):
+        self.direccion = direccion
+        self.timeout = timeout
+        self.nombre = f'socket {direccion}'
+        self._escritor: Optional[asyncio.StreamWriter] = None
+
+    async def _conectar(self) -> asyncio.StreamWriter:
+        if ':' in self.direccion and not self.direccion.startswith('/'):
+            host, puerto = self.direccion.rsplit(':', 1)
+            _, escritor = await asyncio.open_connection(host, int(puerto))
+        else:
+            _, escritor = await asyncio.open_unix_connection(self.direccion)
+        return escritor
+
+    async def enviar(self, lote: List[Dict[str, Any]]) -> None:
+        try:
+            if self._escritor is None:
+                self._escritor = await asyncio.wait_for(self._conectar(), self.timeout)
+            self._escritor.write(''.join(json.dumps(evento, ensure_ascii=False) + '\n'
+                                         for evento in lote).encode())
+            await asyncio.wait_for(self._escritor.drain(), self.timeout)
+        except Exception:
+            await self.cerrar()
+            raise
+
+    async def cerrar(self) -> None:
+        if self._escritor is not None:
+            self._escritor.close()
+            self._escritor = None
+
+class EstadoSink:
+    """Cola y contadores de un sink."""
+
+    def __init__(self, sink: Sink, tamano_cola: int):
+        self.sink = sink
+        self.cola: asyncio.Queue = asyncio.Queue(maxsize=tamano_cola)
+        self.enviados = 0
+        self.fallidos = 0
+        self.descartados = 0
+        self.reintentos = 0
+        self.latencia = MetricasEtapa()
+
+class Notificador:
+    """
+    Reparte eventos a los sinks en segundo plano.
+
+    Un lote se forma con hasta `tamano_lote` eventos o lo que llegue en
+    `espera_lote` segundos; si el envío falla se reintenta hasta `reintentos`
+    veces y luego el lote se cuenta como fallido.
+    """
+
+    def __init__(self, sinks: List[Sink], tamano_cola: int = NOTIFY_QUEUE_SIZE,
+                 tamano_lote: int = 50, espera_lote: float = 0.2,
+                 reintentos: int = 5, espera_maxima: float = 30.0):
+        self.sinks = sinks
+        self.tamano_cola = tamano_cola
+        self.tamano_lote = tamano_lote
+        self.espera_lote = espera_lote
+        self.reintentos = reintentos
+        self.espera_maxima = espera_maxima
+        self.estados: List[EstadoSink] = []
+        self._hilo: Optional[threading.Thread] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._detener: Optional[asyncio.Event] = None
+
+    @classmethod
+    def desde_config(cls) -> Optional['Notificador']:
+        """Notificador con los sinks configurados, o None si no hay ninguno."""
+        sinks: List[Sink] = []
+        if NOTIFY_WEBHOOK_URL:
+            sinks.append(WebhookSink(NOTIFY_WEBHOOK_URL))
+        if NOTIFY_FILE:
+            sinks.append(ArchivoSink(NOTIFY_FILE))
+        if NOTIFY_SOCKET:
+            sinks.append(SocketSink(NOTIFY_SOCKET))
+        return cls(sinks) if sinks else None
+
+    def start(self) -> None:
+        """Inicia el hilo de entrega."""
+        if self._hilo is None:
+            listo = threading.Event()
+            self._hilo = threading.Thread(target=self._run, args=(listo,),
+                                          name='notificador', daemon=True)
+            self._hilo.start()
+            listo.wait()
+
+    def publicar(self, evento: Dict[str, Any]) -> None:
+        """Encola un evento para todos los sinks sin bloquear."""
+        if self._loop is None or self._loop.is_closed():
+            return
+        try:
+            self._loop.call_soon_threadsafe(self._encolar, (time.perf_counter(), evento))
+        except RuntimeError:
+            # El loop se cerró entre la verificación y la llamada
+            pass
+
+    def _encolar(self, item: Tuple[float, Dict[str, Any]]) -> None:
+        for estado in self.estados:
+            try:
+                estado.cola.put_nowait(item)
+            except asyncio.QueueFull:
+                estado.descartados += 1
+                if estado.descartados % 1000 == 1:
+                    logger.warning(f"Cola de {estado.sink.nombre} llena, "
+                                   f"{estado.descartados} alertas descartadas")
+
+    def metricas(self) -> Dict[str, Dict[str, float]]:
+        """Profundidad de cola, contadores y latencia de entrega (ms) por sink."""
+        return {
+            estado.sink.nombre: {
+                'en_cola': estado.cola.qsize(),
+                'enviados': estado.enviados,
+                'fallidos': estado.fallidos,
+                'descartados': estado.descartados,
+                'reintentos': estado.reintentos,
+                'latencia_prom_ms': estado.latencia.promedio_ms,
+                'latencia_max_ms': estado.latencia.max_ms,
+            }
+            for estado in self.estados
+        }
+
+    def _run(self, listo: threading.Event) -> None:
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        self._detener = asyncio.Event()
+        self.estados = [EstadoSink(sink, self.tamano_cola) for sink in self.sinks]
+        listo.set()
+        try:
+            self._loop.run_until_complete(asyncio.gather(
+                *(self._entregar(estado) for estado in self.estados)))
+        finally:
+            self._loop.close()
+
+    async def _lote(self, estado: EstadoSink) -> List[Tuple[float, Dict[str, Any]]]:
+        """
+        Espera el primer evento y junta los que lleguen durante `espera_lote`.
+        Tras la parada solo toma lo que ya está en la cola (lista vacía al final).
+        """
+        lote = []
+        if not self._detener.is_set():
+            primero = asyncio.ensure_future(estado.cola.get())
+            parada = asyncio.ensure_future(self._detener.wait())
+            await asyncio.wait({primero, parada}, return_when=asyncio.FIRST_COMPLETED)
+            parada.cancel()
+            if primero.done():
+                lote.append(primero.result())
+            else:
+                # Cancelar get() no saca el elemento de la cola
+                primero.cancel()
+                await asyncio.gather(primero, return_exceptions=True)
+        limite = time.monotonic() + self.espera_lote
+        while len(lote) < self.tamano_lote:
+            if self._detener.is_set():
+                if estado.cola.empty():
+                    break
+                lote.append(estado.cola.get_nowait())
+                continue
+            restante = limite - time.monotonic()
+            if restante <= 0:
+                break
+            try:
+                lote.append(await asyncio.wait_for(estado.cola.get(), restante))
+            except asyncio.TimeoutError:
+                break
+        return lote
+
+    async def _entregar(self, estado: EstadoSink) -> None:
+        while True:
+            lote = await self._lote(estado)
+            if not lote:
+                break
+            if await self._enviar(estado, [evento for _, evento in lote]):
+                ahora = time.perf_counter()
+                estado.enviados += len(lote)
+                for encolado, _ in lote:
+                    estado.latencia.registrar((ahora - encolado) * 1000)
+            else:
+                estado.fallidos += len(lote)
+        await estado.sink.cerrar()
+
+    async def _enviar(self, estado: EstadoSink, eventos: List[Dict[str, Any]]) -> bool:
+        for intento in range(self.reintentos + 1):
+            try:
+                await estado.sink.enviar(eventos)
+                return True
+            except Exception as e:
+                if intento == self.reintentos or self._detener.is_set():
+                    logger.error(f"No se pudieron entregar {len(eventos)} alertas a "
+                                 f"{estado.sink.nombre}: {e}")
+                    return False
+                estado.reintentos += 1
+                espera = min(self.espera_maxima, 0.5 * 2 ** intento) * random.uniform(0.5, 1.0)
+                try:
+                    await asyncio.wait_for(self._detener.wait(), timeout=espera)
+                except asyncio.TimeoutError:
+                    pass
+        return False
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Entrega lo pendiente (sin más reintentos) y detiene el hilo."""
+        if self._hilo is None:
+            return
+        self._loop.call_soon_threadsafe(self._detener.set)
+        self._hilo.join(timeout)
+        self._hilo = None
+        for nombre, m in self.metricas().items():
+            logger.info(f"Notificador {nombre}: {m['enviados']} enviadas, "
+                        f"{m['fallidos']} fallidas, {m['descartados']} descartadas, "
+                        f"latencia prom {m['latencia_prom_ms']:.1f} ms")
+
+def evento_alerta(alerta) -> Dict[str, Any]:
+    """Serializa una `Alerta` de utils.alert_rules."""
+    regla = alerta.regla
+    return {
+        'ts': alerta.ts,
+        'symbol': alerta.symbol,
+        'regla': regla.id,
+        'indicador': regla.indicador,
+        'nivel': regla.nivel,
+        'direccion': regla.direccion,
+        'valor': alerta.valor,
+        'mensaje': alerta.mensaje,
+    }
@@ -0,0 +1,207 @@
+"""
+Barrido de parámetros de la estrategia en paralelo.
+
+Cada variante (periodos de RSI/MACD, umbrales, stop, filtro de tendencia)
+se evalúa con `backtest()` en un pool de procesos. La serie de precios se
+guarda una vez en archivos `.npy` y cada proceso la abre con `mmap`, así
+que no se serializa por tarea. Los resultados se agregan a un archivo JSONL
+a medida que terminan; al relanzar el barrido se omiten las variantes que
+ya figuran en él.
+
+Uso (desde la raíz del proyecto):
+    python -m utils.parameter_sweep BTC --salida barrido.jsonl [--aleatorio 200]
+"""
+import argparse
+import hashlib
+import itertools
+import json
+import multiprocessing
+import os
+import random
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Set
+
+import numpy as np
+
+from config.settings import RSI_PERIOD, MACD_FAST, MACD_SLOW, MACD_SIGNAL
+from utils.logger import logger
+
+# Valores candidatos por parámetro; el primero de cada lista es el actual
+ESPACIO_DEFECTO: Dict[str, List[Any]] = {
+    'rsi_periodo': [RSI_PERIOD, 7, 21],
+    'macd_rapida': [MACD_FAST, 8, 5],
+    'macd_lenta': [MACD_SLOW, 21, 35],
+    'macd_senal': [MACD_SIGNAL, 5],
+    'rsi_sobreventa': [30, 25, 35],
+    'rsi_sobrecompra': [70, 65, 75],
+    'umbral_accion': [3, 2],
+    'stop_loss': [0.05, 0.03],
+    'umbral_tendencia': [None, 0.02],
+}
+
+_series: Dict[str, np.ndarray] = {}
+
+def _variante_valida(params: Dict[str, Any]) -> bool:
+    return params.get('macd_rapida', MACD_FAST) < params.get('macd_lenta', MACD_SLOW)
+
+def grilla(espacio: Dict[str, List[Any]]) -> Iterator[Dict[str, Any]]:
+    """Todas las combinaciones del espacio."""
+    claves = list(espacio)
+    for valores in itertools.product(*(espacio[c] for c in claves)):
+        params = dict(zip(claves, valores))
+        if _variante_valida(params):
+            yield params
+
+def aleatorio(espacio: Dict[str, List[Any]], n: int, seed: int = 0) -> Iterator[Dict[str, Any]]:
+    """`n` combinaciones distintas elegidas al azar (reproducible con `seed`)."""
+    rng = random.Random(seed)
+    total = 1
+    for valores in espacio.values():
+        total *= len(valores)
+    vistas: Set[str] = set()
+    intentos = 0
+    while len(vistas) < n and intentos < 20 * n and len(vistas) < total:
+        intentos += 1
+        params = {clave: rng.choice(valores) for clave, valores in espacio.items()}
+        clave = json.dumps(params, sort_keys=True)
+        if clave not in vistas and _variante_valida(params):
+            vistas.add(clave)
+            yield params
+
+def huella_datos(series: Dict[str, np.ndarray]) -> str:
+    """Identifica los datos evaluados, para no mezclar resultados al reanudar."""
+    h = hashlib.sha1()
+    for nombre in sorted(series):
+        h.update(nombre.encode())
+        h.update(np.ascontiguousarray(series[nombre]).tobytes())
+    return h.hexdigest()[:12]
+
+def id_variante(params: Dict[str, Any], huella: str) -> str:
+    return hashlib.sha1(f"{huella}:{json.dumps(params, sort_keys=True)}".encode()).hexdigest()[:16]
+
+def _iniciar_proceso(directorio: str) -> None:
+    """Abre la serie compartida en modo solo lectura, una vez por proceso."""
+    for archivo in Path(directorio).glob('*.npy'):
+        _series[archivo.stem] = np.load(archivo, mmap_mode='r')
+
+def _evaluar(tarea) -> Dict[str, Any]:
+    from utils.backtest import backtest
+
+    id_, params = tarea
+    inicio = time.perf_counter()
+    resultado = backtest(_series['cierres'], _series.get('minimos'),
+                         maximos=_series.get('maximos'), **params)
+    return {
+        'id': id_,
+        'params': params,
+        **resultado.resumen(),
+        'duracion_s': round(time.perf_counter() - inicio, 3),
+    }
+
+def _leer(salida: Path) -> Iterator[Dict[str, Any]]:
+    with open(salida, 'r', encoding='utf-8') as f:
+        for linea in f:
+            try:
+                yield json.loads(linea)
+            except ValueError:
+                # Línea truncada por una interrupción: esa variante se vuelve a evaluar
+                continue
+
+def _completadas(salida: Path) -> Set[str]:
+    return {r['id'] for r in _leer(salida)} if salida.exists() else set()
+
+def _terminar_linea(salida: Path) -> None:
+    """Cierra una última línea truncada para que el próximo resultado no se pegue a ella."""
+    if salida.exists() and salida.stat().st_size:
+        with open(salida, 'rb') as f:
+            f.seek(-1, os.SEEK_END)
+            truncada = f.read(1) != b'\n'
+        if truncada:
+            with open(salida, 'ab') as f:
+                f.write(b'\n')
+
+def barrer(cierres: np.ndarray, variantes, salida, procesos: Optional[int] = None,
+           minimos: Optional[np.ndarray] = None,
+           maximos: Optional[np.ndarray] = None) -> int:
+    """
+    Evalúa las `variantes` y agrega una línea JSON por resultado a `salida`.
+    Retorna cuántas variantes se evaluaron en esta ejecución.
+    """
+    salida = Path(salida)
+    series = {'cierres': cierres}
+    if minimos is not None:
+        series['minimos'] = minimos
+    if maximos is not None:
+        series['maximos'] = maximos
+    huella = huella_datos(series)
+    hechas = _completadas(salida)
+    tareas = [(id_, params) for id_, params in
+              ((id_variante(p, huella), p) for p in variantes) if id_ not in hechas]
+    if not tareas:
+        logger.info(f"Barrido: nada pendiente en {salida}")
+        return 0
+    logger.info(f"Barrido: {len(tareas)} variantes pendientes, {len(hechas)} ya evaluadas")
+
+    procesos = procesos or os.cpu_count() or 1
+    # Los procesos ya reparten los núcleos: BLAS con un hilo en cada uno
+    for variable in ('OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS'):
+        os.environ.setdefault(variable, '1')
+
+    _terminar_linea(salida)
+    inicio = time.perf_counter()
+    with tempfile.TemporaryDirectory() as directorio:
+        for nombre, datos in series.items():
+            np.save(Path(directorio) / f'{nombre}.npy', np.asarray(datos, dtype=np.float64))
+        contexto = multiprocessing.get_context('spawn')
+        with contexto.Pool(procesos, initializer=_iniciar_proceso,
+                           initargs=(directorio,)) as pool, \
+                open(salida, 'a', encoding='utf-8') as f:
+            for i, resultado in enumerate(pool.imap_unordered(_evaluar, tareas), start=1):
+                f.write(json.dumps(resultado) + '\n')
+                f.flush()
+                if i % 50 == 0:
+                    logger.info(f"Barrido: {i}/{len(tareas)} variantes")
+
+    duracion = time.perf_counter() - inicio
+    logger.info(f"Barrido: {len(tareas)} variantes en {duracion:.1f} s con {procesos} procesos")
+    return len(tareas)
+
+def leer_resultados(salida, orden: str = 'pnl_pct') -> List[Dict[str, Any]]:
+    """Resultados del archivo, de mejor a peor según `orden`."""
+    return sorted(_leer(Path(salida)), key=lambda r: r[orden], reverse=True)
+
+def main():
+    parser = argparse.ArgumentParser(description="Barrido de parámetros de la estrategia")
+    parser.add_argument('symbol')
+    parser.add_argument('--salida', required=True, help="archivo JSONL de resultados")
+    parser.add_argument('--intervalo', type=int, default=60, help="segundos por barra")
+    parser.add_argument('--desde', type=int)
+    parser.add_argument('--hasta', type=int)
+    parser.add_argument('--espacio', help="JSON {parámetro: [valores]}, en línea o en un archivo; "
+                             "por defecto ESPACIO_DEFECTO")
+    parser.add_argument('--aleatorio', type=int, help="evaluar N variantes al azar en vez de la grilla")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--procesos', type=int)
+    args = parser.parse_args()
+
+    from database.operations import get_velas
+
+    espacio = ESPACIO_DEFECTO
+    if args.espacio and args.espacio.lstrip().startswith('{'):
+        espacio = json.loads(args.espacio)
+    elif args.espacio:
+        with open(args.espacio, 'r', encoding='utf-8') as f:
+            espacio = json.load(f)
+    variantes = aleatorio(espacio, args.aleatorio, args.seed) if args.aleatorio else grilla(espacio)
+
+    velas = get_velas(args.symbol, args.intervalo, args.desde, args.hasta)
+    barrer(velas['close'].to_numpy(), variantes, args.salida, args.procesos,
+           velas['low'].to_numpy(), velas['high'].to_numpy())
+    for r in leer_resultados(args.salida)[:10]:
+        print(f"{r['pnl_pct']:>9.2f}% dd {r['max_drawdown_pct']:>6.2f}% "
+              f"acierto {r['tasa_acierto_pct']:>5.1f}% ops {r['operaciones']:>5}  {r['params']}")
+
+if __name__ == "__main__":
+    main()
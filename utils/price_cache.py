@@ -0,0 +1,146 @@
+"""Caché en memoria de las ventanas de precios recientes por símbolo."""
+import numpy as np
+from typing import Dict, Iterable, List, Optional, Tuple
+from utils.logger import logger
+from utils.instrumentation import instrumentacion
+from database.operations import get_historial_pagina
+
+class PriceRingBuffer:
+    """
+    Ventana circular preasignada de (ts, precio) para un símbolo.
+
+    Cada valor se escribe dos veces, en `i` y en `i + capacidad`, de modo que
+    los últimos `n` valores siempre ocupan un tramo contiguo del arreglo y
+    pueden exponerse como vistas sin copia en orden cronológico.
+    """
+
+    def __init__(self, capacidad: int):
+        if capacidad < 1:
+            raise ValueError("La capacidad debe ser mayor que cero")
+        self.capacidad = capacidad
+        self._ts = np.zeros(2 * capacidad, dtype=np.int64)
+        self._precios = np.zeros(2 * capacidad, dtype=np.float64)
+        self._pos = 0
+        self._n = 0
+
+    def __len__(self) -> int:
+        return self._n
+
+    def append(self, ts: int, precio: float) -> None:
+        """Agrega un tick, descartando el más antiguo si la ventana está llena."""
+        i = self._pos
+        self._ts[i] = self._ts[i + self.capacidad] = ts
+        self._precios[i] = self._precios[i + self.capacidad] = precio
+        self._pos = (i + 1) % self.capacidad
+        self._n = min(self._n + 1, self.capacidad)
+
+    def _vista(self, datos: np.ndarray) -> np.ndarray:
+        fin = self._pos + self.capacidad
+        vista = datos[fin - self._n:fin]
+        vista.flags.writeable = False
+        return vista
+
+    def precios(self) -> np.ndarray:
+        """Vista de solo lectura de los precios, del más antiguo al más reciente."""
+        return self._vista(self._precios)
+
+    def timestamps(self) -> np.ndarray:
+        """Vista de solo lectura de los timestamps, alineada con `precios()`."""
+        return self._vista(self._ts)
+
+    @classmethod
+    def sobre_filas(cls, ts: np.ndarray, precios: np.ndarray, n: int) -> 'PriceRingBuffer':
+        """
+        Ventana de `n` ticks sobre filas de 2 × capacidad que ya tienen cada
+        valor en `i` y en `i + capacidad` (ver `PriceCache.importar()`). Usa
+        las filas sin copiarlas.
+        """
+        buffer = cls.__new__(cls)
+        buffer.capacidad = len(ts) // 2
+        buffer._ts = ts
+        buffer._precios = precios
+        buffer._pos = n % buffer.capacidad
+        buffer._n = n
+        return buffer
+
+    def ultimo_ts(self) -> Optional[int]:
+        """Timestamp del tick más reciente, o None si está vacía."""
+        return int(self._ts[self._pos - 1 + self.capacidad]) if self._n else None
+
+class PriceCache:
+    """Conjunto de ventanas de precios indexadas por símbolo."""
+
+    def __init__(self, capacidad: int):
+        self.capacidad = capacidad
+        self._buffers: Dict[str, PriceRingBuffer] = {}
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol in self._buffers
+
+    def buffer(self, symbol: str) -> PriceRingBuffer:
+        """Retorna la ventana del símbolo, creándola si no existe."""
+        buffer = self._buffers.get(symbol)
+        if buffer is None:
+            buffer = self._buffers[symbol] = PriceRingBuffer(self.capacidad)
+        return buffer
+
+    def warm_up(self, symbols: Iterable[str]) -> None:
+        """Precarga las ventanas desde la base de datos."""
+        for symbol in symbols:
+            with instrumentacion.span('historial', symbol):
+                filas = get_historial_pagina(symbol, self.capacidad)
+            buffer = self.buffer(symbol)
+            if not filas:
+                continue
+            # Tuplas (ts, precio) sin pasar por pandas, primero la más reciente
+            for ts, precio in reversed(filas):
+                buffer.append(int(ts), float(precio))
+            logger.info(f"Caché de {symbol} precargada con {len(buffer)} precios")
+
+    def descartar(self, symbol: str) -> None:
+        """Libera la ventana de un símbolo que dejó de monitorearse."""
+        self._buffers.pop(symbol, None)
+
+    def append_many(self, ts: int, precios: Dict[str, float]) -> None:
+        """Agrega los precios de un ciclo completo."""
+        for symbol, precio in precios.items():
+            self.buffer(symbol).append(ts, precio)
+
+    def precios(self, symbol: str) -> np.ndarray:
+        """Vista sin copia de la ventana de precios del símbolo."""
+        return self.buffer(symbol).precios()
+
+    def exportar(self, symbols: Iterable[str]) -> Tuple[List[str], np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Copia las ventanas para un checkpoint: (symbols incluidos, ts, precios,
+        largos), con una fila de `capacidad` columnas por símbolo y los
+        `largos[i]` ticks de cada una al principio de la fila.
+        """
+        incluidos = [s for s in symbols if s in self._buffers]
+        ts = np.zeros((len(incluidos), self.capacidad), dtype=np.int64)
+        precios = np.zeros((len(incluidos), self.capacidad), dtype=np.float64)
+        largos = np.zeros(len(incluidos), dtype=np.int64)
+        for fila, symbol in enumerate(incluidos):
+            buffer = self._buffers.get(symbol)
+            if buffer is None:
+                # Lo quitó un cambio de universo mientras tanto: queda con largo 0
+                continue
+            n = largos[fila] = len(buffer)
+            ts[fila, :n] = buffer.timestamps()
+            precios[fila, :n] = buffer.precios()
+        return incluidos, ts, precios, largos
+
+    def importar(self, symbols: List[str], ts: np.ndarray, precios: np.ndarray,
+                 largos: np.ndarray) -> None:
+        """
+        Carga ventanas con el formato de `exportar()`, reemplazando las que
+        hubiera. Las ventanas son filas de un único bloque duplicado de una vez:
+        con filas que empiezan en 0, repetir la fila entera deja cada tick en
+        `i` y en `i + capacidad`, como lo escribe `append()`. El bloque se
+        libera cuando ya no queda ninguna de sus ventanas.
+        """
+        bloque_ts = np.concatenate([ts, ts], axis=1)
+        bloque_precios = np.concatenate([precios, precios], axis=1)
+        for fila, (symbol, n) in enumerate(zip(symbols, largos.tolist())):
+            self._buffers[symbol] = PriceRingBuffer.sobre_filas(bloque_ts[fila],
+                                                                bloque_precios[fila], n)
@@ -0,0 +1,80 @@
+"""Fuentes de precios por lotes: una sola petición de tickers por ciclo."""
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional
+from utils.logger import logger
+
+@dataclass
+class FetchStats:
+    """Métricas de la última obtención de precios."""
+    duracion_ms: float = 0.0
+    solicitados: int = 0
+    recibidos: int = 0
+    faltantes: List[str] = field(default_factory=list)
+
+class PriceSource:
+    """
+    Interfaz de una fuente de precios.
+
+    Las subclases implementan `_obtener_todos()`, que retorna el precio de todos
+    los pares disponibles en una sola llamada. `fetch_prices()` filtra ese
+    resultado a los símbolos configurados y registra los tiempos del ciclo.
+    """
+
+    def __init__(self, quote: str = 'USDT'):
+        self.quote = quote
+        self.last_stats = FetchStats()
+
+    def _obtener_todos(self) -> Dict[str, float]:
+        """Retorna {par: precio} para todos los pares del exchange."""
+        raise NotImplementedError
+
+    def fetch_prices(self, symbols: Iterable[str]) -> Dict[str, float]:
+        """Obtiene los precios de `symbols` con una única petición."""
+        symbols = list(symbols)
+        inicio = time.perf_counter()
+        try:
+            tickers = self._obtener_todos()
+        except Exception as e:
+            logger.error(f"Error al obtener precios por lote: {e}")
+            tickers = {}
+
+        precios = {}
+        for symbol in symbols:
+            price = tickers.get(symbol + self.quote)
+            if price is not None:
+                precios[symbol] = price
+
+        self.last_stats = FetchStats(
+            duracion_ms=(time.perf_counter() - inicio) * 1000,
+            solicitados=len(symbols),
+            recibidos=len(precios),
+            faltantes=[s for s in symbols if s not in precios]
+        )
+        return precios
+
+class BinancePriceSource(PriceSource):
+    """Fuente de precios basada en `binance.client.Client.get_all_tickers()`."""
+
+    def __init__(self, client, quote: str = 'USDT'):
+        super().__init__(quote)
+        self.client = client
+
+    def _obtener_todos(self) -> Dict[str, float]:
+        return {t['symbol']: float(t['price']) for t in self.client.get_all_tickers()}
+
+class StaticPriceSource(PriceSource):
+    """Fuente de precios local, útil para pruebas y ejecuciones sin red."""
+
+    def __init__(self, precios: Optional[Dict[str, float]] = None, quote: str = 'USDT'):
+        super().__init__(quote)
+        self.precios: Dict[str, float] = {}
+        for symbol, price in (precios or {}).items():
+            self.set_price(symbol, price)
+
+    def set_price(self, symbol: str, price: float) -> None:
+        """Fija el precio de un símbolo base."""
+        self.precios[symbol + self.quote] = price
+
+    def _obtener_todos(self) -> Dict[str, float]:
+        return dict(self.precios)
@@ -0,0 +1,305 @@
+"""
+Planificador de peticiones REST al exchange.
+
+Todas las llamadas a Binance pasan por `PlanificadorPedidos.ejecutar()`:
+
+- un cubo de tokens lleva el peso consumido en la ventana del exchange
+  (RATE_LIMIT_WEIGHT por minuto) y hace esperar a quien lo excedería;
+- mientras hay espera, los pedidos salen por prioridad (menor primero) y,
+  dentro de una prioridad, por orden de llegada;
+- pedidos idénticos (misma `clave`) en vuelo comparten una sola llamada;
+- las respuestas se guardan `ttl` segundos;
+- los errores transitorios (red, 5xx) se reintentan con espera exponencial
+  con jitter; un 429/418 detiene todos los pedidos durante el Retry-After
+  en vez de seguir sumando peso hasta un baneo.
+
+`ClienteProgramado` envuelve `binance.client.Client` con el peso de cada
+endpoint que usa el monitor, así que se pasa en su lugar a
+`BinancePriceSource` y `BinanceAdaptador`. Con `fabrica` el cliente real se
+crea recién en el primer pedido: python-binance tarda más de un segundo en
+importarse y hace un ping al exchange al construirse.
+"""
+import heapq
+import itertools
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple, TypeVar
+
+from config.settings import RATE_LIMIT_WEIGHT, REQUEST_RETRIES, REQUEST_TTL
+from utils.instrumentation import instrumentacion
+from utils.logger import logger
+
+PRIORIDAD_ALTA = 0  # precios del ciclo
+PRIORIDAD_NORMAL = 1
+PRIORIDAD_BAJA = 2  # listados y tareas de fondo
+
+T = TypeVar('T')
+
+class LimiteExcedido(Exception):
+    """El pedido esperó más que `max_espera` por el límite de peso."""
+
+class CuboTokens:
+    """Cubo de tokens: `capacidad` de peso que se recarga por completo en `periodo` segundos."""
+
+    def __init__(self, capacidad: float, periodo: float = 60.0):
+        self.capacidad = capacidad
+        self.tasa = capacidad / periodo
+        self._tokens = float(capacidad)
+        self._ultimo = time.monotonic()
+
+    def _recargar(self, ahora: float) -> None:
+        self._tokens = min(self.capacidad, self._tokens + (ahora - self._ultimo) * self.tasa)
+        self._ultimo = ahora
+
+    def disponibles(self) -> float:
+        self._recargar(time.monotonic())
+        return self._tokens
+
+    def espera(self, peso: float) -> float:
+        """Segundos hasta que haya `peso` disponible (0 si ya lo hay)."""
+        self._recargar(time.monotonic())
+        return max(0.0, (min(peso, self.capacidad) - self._tokens) / self.tasa)
+
+    def consumir(self, peso: float) -> None:
+        self._recargar(time.monotonic())
+        self._tokens -= min(peso, self.capacidad)
+
+    def sincronizar(self, usado: float) -> None:
+        """Ajusta al peso que el exchange informa como usado en la ventana."""
+        self._recargar(time.monotonic())
+        self._tokens = min(self._tokens, self.capacidad - usado)
+
+    def vaciar(self) -> None:
+        self._recargar(time.monotonic())
+        self._tokens = min(self._tokens, 0.0)
+
+@dataclass
+class _Vuelo:
+    """Pedido en curso que otros llamadores con la misma clave esperan."""
+    listo: threading.Event
+    resultado: Any = None
+    error: Optional[BaseException] = None
+
+def _retry_after(error: BaseException) -> Optional[float]:
+    respuesta = getattr(error, 'response', None)
+    valor = getattr(respuesta, 'headers', {}).get('Retry-After')
+    try:
+        return float(valor) if valor is not None else None
+    except ValueError:
+        return None
+
+class PlanificadorPedidos:
+    """Límite de peso, prioridad, deduplicación, caché y reintentos de las peticiones."""
+
+    def __init__(self, peso_maximo: float = RATE_LIMIT_WEIGHT, periodo: float = 60.0,
+                 reintentos: int = REQUEST_RETRIES, espera_maxima: float = 30.0,
+                 max_espera: float = 120.0):
+        self.cubo = CuboTokens(peso_maximo, periodo)
+        self.reintentos_max = reintentos
+        self.espera_maxima = espera_maxima
+        self.max_espera = max_espera
+
+        self.pedidos = 0
+        self.aciertos_cache = 0
+        self.compartidos = 0
+        self.limitados = 0
+        self.espera_s = 0.0
+        self.reintentos = 0
+        self.fallidos = 0
+        self.bloqueos = 0
+
+        self._cond = threading.Condition()
+        self._cola: List[Tuple[int, int]] = []
+        self._turnos = itertools.count()
+        self._pausa_hasta = 0.0
+        self._cache: Dict[Hashable, Tuple[float, Any]] = {}
+        self._vuelos: Dict[Hashable, _Vuelo] = {}
+
+    def ejecutar(self, funcion: Callable[[], T], peso: float = 1, clave: Optional[Hashable] = None,
+                 ttl: float = 0.0, prioridad: int = PRIORIDAD_NORMAL) -> T:
+        """
+        Ejecuta `funcion()` cuando el límite de peso lo permite.
+
+        Con `clave`, una respuesta de hace menos de `ttl` segundos o un pedido
+        igual en vuelo se reutilizan sin llamar al exchange.
+        """
+        vuelo = None
+        if clave is not None:
+            with self._cond:
+                cache = self._cache.get(clave)
+                if cache is not None and cache[0] > time.monotonic():
+                    self.aciertos_cache += 1
+                    return cache[1]
+                vuelo = self._vuelos.get(clave)
+                ajeno = vuelo is not None
+                if ajeno:
+                    self.compartidos += 1
+                else:
+                    vuelo = self._vuelos[clave] = _Vuelo(threading.Event())
+            if ajeno:
+                vuelo.listo.wait()
+                if vuelo.error is not None:
+                    raise vuelo.error
+                return vuelo.resultado
+        try:
+            resultado = self._llamar(funcion, peso, prioridad)
+        except BaseException as e:
+            if vuelo is not None:
+                vuelo.error = e
+            raise
+        else:
+            if vuelo is not None:
+                vuelo.resultado = resultado
+            if clave is not None and ttl > 0:
+                self._guardar(clave, resultado, ttl)
+            return resultado
+        finally:
+            if vuelo is not None:
+                with self._cond:
+                    self._vuelos.pop(clave, None)
+                vuelo.listo.set()
+
+    def _guardar(self, clave: Hashable, resultado: Any, ttl: float) -> None:
+        ahora = time.monotonic()
+        with self._cond:
+            if len(self._cache) >= 256:
+                self._cache = {k: v for k, v in self._cache.items() if v[0] > ahora}
+            self._cache[clave] = (ahora + ttl, resultado)
+
+    def _llamar(self, funcion: Callable[[], T], peso: float, prioridad: int) -> T:
+        for intento in itertools.count():
+            try:
+                self._turno(peso, prioridad)
+                return funcion()
+            except Exception as e:
+                espera = self._reintento(e, intento)
+                with self._cond:
+                    if espera is None:
+                        self.fallidos += 1
+                    else:
+                        self.reintentos += 1
+                if espera is None:
+                    raise
+                logger.warning(f"Reintento {intento + 1}/{self.reintentos_max} "
+                               f"en {espera:.1f} s tras error del exchange: {e}")
+                time.sleep(espera)
+
+    def _reintento(self, error: Exception, intento: int) -> Optional[float]:
+        """Segundos de espera antes de reintentar, o None si no corresponde."""
+        if intento >= self.reintentos_max:
+            return None
+        status = getattr(error, 'status_code', None)
+        if status in (418, 429):
+            # Límite excedido (429) o IP bloqueada (418): pausa para todos
+            pausa = _retry_after(error) or self.espera_maxima
+            with self._cond:
+                self.bloqueos += 1
+                self._pausa_hasta = max(self._pausa_hasta, time.monotonic() + pausa)
+                self.cubo.vaciar()
+            logger.error(f"Límite de peticiones del exchange ({status}): pausa de {pausa:.0f} s")
+            return 0.0
+        if (status is not None and status >= 500) or (status is None and isinstance(error, OSError)):
+            return min(self.espera_maxima, 0.5 * 2 ** intento) * random.uniform(0.5, 1)
+        return None
+
+    def _turno(self, peso: float, prioridad: int) -> None:
+        """Espera a que el pedido sea el primero de la cola y haya peso disponible."""
+        inicio = time.monotonic()
+        entrada = (prioridad, next(self._turnos))
+        with self._cond:
+            heapq.heappush(self._cola, entrada)
+            try:
+                while True:
+                    ahora = time.monotonic()
+                    primero = self._cola[0] == entrada
+                    espera = max(self._pausa_hasta - ahora, self.cubo.espera(peso))
+                    if primero and espera <= 0:
+                        break
+                    restante = inicio + self.max_espera - ahora
+                    if restante <= 0 or (primero and espera > restante):
+                        raise LimiteExcedido(f"Más de {self.max_espera:.0f} s esperando "
+                                             f"turno para un pedido de peso {peso}")
+                    self._cond.wait(min(espera, restante) if primero else restante)
+                self.cubo.consumir(peso)
+                self.pedidos += 1
+                esperado = time.monotonic() - inicio
+                if esperado > 0.001:
+                    self.limitados += 1
+                    self.espera_s += esperado
+                    instrumentacion.registrar('espera_limite', int(esperado * 1e9))
+            finally:
+                self._cola.remove(entrada)
+                heapq.heapify(self._cola)
+                self._cond.notify_all()
+
+    def registrar_uso(self, usado: float) -> None:
+        """Peso usado que informa el exchange (p. ej. X-MBX-USED-WEIGHT-1M)."""
+        with self._cond:
+            self.cubo.sincronizar(usado)
+
+    def metricas(self) -> Dict[str, float]:
+        """Contadores del planificador desde el arranque."""
+        with self._cond:
+            disponibles = self.cubo.disponibles()
+        return {
+            'pedidos': self.pedidos,
+            'aciertos_cache': self.aciertos_cache,
+            'compartidos': self.compartidos,
+            'limitados': self.limitados,
+            'espera_s': round(self.espera_s, 3),
+            'reintentos': self.reintentos,
+            'fallidos': self.fallidos,
+            'bloqueos': self.bloqueos,
+            'peso_disponible': round(disponibles, 1),
+        }
+
+class ClienteProgramado:
+    """
+    Envoltorio de `binance.client.Client` para los endpoints que usa el
+    monitor, con su peso en la API de Binance, su TTL y su prioridad.
+    """
+    PESOS = {'get_all_tickers': 4, 'get_symbol_ticker': 2, 'get_exchange_info': 20}
+
+    def __init__(self, client=None, planificador: Optional[PlanificadorPedidos] = None,
+                 ttl: float = REQUEST_TTL, fabrica: Optional[Callable[[], Any]] = None):
+        if client is None and fabrica is None:
+            raise ValueError("Se necesita un cliente o una fábrica que lo cree")
+        self._client = client
+        self._fabrica = fabrica
+        self._lock_cliente = threading.Lock()
+        self.planificador = planificador or PlanificadorPedidos()
+        self.ttl = ttl
+
+    @property
+    def client(self):
+        """El cliente del exchange; con `fabrica`, se crea en el primer acceso."""
+        if self._client is None:
+            with self._lock_cliente:
+                if self._client is None:
+                    self._client = self._fabrica()
+        return self._client
+
+    def _pedir(self, metodo: str, ttl: float, prioridad: int, **params) -> Any:
+        def pedido():
+            with instrumentacion.span(f'exchange.{metodo}'):
+                resultado = getattr(self.client, metodo)(**params)
+            # python-binance guarda la última respuesta HTTP en `client.response`
+            headers = getattr(getattr(self.client, 'response', None), 'headers', None) or {}
+            usado = headers.get('x-mbx-used-weight-1m')
+            if usado is not None:
+                self.planificador.registrar_uso(float(usado))
+            return resultado
+
+        clave = (metodo, tuple(sorted(params.items())))
+        return self.planificador.ejecutar(pedido, self.PESOS[metodo], clave, ttl, prioridad)
+
+    def get_all_tickers(self, prioridad: int = PRIORIDAD_ALTA) -> List[Dict[str, str]]:
+        return self._pedir('get_all_tickers', self.ttl, prioridad)
+
+    def get_symbol_ticker(self, symbol: str, prioridad: int = PRIORIDAD_NORMAL) -> Dict[str, str]:
+        return self._pedir('get_symbol_ticker', self.ttl, prioridad, symbol=symbol)
+
+    def get_exchange_info(self, prioridad: int = PRIORIDAD_BAJA) -> Dict[str, Any]:
+        return self._pedir('get_exchange_info', 300.0, prioridad)
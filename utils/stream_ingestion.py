@@ -0,0 +1,192 @@
+"""
+Ingesta de precios por WebSocket con reconexión y respaldo REST.
+
+El `StreamIngestor` consume un `FeedPrecios` en un hilo propio y conserva
+solo el último precio de cada símbolo (coalescencia): el monitor toma una
+instantánea cuando le toca analizar, sin importar cuántos mensajes llegaron.
+"""
+import asyncio
+import json
+import random
+import threading
+import time
+from typing import AsyncIterator, Dict, Iterable, Optional
+from config.settings import STREAM_URL, STREAM_STALE_AFTER
+from utils.logger import logger
+from utils.price_source import PriceSource
+
+class FeedPrecios:
+    """Interfaz de un feed de precios: cada mensaje es {par: precio}."""
+
+    def mensajes(self) -> AsyncIterator[Dict[str, float]]:
+        raise NotImplementedError
+
+class BinanceWebsocketFeed(FeedPrecios):
+    """Stream `!miniTicker@arr` de Binance (o un servidor de replay compatible)."""
+
+    def __init__(self, url: str = STREAM_URL):
+        self.url = url
+
+    async def mensajes(self) -> AsyncIterator[Dict[str, float]]:
+        import websockets
+
+        async with websockets.connect(self.url, ping_interval=20) as ws:
+            async for crudo in ws:
+                datos = json.loads(crudo)
+                if isinstance(datos, dict):
+                    datos = [datos.get('data', datos)]
+                yield {d['s']: float(d['c']) for d in datos if 's' in d and 'c' in d}
+
+class FeedSimulado(FeedPrecios):
+    """
+    Feed en proceso que reproduce una secuencia de mensajes.
+
+    Un elemento `None` en la secuencia simula una desconexión; la siguiente
+    conexión continúa desde el mensaje posterior.
+    """
+
+    def __init__(self, mensajes: Iterable[Optional[Dict[str, float]]], pausa: float = 0.0):
+        self._mensajes = iter(mensajes)
+        self.pausa = pausa
+
+    async def mensajes(self) -> AsyncIterator[Dict[str, float]]:
+        for mensaje in self._mensajes:
+            if mensaje is None:
+                raise ConnectionError("Desconexión simulada")
+            await asyncio.sleep(self.pausa)
+            yield mensaje
+        # Fin del replay: el feed queda en silencio como una conexión colgada
+        await asyncio.Event().wait()
+
+class StreamIngestor:
+    """
+    Mantiene el último precio de cada símbolo a partir de un feed.
+
+    Se reconecta con espera exponencial y, tras una reconexión o un hueco
+    mayor que `umbral_gap` segundos, rellena los precios con una petición a la
+    fuente `respaldo`.
+    """
+
+    def __init__(self, feed: FeedPrecios, symbols: Iterable[str], quote: str = 'USDT',
+                 respaldo: Optional[PriceSource] = None,
+                 umbral_gap: float = STREAM_STALE_AFTER, max_espera: float = 60.0):
+        self.feed = feed
+        self.symbols = set(symbols)
+        self.quote = quote
+        self.respaldo = respaldo
+        self.umbral_gap = umbral_gap
+        self.max_espera = max_espera
+
+        self.mensajes = 0
+        self.reconexiones = 0
+        self.huecos = 0
+        self.rellenos = 0
+
+        self._ultimos: Dict[str, float] = {}
+        self._ultimo_mensaje: Optional[float] = None
+        self._lock = threading.Lock()
+        self._hilo: Optional[threading.Thread] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._detener: Optional[asyncio.Event] = None
+
+    def start(self) -> None:
+        """Inicia el consumo del feed en un hilo con su propio event loop."""
+        if self._hilo is None:
+            listo = threading.Event()
+            self._hilo = threading.Thread(target=self._run, args=(listo,),
+                                          name='stream-ingestor', daemon=True)
+            self._hilo.start()
+            listo.wait()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Cierra la conexión y detiene el hilo."""
+        if self._hilo is None:
+            return
+        self._loop.call_soon_threadsafe(self._detener.set)
+        self._hilo.join(timeout)
+        self._hilo = None
+
+    def activo(self) -> bool:
+        """True si llegó algún mensaje en los últimos `umbral_gap` segundos."""
+        ultimo = self._ultimo_mensaje
+        return ultimo is not None and time.monotonic() - ultimo <= self.umbral_gap
+
+    def instantanea(self) -> Dict[str, float]:
+        """Último precio conocido de cada símbolo."""
+        with self._lock:
+            return dict(self._ultimos)
+
+    def aplicar(self, mensaje: Dict[str, float]) -> None:
+        """Incorpora un mensaje {par: precio}, descartando los pares ajenos."""
+        n = len(self.quote)
+        with self._lock:
+            for par, precio in mensaje.items():
+                symbol = par[:-n]
+                if par.endswith(self.quote) and symbol in self.symbols:
+                    self._ultimos[symbol] = precio
+            self._ultimo_mensaje = time.monotonic()
+            self.mensajes += 1
+
+    def _hay_hueco(self) -> bool:
+        ultimo = self._ultimo_mensaje
+        if ultimo is None or time.monotonic() - ultimo <= self.umbral_gap:
+            return False
+        self.huecos += 1
+        logger.warning(f"Hueco de {time.monotonic() - ultimo:.1f} s en el stream de precios")
+        return True
+
+    def _rellenar(self) -> None:
+        if self.respaldo is None:
+            return
+        precios = self.respaldo.fetch_prices(self.symbols)
+        with self._lock:
+            self._ultimos.update(precios)
+        self.rellenos += 1
+
+    def _run(self, listo: threading.Event) -> None:
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        self._detener = asyncio.Event()
+        listo.set()
+        try:
+            self._loop.run_until_complete(self._consumir())
+        finally:
+            self._loop.close()
+
+    async def _consumir(self) -> None:
+        fallos = 0
+        while not self._detener.is_set():
+            conexion = asyncio.ensure_future(self._leer())
+            parada = asyncio.ensure_future(self._detener.wait())
+            await asyncio.wait({conexion, parada}, return_when=asyncio.FIRST_COMPLETED)
+            if parada.done():
+                conexion.cancel()
+                break
+            parada.cancel()
+
+            recibidos = conexion.result()
+            fallos = 0 if recibidos else fallos + 1
+            espera = min(self.max_espera, 2 ** fallos) * random.uniform(0.5, 1.0)
+            self.reconexiones += 1
+            logger.warning(f"Stream desconectado, reconectando en {espera:.1f} s")
+            try:
+                await asyncio.wait_for(self._detener.wait(), timeout=espera)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _leer(self) -> int:
+        """Lee mensajes hasta que la conexión se corta; retorna cuántos llegaron."""
+        recibidos = 0
+        try:
+            async for mensaje in self.feed.mensajes():
+                reconectado = recibidos == 0 and self.reconexiones > 0
+                if self._hay_hueco() or reconectado:
+                    # Cubrir con REST lo perdido antes de aplicar el mensaje nuevo
+                    await asyncio.get_running_loop().run_in_executor(None, self._rellenar)
+                self.aplicar(mensaje)
+                recibidos += 1
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Error en el stream de precios: {e}")
+        return recibidos
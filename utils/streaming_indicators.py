@@ -0,0 +1,373 @@
+"""
+Indicadores técnicos incrementales (streaming).
+
+Cada indicador mantiene su propio estado y se actualiza en O(1) por tick con
+`update()`. Los resultados coinciden con sus equivalentes en pandas:
+
+- `EMA`: `serie.ewm(span=n, adjust=...).mean()`
+- `RSI` Wilder: medias `ewm(alpha=1/n, adjust=False)` de ganancias y pérdidas
+- `RSI` simple: medias `rolling(window=n).mean()` (como `calcular_indicadores`)
+- `ATR`: `TR.rolling(window=n).mean()` (como `identificar_tendencia`)
+- `EstadisticasMoviles`: media, `std()` (ddof=1), mínimo y máximo de la ventana
+
+`EMA` y `MACD` arrastran toda la historia. `MotorIndicadores`, en cambio,
+reproduce el análisis de una ventana de HISTORY_LIMIT precios como el
+registro (`utils/indicator_registry.py`), así que el monitor decide igual que
+`analizar_lote()`, el backtest y el barrido: el MACD y su señal (y el RSI de
+Wilder) dependen del inicio de la ventana y se evalúan sobre ella con los
+pesos del registro; el RSI simple y las estadísticas móviles solo dependen de
+los últimos valores y se actualizan en O(1).
+
+Para los checkpoints (`utils/checkpoint.py`), `estado()` agrega el estado de
+cada indicador a una lista de escalares y otra de secuencias, siempre en el
+mismo orden; `restaurar()` los consume en ese orden sobre un indicador nuevo
+con la misma configuración y lo deja idéntico.
+"""
+import copy
+import math
+from collections import deque
+from typing import Deque, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from config.settings import (
+    RSI_PERIOD, RSI_WILDER, MACD_FAST, MACD_SLOW, MACD_SIGNAL, HISTORY_LIMIT
+)
+from utils.indicator_registry import pesos_ema, pesos_senal, rsi_lote
+
+NAN = float('nan')
+
+class EMA:
+    """Media móvil exponencial con `alpha = 2 / (span + 1)`."""
+
+    def __init__(self, span: Optional[float] = None, alpha: Optional[float] = None,
+                 adjust: bool = True):
+        if alpha is None:
+            alpha = 2.0 / (span + 1.0)
+        self.alpha = alpha
+        self.adjust = adjust
+        self._num = 0.0
+        self._den = 0.0
+        self.value = NAN
+
+    def update(self, x: float) -> float:
+        decay = 1.0 - self.alpha
+        if self.adjust:
+            self._num = x + decay * self._num
+            self._den = 1.0 + decay * self._den
+            self.value = self._num / self._den
+        elif math.isnan(self.value):
+            self.value = x
+        else:
+            self.value = self.alpha * x + decay * self.value
+        return self.value
+
+    def estado(self, escalares: List[float], secuencias: List[List[float]]) -> None:
+        escalares += (self._num, self._den, self.value)
+
+    def restaurar(self, escalares: Iterator[float], secuencias: Iterator[List[float]]) -> None:
+        self._num, self._den, self.value = next(escalares), next(escalares), next(escalares)
+
+class SumaMovil:
+    """Suma de los últimos `n` valores."""
+
+    def __init__(self, n: int):
+        self.n = n
+        self._valores: Deque[float] = deque()
+        self.total = 0.0
+
+    def __len__(self) -> int:
+        return len(self._valores)
+
+    def update(self, x: float) -> float:
+        self._valores.append(x)
+        self.total += x
+        if len(self._valores) > self.n:
+            self.total -= self._valores.popleft()
+        return self.total
+
+    @property
+    def media(self) -> float:
+        return self.total / self.n if len(self._valores) == self.n else NAN
+
+    def estado(self, escalares: List[float], secuencias: List[List[float]]) -> None:
+        escalares.append(self.total)
+        secuencias.append(list(self._valores))
+
+    def restaurar(self, escalares: Iterator[float], secuencias: Iterator[List[float]]) -> None:
+        self.total = next(escalares)
+        self._valores = deque(next(secuencias))
+
+class RSI:
+    """
+    Índice de fuerza relativa con suavizado de Wilder o media simple.
+
+    Con `primer_delta_cero` el primer precio cuenta como un delta 0, como
+    `delta.where(delta > 0, 0)` en `calcular_indicadores()`: el RSI simple ya
+    tiene valor con `periodo` precios.
+    """
+
+    def __init__(self, periodo: int = RSI_PERIOD, wilder: bool = True,
+                 primer_delta_cero: bool = False):
+        self.periodo = periodo
+        self.wilder = wilder
+        self.primer_delta_cero = primer_delta_cero
+        if wilder:
+            self._gain = EMA(alpha=1.0 / periodo, adjust=False)
+            self._loss = EMA(alpha=1.0 / periodo, adjust=False)
+        else:
+            self._gain = SumaMovil(periodo)
+            self._loss = SumaMovil(periodo)
+        self._anterior = NAN
+        self.value = NAN
+
+    def _medias(self) -> Tuple[float, float]:
+        if self.wilder:
+            return self._gain.value, self._loss.value
+        # Las sumas móviles pueden quedar en -1e-16 por redondeo
+        return max(self._gain.media, 0.0), max(self._loss.media, 0.0)
+
+    def update(self, precio: float) -> float:
+        anterior, self._anterior = self._anterior, precio
+        if math.isnan(anterior):
+            if not self.primer_delta_cero:
+                return self.value
+            anterior = precio
+        delta = precio - anterior
+        self._gain.update(delta if delta > 0 else 0.0)
+        self._loss.update(-delta if delta < 0 else 0.0)
+
+        gain, loss = self._medias()
+        if math.isnan(gain) or math.isnan(loss) or (gain == 0 and loss == 0):
+            self.value = NAN
+        elif loss == 0:
+            self.value = 100.0
+        else:
+            self.value = 100.0 - 100.0 / (1.0 + gain / loss)
+        return self.value
+
+    def estado(self, escalares: List[float], secuencias: List[List[float]]) -> None:
+        escalares += (self._anterior, self.value)
+        self._gain.estado(escalares, secuencias)
+        self._loss.estado(escalares, secuencias)
+
+    def restaurar(self, escalares: Iterator[float], secuencias: Iterator[List[float]]) -> None:
+        self._anterior, self.value = next(escalares), next(escalares)
+        self._gain.restaurar(escalares, secuencias)
+        self._loss.restaurar(escalares, secuencias)
+
+class MACD:
+    """MACD (EMA rápida - EMA lenta) y su línea de señal."""
+
+    def __init__(self, rapida: int = MACD_FAST, lenta: int = MACD_SLOW,
+                 senal: int = MACD_SIGNAL, adjust: bool = True):
+        self._rapida = EMA(rapida, adjust=adjust)
+        self._lenta = EMA(lenta, adjust=adjust)
+        self._senal = EMA(senal, adjust=adjust)
+        self.macd = NAN
+        self.signal = NAN
+
+    def update(self, precio: float) -> Tuple[float, float]:
+        self.macd = self._rapida.update(precio) - self._lenta.update(precio)
+        self.signal = self._senal.update(self.macd)
+        return self.macd, self.signal
+
+    def estado(self, escalares: List[float], secuencias: List[List[float]]) -> None:
+        escalares += (self.macd, self.signal)
+        for ema in (self._rapida, self._lenta, self._senal):
+            ema.estado(escalares, secuencias)
+
+    def restaurar(self, escalares: Iterator[float], secuencias: Iterator[List[float]]) -> None:
+        self.macd, self.signal = next(escalares), next(escalares)
+        for ema in (self._rapida, self._lenta, self._senal):
+            ema.restaurar(escalares, secuencias)
+
+class ATR:
+    """Rango verdadero promedio con media simple de `periodo` valores."""
+
+    def __init__(self, periodo: int = 14):
+        self._tr = SumaMovil(periodo)
+        self._cierre_anterior = NAN
+        self.value = NAN
+
+    def update(self, high: float, low: float, close: float) -> float:
+        anterior, self._cierre_anterior = self._cierre_anterior, close
+        if math.isnan(anterior):
+            return self.value
+        tr = max(high - low, abs(high - anterior), abs(low - anterior))
+        self._tr.update(tr)
+        self.value = self._tr.media
+        return self.value
+
+class EstadisticasMoviles:
+    """
+    Media, desviación estándar, mínimo y máximo de los últimos `n` valores.
+
+    Las sumas se acumulan desplazadas por un ancla cercana a los valores para
+    evitar la cancelación numérica con precios grandes y varianzas pequeñas.
+    Cada `n` valores el ancla pasa a la media de la ventana y las sumas se
+    recalculan desde ella, así que ni una deriva larga del precio ni el
+    redondeo acumulado degradan el desvío (O(1) amortizado).
+    Mínimo y máximo usan colas monótonas (O(1) amortizado).
+    """
+
+    def __init__(self, n: int = HISTORY_LIMIT):
+        self.n = n
+        self._valores: Deque[float] = deque()
+        self._min: Deque[Tuple[int, float]] = deque()
+        self._max: Deque[Tuple[int, float]] = deque()
+        self._contador = 0
+        self._k = NAN
+        self._suma = 0.0
+        self._suma_cuadrados = 0.0
+
+    def __len__(self) -> int:
+        return len(self._valores)
+
+    def update(self, x: float) -> None:
+        if math.isnan(self._k):
+            self._k = x
+        d = x - self._k
+        self._valores.append(x)
+        self._suma += d
+        self._suma_cuadrados += d * d
+        if len(self._valores) > self.n:
+            viejo = self._valores.popleft() - self._k
+            self._suma -= viejo
+            self._suma_cuadrados -= viejo * viejo
+
+        i = self._contador
+        self._contador += 1
+        while self._min and self._min[-1][1] >= x:
+            self._min.pop()
+        self._min.append((i, x))
+        while self._max and self._max[-1][1] <= x:
+            self._max.pop()
+        self._max.append((i, x))
+        limite = i - self.n
+        if self._min[0][0] <= limite:
+            self._min.popleft()
+        if self._max[0][0] <= limite:
+            self._max.popleft()
+        if self._contador % self.n == 0:
+            self._reanclar()
+
+    def _reanclar(self) -> None:
+        self._k = math.fsum(self._valores) / len(self._valores)
+        desvios = [x - self._k for x in self._valores]
+        self._suma = math.fsum(desvios)
+        self._suma_cuadrados = math.fsum(d * d for d in desvios)
+
+    def ventana(self) -> np.ndarray:
+        """Copia de los valores de la ventana, del más antiguo al más reciente."""
+        return np.fromiter(self._valores, dtype=np.float64, count=len(self._valores))
+
+    @property
+    def media(self) -> float:
+        n = len(self._valores)
+        return self._k + self._suma / n if n else NAN
+
+    @property
+    def std(self) -> float:
+        n = len(self._valores)
+        if n < 2:
+            return NAN
+        var = (self._suma_cuadrados - self._suma * self._suma / n) / (n - 1)
+        return math.sqrt(max(var, 0.0))
+
+    @property
+    def minimo(self) -> float:
+        return self._min[0][1] if self._min else NAN
+
+    @property
+    def maximo(self) -> float:
+        return self._max[0][1] if self._max else NAN
+
+    def estado(self, escalares: List[float], secuencias: List[List[float]]) -> None:
+        escalares += (self._contador, self._k, self._suma, self._suma_cuadrados)
+        secuencias.append(list(self._valores))
+        # Colas monótonas como [i0, x0, i1, x1, ...]
+        secuencias.append([v for par in self._min for v in par])
+        secuencias.append([v for par in self._max for v in par])
+
+    def restaurar(self, escalares: Iterator[float], secuencias: Iterator[List[float]]) -> None:
+        self._contador = int(next(escalares))
+        self._k, self._suma, self._suma_cuadrados = next(escalares), next(escalares), next(escalares)
+        self._valores = deque(next(secuencias))
+        for cola in ('_min', '_max'):
+            pares = next(secuencias)
+            setattr(self, cola, deque(zip(map(int, pares[0::2]), pares[1::2])))
+
+class MotorIndicadores:
+    """
+    Estado incremental de los indicadores que usa `generar_recomendacion()`.
+
+    Se siembra con el historial disponible (`seed()`) y luego recibe un precio
+    por tick (`update()`), sin recalcular la ventana completa. Los valores son
+    los de la ventana de los últimos `ventana` precios, como si se evaluara
+    con el registro (ver el docstring del módulo).
+    """
+
+    def __init__(self, ventana: int = HISTORY_LIMIT, rsi_periodo: int = RSI_PERIOD,
+                 rsi_wilder: bool = RSI_WILDER, macd_rapida: int = MACD_FAST,
+                 macd_lenta: int = MACD_SLOW, macd_senal: int = MACD_SIGNAL):
+        self.rsi_periodo = rsi_periodo
+        self.rsi_wilder = rsi_wilder
+        # El RSI de Wilder depende del inicio de la ventana: se evalúa sobre ella
+        self.rsi = None if rsi_wilder else RSI(rsi_periodo, wilder=False, primer_delta_cero=True)
+        self.macd_periodos = (macd_rapida, macd_lenta, macd_senal)
+        self.stats = EstadisticasMoviles(ventana)
+        self.precio = NAN
+        self.n = 0
+
+    def seed(self, precios: Iterable[float]) -> None:
+        """Alimenta el historial en orden cronológico."""
+        for precio in precios:
+            self.update(precio)
+
+    def update(self, precio: float) -> None:
+        precio = float(precio)
+        if self.rsi is not None:
+            self.rsi.update(precio)
+        self.stats.update(precio)
+        self.precio = precio
+        self.n += 1
+
+    def estado(self, escalares: List[float], secuencias: List[List[float]]) -> None:
+        """Agrega el estado completo del motor (ver el docstring del módulo)."""
+        escalares += (self.precio, self.n)
+        if self.rsi is not None:
+            self.rsi.estado(escalares, secuencias)
+        self.stats.estado(escalares, secuencias)
+
+    def restaurar(self, escalares: Iterator[float], secuencias: Iterator[List[float]]) -> None:
+        self.precio, self.n = next(escalares), int(next(escalares))
+        if self.rsi is not None:
+            self.rsi.restaurar(escalares, secuencias)
+        self.stats.restaurar(escalares, secuencias)
+
+    def copia(self) -> 'MotorIndicadores':
+        """Copia independiente, para evaluar un precio sin confirmarlo."""
+        return copy.deepcopy(self)
+
+    def indicadores(self) -> Dict[str, float]:
+        """Valores actuales con el mismo formato que `calcular_indicadores()`."""
+        if not self.n:
+            return {'rsi': NAN, 'macd': NAN, 'signal': NAN}
+        # Fila de 1 × n, como evalúa el registro
+        ventana = self.stats.ventana().reshape(1, -1)
+        n = ventana.shape[1]
+        rapida, lenta, senal = self.macd_periodos
+        if self.rsi is not None:
+            rsi = self.rsi.value
+        else:
+            rsi = float(rsi_lote(ventana, self.rsi_periodo, wilder=True)[0])
+        return {
+            'rsi': rsi,
+            'macd': float((ventana @ pesos_ema(n, rapida))[0] - (ventana @ pesos_ema(n, lenta))[0]),
+            'signal': float((ventana @ pesos_senal(n, rapida, lenta, senal))[0])
+        }
+
+    def volatilidad(self) -> float:
+        """Desviación estándar relativa de la ventana, en porcentaje."""
+        return self.stats.std / self.stats.media * 100
@@ -0,0 +1,409 @@
+"""
+Universo de símbolos: pares de varios exchanges y monedas de cotización,
+repartidos entre workers.
+
+Cada par se identifica con un `id` que es la clave en la base, la caché y el
+resto del monitor. Los pares USDT de Binance conservan la clave histórica
+(solo la base, p. ej. 'BTC'); el resto usa 'BASE-QUOTE' ('ETH-BTC') y, fuera
+de Binance, 'exchange.BASE-QUOTE' ('kraken.BTC-USD').
+
+`ShardPool` asigna cada par a un worker por hashing de rendezvous (HRW): el
+worker con mayor peso hash(worker, par) se queda con el par. Al agregar o
+quitar un par solo ese par cambia; al agregar o quitar un worker solo se
+mueven los pares que gana o que tenía (1/n del universo), sin redistribuir
+todo. Cada worker es un hilo que obtiene y analiza solo sus pares.
+"""
+import hashlib
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple, TypeVar
+
+import numpy as np
+
+from config.settings import SUPPORTED_COINS, UNIVERSE_WORKERS
+from utils.instrumentation import instrumentacion
+from utils.logger import logger
+from utils.price_source import FetchStats
+
+EXCHANGE_DEFECTO = 'binance'
+QUOTE_DEFECTO = 'USDT'
+
+T = TypeVar('T')
+
+@dataclass(frozen=True)
+class Par:
+    """Par negociable de un exchange."""
+    base: str
+    quote: str = QUOTE_DEFECTO
+    exchange: str = EXCHANGE_DEFECTO
+    id: str = field(init=False, compare=False)
+
+    def __post_init__(self):
+        if self.exchange == EXCHANGE_DEFECTO:
+            id_ = self.base if self.quote == QUOTE_DEFECTO else f'{self.base}-{self.quote}'
+        else:
+            id_ = f'{self.exchange}.{self.base}-{self.quote}'
+        object.__setattr__(self, 'id', id_)
+
+    @classmethod
+    def desde_id(cls, id_: str) -> 'Par':
+        exchange = EXCHANGE_DEFECTO
+        if '.' in id_:
+            exchange, id_ = id_.split('.', 1)
+        base, _, quote = id_.partition('-')
+        return cls(base, quote or QUOTE_DEFECTO, exchange)
+
+class AdaptadorExchange:
+    """
+    Interfaz de un exchange.
+
+    Las subclases implementan `listar_pares()` y `_precios()`; si el exchange
+    limita cuántos pares acepta por petición, `max_por_pedido` hace que
+    `precios()` los pida en lotes.
+    """
+    nombre = 'exchange'
+    max_por_pedido: Optional[int] = None
+
+    def listar_pares(self) -> List[Par]:
+        """Pares negociables del exchange."""
+        raise NotImplementedError
+
+    def ticker(self, par: Par) -> str:
+        """Nombre del par en el exchange."""
+        return par.base + par.quote
+
+    def _precios(self, tickers: List[str]) -> Dict[str, float]:
+        """Retorna {ticker: precio}; puede incluir tickers no pedidos."""
+        raise NotImplementedError
+
+    def precios(self, pares: Sequence[Par]) -> Dict[Par, float]:
+        """Precio actual de `pares` (los que el exchange no devuelve se omiten)."""
+        resultado: Dict[Par, float] = {}
+        paso = self.max_por_pedido or max(len(pares), 1)
+        for i in range(0, len(pares), paso):
+            lote = pares[i:i + paso]
+            datos = self._precios([self.ticker(par) for par in lote])
+            for par in lote:
+                precio = datos.get(self.ticker(par))
+                if precio is not None:
+                    resultado[par] = precio
+        return resultado
+
+class BinanceAdaptador(AdaptadorExchange):
+    """
+    Binance vía `binance.client.Client` (o `ClienteProgramado`).
+
+    `get_all_tickers()` trae todos los pares en una petición; con
+    `ClienteProgramado` los shards de un mismo ciclo comparten esa respuesta
+    en lugar de pedirla cada uno.
+    """
+    nombre = 'binance'
+
+    def __init__(self, client):
+        self.client = client
+
+    def listar_pares(self) -> List[Par]:
+        info = self.client.get_exchange_info()
+        return [Par(s['baseAsset'], s['quoteAsset'], self.nombre)
+                for s in info['symbols'] if s.get('status') == 'TRADING']
+
+    def _precios(self, tickers: List[str]) -> Dict[str, float]:
+        return {t['symbol']: float(t['price']) for t in self.client.get_all_tickers()}
+
+class AdaptadorSimulado(AdaptadorExchange):
+    """
+    Exchange local para pruebas y benchmarks: precios en caminata aleatoria,
+    `latencia` segundos por petición y lotes de `max_por_pedido` pares.
+    """
+
+    def __init__(self, nombre: str, pares: Iterable[Tuple[str, str]], latencia: float = 0.0,
+                 max_por_pedido: Optional[int] = None, semilla: int = 0):
+        self.nombre = nombre
+        self.latencia = latencia
+        self.max_por_pedido = max_por_pedido
+        self.pedidos = 0
+        self._rng = np.random.default_rng(semilla)
+        self._lock = threading.Lock()
+        self._precios_actuales: Dict[str, float] = {}
+        self._pares: Dict[str, Par] = {}
+        for base, quote in pares:
+            self.listar(Par(base, quote, nombre))
+
+    def listar(self, par: Par, precio: Optional[float] = None) -> None:
+        """Agrega un par al listado del exchange."""
+        with self._lock:
+            self._pares[self.ticker(par)] = par
+            self._precios_actuales[self.ticker(par)] = precio or float(self._rng.uniform(1, 1000))
+
+    def deslistar(self, par: Par) -> None:
+        with self._lock:
+            self._pares.pop(self.ticker(par), None)
+            self._precios_actuales.pop(self.ticker(par), None)
+
+    def listar_pares(self) -> List[Par]:
+        with self._lock:
+            return list(self._pares.values())
+
+    def _precios(self, tickers: List[str]) -> Dict[str, float]:
+        if self.latencia:
+            time.sleep(self.latencia)
+        with self._lock:
+            self.pedidos += 1
+            resultado = {}
+            for ticker in tickers:
+                precio = self._precios_actuales.get(ticker)
+                if precio is not None:
+                    precio *= 1 + float(self._rng.normal(0, 0.001))
+                    self._precios_actuales[ticker] = resultado[ticker] = precio
+            return resultado
+
+class UniversoSimbolos:
+    """
+    Conjunto de pares monitoreados, modificable en ejecución.
+
+    Los oyentes registrados con `suscribir()` reciben (agregados, quitados)
+    después de cada cambio.
+    """
+
+    def __init__(self, pares: Iterable[Par] = (), nombres: Optional[Dict[str, str]] = None):
+        self.nombres = dict(nombres or {})
+        self._pares: Dict[str, Par] = {}
+        self._lock = threading.Lock()
+        self._oyentes: List[Callable[[List[Par], List[Par]], None]] = []
+        self.agregar(pares)
+
+    @classmethod
+    def desde_config(cls) -> 'UniversoSimbolos':
+        """Los pares USDT de Binance de SUPPORTED_COINS."""
+        return cls((Par(base) for base in SUPPORTED_COINS),
+                   {base: nombre for base, nombre in SUPPORTED_COINS.items()})
+
+    def __len__(self) -> int:
+        return len(self._pares)
+
+    def __contains__(self, id_: str) -> bool:
+        return id_ in self._pares
+
+    def par(self, id_: str) -> Optional[Par]:
+        return self._pares.get(id_)
+
+    def pares(self) -> List[Par]:
+        """Pares en el orden en que se agregaron."""
+        with self._lock:
+            return list(self._pares.values())
+
+    def ids(self) -> List[str]:
+        with self._lock:
+            return list(self._pares)
+
+    def nombre(self, id_: str) -> str:
+        """Nombre para mostrar: el de SUPPORTED_COINS o el propio id."""
+        return self.nombres.get(id_, id_)
+
+    def suscribir(self, oyente: Callable[[List[Par], List[Par]], None]) -> None:
+        self._oyentes.append(oyente)
+
+    def _notificar(self, agregados: List[Par], quitados: List[Par]) -> None:
+        if not agregados and not quitados:
+            return
+        for oyente in self._oyentes:
+            try:
+                oyente(agregados, quitados)
+            except Exception as e:
+                logger.error(f"Error al aplicar un cambio del universo de símbolos: {e}")
+
+    def agregar(self, pares: Iterable[Par]) -> List[Par]:
+        """Agrega pares; retorna los que no estaban."""
+        with self._lock:
+            agregados = [par for par in pares if par.id not in self._pares]
+            for par in agregados:
+                self._pares[par.id] = par
+        self._notificar(agregados, [])
+        return agregados
+
+    def quitar(self, ids: Iterable[str]) -> List[Par]:
+        """Quita pares por id; retorna los que estaban."""
+        with self._lock:
+            quitados = [self._pares.pop(id_) for id_ in ids if id_ in self._pares]
+        self._notificar([], quitados)
+        return quitados
+
+    def sincronizar(self, adaptador: AdaptadorExchange, quotes: Iterable[str],
+                    fijos: Iterable[str] = ()) -> Tuple[List[Par], List[Par]]:
+        """
+        Alinea los pares de `adaptador` con su listado: agrega los nuevos con
+        alguna de `quotes` y quita los deslistados, salvo los ids en `fijos`.
+        """
+        quotes = set(quotes)
+        listados = [par for par in adaptador.listar_pares() if par.quote in quotes]
+        vigentes = {par.id for par in listados}
+        fijos = set(fijos)
+        quitados = self.quitar([par.id for par in self.pares()
+                                if par.exchange == adaptador.nombre
+                                and par.id not in vigentes and par.id not in fijos])
+        agregados = self.agregar(listados)
+        if agregados or quitados:
+            logger.info(f"Universo {adaptador.nombre}: +{len(agregados)} / -{len(quitados)} "
+                        f"pares, {len(self)} en total")
+        return agregados, quitados
+
+def peso(worker: str, id_: str) -> int:
+    """Peso de rendezvous de un par para un worker."""
+    return int.from_bytes(hashlib.blake2b(f'{worker}\0{id_}'.encode(),
+                                          digest_size=8).digest(), 'big')
+
+def shard_de(id_: str, workers: Iterable[str]) -> str:
+    """Worker al que corresponde el par: el de mayor peso."""
+    return max(workers, key=lambda worker: peso(worker, id_))
+
+class ShardWorker:
+    """Un shard: sus pares y un hilo propio para obtenerlos y analizarlos."""
+
+    def __init__(self, nombre: str):
+        self.nombre = nombre
+        self.pares: Dict[str, Par] = {}
+        self.duracion_ms = 0.0
+        self._executor = ThreadPoolExecutor(1, thread_name_prefix=f'shard-{nombre}')
+
+    def enviar(self, funcion: Callable[..., T], *args) -> 'Future[T]':
+        return self._executor.submit(funcion, *args)
+
+    def stop(self) -> None:
+        self._executor.shutdown(wait=True)
+
+def _obtener_shard(worker: ShardWorker, pares: List[Par],
+                   adaptadores: Dict[str, AdaptadorExchange]) -> Dict[str, float]:
+    """Obtiene los precios de los pares de un shard, una tanda por exchange."""
+    inicio = time.perf_counter()
+    por_exchange: Dict[str, List[Par]] = {}
+    for par in pares:
+        por_exchange.setdefault(par.exchange, []).append(par)
+    precios: Dict[str, float] = {}
+    for exchange, lista in por_exchange.items():
+        adaptador = adaptadores.get(exchange)
+        if adaptador is None:
+            logger.error(f"Sin adaptador para el exchange {exchange}")
+            continue
+        try:
+            with instrumentacion.span(f'precios.{exchange}'):
+                obtenidos = adaptador.precios(lista)
+            precios.update((par.id, precio) for par, precio in obtenidos.items())
+        except Exception as e:
+            logger.error(f"Error al obtener precios de {exchange} en el shard {worker.nombre}: {e}")
+    worker.duracion_ms = (time.perf_counter() - inicio) * 1000
+    return precios
+
+class ShardPool:
+    """
+    Reparte el universo entre `workers` shards y reasigna pares cuando el
+    universo o la cantidad de workers cambian.
+    """
+
+    def __init__(self, universo: UniversoSimbolos, adaptadores: Dict[str, AdaptadorExchange],
+                 workers: int = UNIVERSE_WORKERS):
+        self.universo = universo
+        self.adaptadores = adaptadores
+        self.last_stats = FetchStats()
+        self.movidos = 0
+        self._workers: Dict[str, ShardWorker] = {}
+        self._asignacion: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        for i in range(max(1, workers)):
+            self._workers[f'w{i}'] = ShardWorker(f'w{i}')
+        with self._lock:
+            for par in universo.pares():
+                self._asignar(par)
+        universo.suscribir(self._cambio_universo)
+
+    def _asignar(self, par: Par) -> None:
+        nombre = shard_de(par.id, self._workers)
+        self._asignacion[par.id] = nombre
+        self._workers[nombre].pares[par.id] = par
+
+    def _cambio_universo(self, agregados: List[Par], quitados: List[Par]) -> None:
+        with self._lock:
+            for par in quitados:
+                nombre = self._asignacion.pop(par.id, None)
+                if nombre is not None:
+                    self._workers[nombre].pares.pop(par.id, None)
+            for par in agregados:
+                self._asignar(par)
+
+    def reparto(self) -> Dict[str, int]:
+        """Cantidad de pares por worker."""
+        with self._lock:
+            return {nombre: len(worker.pares) for nombre, worker in self._workers.items()}
+
+    def shard(self, id_: str) -> Optional[str]:
+        return self._asignacion.get(id_)
+
+    def agregar_worker(self) -> str:
+        """Suma un worker; solo se le mueven los pares que gana. Retorna su nombre."""
+        with self._lock:
+            i = len(self._workers)
+            while f'w{i}' in self._workers:
+                i += 1
+            nuevo = ShardWorker(f'w{i}')
+            self._workers[nuevo.nombre] = nuevo
+            movidos = 0
+            for id_, actual in list(self._asignacion.items()):
+                if peso(nuevo.nombre, id_) > peso(actual, id_):
+                    nuevo.pares[id_] = self._workers[actual].pares.pop(id_)
+                    self._asignacion[id_] = nuevo.nombre
+                    movidos += 1
+        self.movidos += movidos
+        logger.info(f"Shard {nuevo.nombre} agregado: {movidos} pares movidos")
+        return nuevo.nombre
+
+    def quitar_worker(self, nombre: str) -> int:
+        """Quita un worker y reparte solo sus pares; retorna cuántos se movieron."""
+        with self._lock:
+            if nombre not in self._workers or len(self._workers) == 1:
+                return 0
+            worker = self._workers.pop(nombre)
+            for par in worker.pares.values():
+                self._asignar(par)
+            movidos = len(worker.pares)
+        worker.stop()
+        self.movidos += movidos
+        logger.info(f"Shard {nombre} quitado: {movidos} pares movidos")
+        return movidos
+
+    def _tareas(self, excluir: Set[str]) -> List[Tuple[ShardWorker, List[Par]]]:
+        with self._lock:
+            return [(worker, [par for id_, par in worker.pares.items() if id_ not in excluir])
+                    for worker in self._workers.values()]
+
+    def obtener_precios(self, excluir: Iterable[str] = ()) -> Dict[str, float]:
+        """Precios {id: precio} de todo el universo (salvo `excluir`), en paralelo por shard."""
+        inicio = time.perf_counter()
+        tareas = [(worker, pares) for worker, pares in self._tareas(set(excluir)) if pares]
+        futuros = [worker.enviar(_obtener_shard, worker, pares, self.adaptadores)
+                   for worker, pares in tareas]
+        precios: Dict[str, float] = {}
+        for futuro in futuros:
+            precios.update(futuro.result())
+        solicitados = [par.id for _, pares in tareas for par in pares]
+        self.last_stats = FetchStats(
+            duracion_ms=(time.perf_counter() - inicio) * 1000,
+            solicitados=len(solicitados),
+            recibidos=len(precios),
+            faltantes=[id_ for id_ in solicitados if id_ not in precios],
+        )
+        return precios
+
+    def map(self, funcion: Callable[[List[str]], List[T]]) -> List[T]:
+        """Ejecuta `funcion(ids del shard)` en cada worker y concatena los resultados."""
+        with self._lock:
+            tareas = [(worker, list(worker.pares)) for worker in self._workers.values()]
+        futuros = [worker.enviar(funcion, ids) for worker, ids in tareas if ids]
+        resultados: List[T] = []
+        for futuro in futuros:
+            resultados.extend(futuro.result())
+        return resultados
+
+    def stop(self) -> None:
+        for worker in list(self._workers.values()):
+            worker.stop()
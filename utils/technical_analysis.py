@@ -1,42 +1,62 @@
-"""Análisis técnico y señales de trading."""
-import pandas as pd
-from typing import Dict, Any
-from config.settings import RSI_PERIOD, MACD_FAST, MACD_SLOW, MACD_SIGNAL
+"""
+Análisis técnico y señales de trading.
+
+Los indicadores sobre una ventana salen del registro de
+`utils/indicator_registry.py`, los mismos que usan `analizar_lote()` y el
+backtest; con un `MotorIndicadores` se usan sus valores incrementales.
+"""
+from __future__ import annotations
+
+import numpy as np
+from typing import Dict, Any, Optional, Union
+from config.settings import RSI_PERIOD, RSI_WILDER, MACD_FAST, MACD_SLOW, MACD_SIGNAL
+from utils.indicator_registry import (
+    FACTOR_RESISTENCIA, FACTOR_SOPORTE, PRECIO, RSI_SOBRECOMPRA, RSI_SOBREVENTA, UMBRAL_ACCION,
+    distancia_resistencia, distancia_soporte, macd, registro, resistencia, rsi, senal_macd,
+    soporte, ultimo, volatilidad
+)
 from utils.logger import logger
+from utils.lazy_modules import modulo_diferido
+from utils.streaming_indicators import MotorIndicadores
+
+pd = modulo_diferido('pandas')
+
+INDICADORES = {
+    'rsi': rsi(RSI_PERIOD, RSI_WILDER),
+    'macd': macd(MACD_FAST, MACD_SLOW),
+    'signal': senal_macd(MACD_FAST, MACD_SLOW, MACD_SIGNAL),
+}
+NIVELES = {
+    'soporte': soporte(),
+    'resistencia': resistencia(),
+    'distancia_resistencia': distancia_resistencia(),
+    'distancia_soporte': distancia_soporte(),
+}
 
-def calcular_indicadores(precios: pd.Series) -> Dict[str, float]:
+def _calcular(precios, nombres: Dict[str, str]) -> Dict[str, Dict[str, float]]:
+    """Valores del registro para una sola ventana de precios."""
+    matriz = np.asarray(precios, dtype=np.float64).reshape(1, -1)
+    valores = registro.calcular({PRECIO: matriz}, nombres.values())
+    return {clave: float(valores[nombre][0]) for clave, nombre in nombres.items()}
+
+def calcular_indicadores(precios: Union[pd.Series, np.ndarray]) -> Dict[str, float]:
     """Calcula indicadores técnicos principales."""
-    delta = precios.diff()
-    gain = (delta.where(delta > 0, 0)).rolling(window=RSI_PERIOD).mean()
-    loss = (-delta.where(delta < 0, 0)).rolling(window=RSI_PERIOD).mean()
-    rs = gain / loss
-    rsi = 100 - (100 / (1 + rs))
-    
-    ema_fast = precios.ewm(span=MACD_FAST).mean()
-    ema_slow = precios.ewm(span=MACD_SLOW).mean()
-    macd = ema_fast - ema_slow
-    signal = macd.ewm(span=MACD_SIGNAL).mean()
-    
-    return {
-        'rsi': rsi.iloc[-1],
-        'macd': macd.iloc[-1],
-        'signal': signal.iloc[-1]
-    }
+    return _calcular(precios, INDICADORES)
 
-def analizar_niveles(precios: pd.Series) -> Dict[str, float]:
+def analizar_niveles(precios: Union[pd.Series, np.ndarray]) -> Dict[str, float]:
     """Identifica niveles de soporte y resistencia."""
-    maximo = precios.max()
-    minimo = precios.min()
-    actual = precios.iloc[-1]
-    
-    resistencia = maximo * 0.95
-    soporte = minimo * 1.05
+    return _calcular(precios, NIVELES)
+
+def calcular_niveles(maximo: float, minimo: float, actual: float) -> Dict[str, float]:
+    """Soporte y resistencia a partir de los extremos de la ventana."""
+    nivel_resistencia = maximo * FACTOR_RESISTENCIA
+    nivel_soporte = minimo * FACTOR_SOPORTE
     
     return {
-        'soporte': soporte,
-        'resistencia': resistencia,
-        'distancia_resistencia': ((resistencia - actual) / actual) * 100,
-        'distancia_soporte': ((actual - soporte) / actual) * 100
+        'soporte': nivel_soporte,
+        'resistencia': nivel_resistencia,
+        'distancia_resistencia': ((nivel_resistencia - actual) / actual) * 100,
+        'distancia_soporte': ((actual - nivel_soporte) / actual) * 100
     }
 
 def analizar_resistencias(df: pd.DataFrame, precio_actual: float) -> Dict:
@@ -53,25 +73,52 @@ def analizar_resistencias(df: pd.DataFrame, precio_actual: float) -> Dict:
         logger.error(f"Error analizando resistencias: {e}")
         return {'proxima_resistencia': None, 'proximo_soporte': None}
 
-def generar_recomendacion(df: pd.DataFrame) -> Dict[str, Any]:
-    """Genera recomendaciones completas de trading."""
-    if len(df) < 2:
+def generar_recomendacion(df: Union[pd.DataFrame, np.ndarray],
+                          motor: Optional[MotorIndicadores] = None) -> Dict[str, Any]:
+    """
+    Genera recomendaciones completas de trading.
+
+    Acepta un DataFrame con columna 'price' o directamente un arreglo de
+    precios en orden cronológico (p. ej. una vista de `PriceCache`). Si se
+    pasa un `motor` ya actualizado, sus indicadores incrementales reemplazan
+    el recálculo sobre la ventana y `df` no se utiliza.
+    """
+    if (motor.n if motor is not None else len(df)) < 2:
         return {
             'señales': ['Datos insuficientes para análisis'],
             'accion': 'ESPERAR ⏳',
             'confianza': 0
         }
-    
-    precios = df['price']
-    indicadores = calcular_indicadores(precios)
-    niveles = analizar_niveles(precios)
+
+    if motor is not None:
+        stats = motor.stats
+        return evaluar_senales(
+            motor.precio,
+            motor.indicadores(),
+            calcular_niveles(stats.maximo, stats.minimo, motor.precio),
+            motor.volatilidad()
+        )
+
+    precios = df if isinstance(df, np.ndarray) else df['price'].to_numpy()
+    valores = _calcular(precios, {**INDICADORES, **NIVELES,
+                                  'actual': ultimo(), 'volatilidad': volatilidad()})
+    return evaluar_senales(
+        valores['actual'],
+        {clave: valores[clave] for clave in INDICADORES},
+        {clave: valores[clave] for clave in NIVELES},
+        valores['volatilidad']
+    )
+
+def evaluar_senales(precio_actual: float, indicadores: Dict[str, float],
+                    niveles: Dict[str, float], volatilidad: float) -> Dict[str, Any]:
+    """Puntúa los indicadores y niveles y decide la acción sugerida."""
     señales = []
     confianza = 0
     
-    if indicadores['rsi'] < 30:
+    if indicadores['rsi'] < RSI_SOBREVENTA:
         señales.append(f"RSI en sobreventa ({indicadores['rsi']:.1f})")
         confianza += 2
-    elif indicadores['rsi'] > 70:
+    elif indicadores['rsi'] > RSI_SOBRECOMPRA:
         señales.append(f"RSI en sobrecompra ({indicadores['rsi']:.1f})")
         confianza -= 2
     
@@ -82,11 +129,9 @@ def generar_recomendacion(df: pd.DataFrame) -> Dict[str, Any]:
         señales.append("MACD negativo")
         confianza -= 1
     
-    volatilidad = precios.std() / precios.mean() * 100
     if volatilidad > 5:
         señales.append(f"Volatilidad alta ({volatilidad:.1f}%)")
     
-    precio_actual = precios.iloc[-1]
     if precio_actual < niveles['soporte']:
         señales.append("Precio bajo soporte")
         confianza += 2
@@ -94,9 +139,9 @@ def generar_recomendacion(df: pd.DataFrame) -> Dict[str, Any]:
         señales.append("Precio sobre resistencia")
         confianza -= 2
     
-    if confianza >= 3:
+    if confianza >= UMBRAL_ACCION:
         accion = "COMPRAR 🟢"
-    elif confianza <= -3:
+    elif confianza <= -UMBRAL_ACCION:
         accion = "VENDER 🔴"
     else:
         accion = "MANTENER ⏺"
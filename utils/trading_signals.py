@@ -1,94 +0,0 @@
-"""Análisis y señales de trading."""
-import pandas as pd
-from typing import Dict, Any
-
-def calcular_indicadores(precios: pd.Series) -> Dict[str, float]:
-    """Calcula indicadores técnicos principales."""
-    delta = precios.diff()
-    gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-    loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-    rs = gain / loss
-    rsi = 100 - (100 / (1 + rs))
-    
-    ema12 = precios.ewm(span=12).mean()
-    ema26 = precios.ewm(span=26).mean()
-    macd = ema12 - ema26
-    signal = macd.ewm(span=9).mean()
-    
-    return {
-        'rsi': rsi.iloc[-1],
-        'macd': macd.iloc[-1],
-        'signal': signal.iloc[-1]
-    }
-
-def analizar_niveles(precios: pd.Series) -> Dict[str, float]:
-    """Identifica niveles de soporte y resistencia."""
-    maximo = precios.max()
-    minimo = precios.min()
-    actual = precios.iloc[-1]
-    
-    resistencia = maximo * 0.95
-    soporte = minimo * 1.05
-    
-    return {
-        'soporte': soporte,
-        'resistencia': resistencia,
-        'distancia_resistencia': ((resistencia - actual) / actual) * 100,
-        'distancia_soporte': ((actual - soporte) / actual) * 100
-    }
-
-def generar_recomendacion(df: pd.DataFrame) -> Dict[str, Any]:
-    """Genera recomendaciones completas de trading."""
-    if len(df) < 2:
-        return {
-            'señales': ['Datos insuficientes para análisis'],
-            'accion': 'ESPERAR ⏳',
-            'confianza': 0
-        }
-    
-    precios = df['price']
-    indicadores = calcular_indicadores(precios)
-    niveles = analizar_niveles(precios)
-    señales = []
-    confianza = 0
-    
-    if indicadores['rsi'] < 30:
-        señales.append(f"RSI en sobreventa ({indicadores['rsi']:.1f})")
-        confianza += 2
-    elif indicadores['rsi'] > 70:
-        señales.append(f"RSI en sobrecompra ({indicadores['rsi']:.1f})")
-        confianza -= 2
-    
-    if indicadores['macd'] > indicadores['signal']:
-        señales.append("MACD positivo")
-        confianza += 1
-    else:
-        señales.append("MACD negativo")
-        confianza -= 1
-    
-    volatilidad = precios.std() / precios.mean() * 100
-    if volatilidad > 5:
-        señales.append(f"Volatilidad alta ({volatilidad:.1f}%)")
-    
-    precio_actual = precios.iloc[-1]
-    if precio_actual < niveles['soporte']:
-        señales.append("Precio bajo soporte")
-        confianza += 2
-    elif precio_actual > niveles['resistencia']:
-        señales.append("Precio sobre resistencia")
-        confianza -= 2
-    
-    if confianza >= 3:
-        accion = "COMPRAR 🟢"
-    elif confianza <= -3:
-        accion = "VENDER 🔴"
-    else:
-        accion = "MANTENER ⏺"
-    
-    return {
-        'señales': señales,
-        'accion': accion,
-        'confianza': confianza,
-        'niveles': niveles,
-        'indicadores': indicadores
-    } 
\ No newline at end of file
@@ -1,6 +1,18 @@
-"""Análisis de tendencias de precios."""
-import pandas as pd
-from typing import Dict, Any
+"""
+Análisis de tendencias de precios.
+
+Solo cálculo sobre los datos recibidos (sin cliente, base ni consola), así
+que `recomendaciones.py` y los scripts de análisis lo importan sin levantar
+el monitor.
+"""
+from __future__ import annotations
+
+import numpy as np
+from typing import Dict, Any, Tuple
+from utils.indicator_registry import HIGH, LOW, PRECIO, estrategia_tendencia, evaluar
+from utils.lazy_modules import modulo_diferido
+
+pd = modulo_diferido('pandas')
 
 def analyze_trend(df: pd.DataFrame) -> Dict[str, Any]:
     """Analiza la tendencia de precios y retorna estadísticas."""
@@ -27,4 +39,29 @@ def analyze_trend(df: pd.DataFrame) -> Dict[str, Any]:
         "cambio": cambio_porcentual,
         "ultimo_precio": ultimo_precio,
         "precio_anterior": precio_anterior
-    } 
\ No newline at end of file
+    }
+
+def identificar_tendencia(df: pd.DataFrame,
+                          periodo_ema: int = 20,
+                          periodo_atr: int = 14,
+                          umbral_tendencia: float = 0.02) -> Tuple[bool, str]:
+    """
+    Identifica si hay una tendencia clara en el mercado
+
+    Args:
+        df: DataFrame con datos OHLCV
+        periodo_ema: Período para la media móvil exponencial
+        periodo_atr: Período para el ATR
+        umbral_tendencia: Umbral mínimo de pendiente para considerar tendencia
+
+    Returns:
+        Tuple[bool, str]: (hay_tendencia, dirección)
+    """
+    estrategia = estrategia_tendencia(periodo_ema, periodo_atr, umbral_tendencia)
+    resultado = evaluar({
+        PRECIO: df['close'].to_numpy(dtype=np.float64).reshape(1, -1),
+        HIGH: df['high'].to_numpy(dtype=np.float64).reshape(1, -1),
+        LOW: df['low'].to_numpy(dtype=np.float64).reshape(1, -1),
+    }, [estrategia])[estrategia.nombre]
+    direccion = 'alcista' if resultado['pendiente'][0] > 0 else 'bajista'
+    return bool(resultado['hay_tendencia'][0]), direccion